@@ -0,0 +1,74 @@
+"""Benchmark: file size and encode time of each meme output format.
+
+Renders the same memes once per available format and encoder setting and
+prints the average file size and render time, e.g.:
+
+    python scripts/bench_formats.py --images 5 --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Ensure local src is importable when running this script directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from motivacional_meme_generator.photo_manifest import IMAGE_EXTENSIONS
+from motivacional_meme_generator.MemeEngine import MemeEngine, available_formats
+
+PHOTOS = os.path.join(SRC, "motivacional_meme_generator", "_data", "photos", "dog")
+
+# (label, MemeEngine options) pairs compared for every format
+SETTINGS = [
+    ("baseline", {"progressive": False, "optimize": False}),
+    ("optimized", {"progressive": True, "optimize": True}),
+]
+
+
+def bench(images, output_format, options, quality, repeat):
+    """Render every image repeat times; return (mean bytes, mean seconds)."""
+    sizes, times = [], []
+    with tempfile.TemporaryDirectory() as out_dir:
+        engine = MemeEngine(
+            out_dir, output_format=output_format, quality=quality, **options
+        )
+        for _ in range(repeat):
+            for img in images:
+                started = time.perf_counter()
+                path = engine.make_meme(img, "To err is human, to forgive canine", "Anon")
+                times.append(time.perf_counter() - started)
+                sizes.append(os.path.getsize(path))
+    return statistics.mean(sizes), statistics.mean(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=5, help="Photos to render")
+    parser.add_argument("--repeat", type=int, default=3, help="Renders per photo")
+    parser.add_argument("--quality", type=int, default=75, help="Encoder quality")
+    args = parser.parse_args()
+
+    images = sorted(
+        os.path.join(PHOTOS, name)
+        for name in os.listdir(PHOTOS)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )[: args.images]
+    print(f"{'format':<8} {'setting':<10} {'avg KiB':>9} {'avg ms':>8}")
+    for output_format in available_formats():
+        for label, options in SETTINGS:
+            size, seconds = bench(
+                images, output_format, options, args.quality, args.repeat
+            )
+            print(
+                f"{output_format:<8} {label:<10} {size / 1024:>9.1f} {seconds * 1000:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Benchmark suite for the render, ingestion and web hot paths.
+
+Times MemeEngine.make_meme across image sizes and quote lengths, each quote
+ingestor on generated corpora of several sizes, and the Flask routes through
+the test client. Results are written as JSON with sorted keys so two runs
+can be diffed, and can be checked against a baseline:
+
+    python scripts/bench_suite.py --output bench.json
+    python scripts/bench_suite.py --compare bench.json --threshold 0.25
+
+With --compare, the exit status is 1 if any case's median got slower than
+the baseline by more than the threshold.
+"""
+
+import argparse
+import contextlib
+import csv
+import functools
+import gc
+import http.server
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure local src is importable when running this script directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import PIL
+from PIL import Image, ImageDraw
+
+from motivacional_meme_generator.MemeEngine import MemeEngine
+from motivacional_meme_generator.QuoteEngine import Ingestor
+from motivacional_meme_generator.web import create_app
+
+DATA = os.path.join(SRC, "motivacional_meme_generator", "_data")
+
+IMAGE_SIZES = {"small": (320, 240), "medium": (1024, 768), "large": (3000, 2000)}
+QUOTE_WORDS = {"short": 3, "medium": 15, "long": 60}
+CORPUS_SIZES = {"10": 10, "1k": 1000, "10k": 10000}
+
+WORDS = (
+    "dogs never bite me just when humans do life is short chase the ball "
+    "every day sit stay good boy walk treat bark"
+).split()
+
+
+def measure(func, repeat):
+    """Run func once to warm up, then repeat times with GC paused.
+
+    Returns:
+        dict: Median, minimum and mean seconds, and the number of runs.
+    """
+    func()
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return {
+        "median": round(statistics.median(times), 6),
+        "min": round(min(times), 6),
+        "mean": round(statistics.mean(times), 6),
+        "runs": repeat,
+    }
+
+
+def sentence(words):
+    """Return a deterministic sentence of the given number of words."""
+    return " ".join(WORDS[i % len(WORDS)] for i in range(words))
+
+
+def make_image(path, size):
+    """Write a deterministic gradient photo stand-in of the given size."""
+    width, height = size
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for x in range(0, width, max(1, width // 16)):
+        draw.line([(x, 0), (width - x, height)], fill=(200, 120, 40), width=3)
+    img.save(path, quality=90)
+
+
+def write_corpus(directory, count):
+    """Write the same synthetic quotes as TXT, CSV and DOCX files.
+
+    Returns:
+        dict: Path of each generated file by format.
+    """
+    quotes = [(sentence(8 + i % 12), f"Author {i % 97}") for i in range(count)]
+    paths = {
+        fmt: os.path.join(directory, f"quotes_{count}.{fmt}") for fmt in ("txt", "csv")
+    }
+    with open(paths["txt"], "w", encoding="utf-8") as f:
+        f.writelines(f'"{body}" - {author}\n' for body, author in quotes)
+    with open(paths["csv"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["body", "author"])
+        writer.writerows(quotes)
+    try:
+        import docx
+    except ImportError:
+        return paths
+    document = docx.Document()
+    for body, author in quotes:
+        document.add_paragraph(f'"{body}" - {author}')
+    paths["docx"] = os.path.join(directory, f"quotes_{count}.docx")
+    document.save(paths["docx"])
+    return paths
+
+
+def bench_make_meme(workdir, repeat):
+    """Time make_meme for every image size and quote length."""
+    results = {}
+    engine = MemeEngine(os.path.join(workdir, "out"))
+    for size_name, size in IMAGE_SIZES.items():
+        image = os.path.join(workdir, f"photo_{size_name}.jpg")
+        make_image(image, size)
+        for length_name, words in QUOTE_WORDS.items():
+            body = sentence(words)
+            results[f"make_meme/{size_name}/{length_name}"] = measure(
+                lambda: engine.make_meme(image, body, "Bench"), repeat
+            )
+    return results
+
+
+def bench_ingestors(workdir, repeat):
+    """Time Ingestor.parse for every format and corpus size."""
+    results = {}
+    for size_name, count in CORPUS_SIZES.items():
+        for fmt, path in sorted(write_corpus(workdir, count).items()):
+            results[f"ingest/{fmt}/{size_name}"] = measure(
+                lambda: Ingestor.parse(path), repeat
+            )
+    # PDFs cannot be generated without extra tools: use the bundled one
+    if shutil.which("pdftotext"):
+        pdf = os.path.join(DATA, "DogQuotes", "DogQuotesPDF.pdf")
+        results["ingest/pdf/bundled"] = measure(lambda: Ingestor.parse(pdf), repeat)
+    return results
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_routes(workdir, repeat):
+    """Time the Flask routes through the test client.
+
+    POST /create fetches from a local server; after the warm-up run the
+    image comes from the download cache, as repeated URLs do in production.
+    """
+    photos = os.path.join(workdir, "www")
+    shutil.copytree(os.path.join(DATA, "photos", "dog"), photos)
+    handler = functools.partial(QuietHandler, directory=photos)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    image_url = f"http://127.0.0.1:{server.server_address[1]}/xander_1.jpg"
+
+    app = create_app(
+        static_dir=os.path.join(workdir, "static"),
+        config={"MEME_IMAGE_CACHE_DIR": os.path.join(workdir, "image_cache")},
+    )
+    client = app.test_client()
+    form = {"image_url": image_url, "body": sentence(10), "author": "Bench"}
+    try:
+        return {
+            "route/GET /": measure(lambda: client.get("/"), repeat),
+            "route/GET /create": measure(lambda: client.get("/create"), repeat),
+            "route/POST /create": measure(
+                lambda: client.post("/create", data=form), repeat
+            ),
+        }
+    finally:
+        app.extensions["meme_services"].close()
+        server.shutdown()
+
+
+GROUPS = {
+    "make_meme": bench_make_meme,
+    "ingest": bench_ingestors,
+    "routes": bench_routes,
+}
+
+
+def compare(results, baseline, threshold):
+    """Return the cases whose median regressed beyond threshold."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None or not old["median"]:
+            continue
+        change = result["median"] / old["median"] - 1
+        if change > threshold:
+            regressions.append((name, old["median"], result["median"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument(
+        "--only", choices=sorted(GROUPS), action="append", help="Benchmark group to run"
+    )
+    parser.add_argument("--output", "-o", help="Write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed median slowdown before failing, as a fraction (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    # Keep stdout for the JSON report: the app logs its corpus loading
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(sys.stderr):
+        for name in args.only or GROUPS:
+            groupdir = os.path.join(workdir, name)
+            os.makedirs(groupdir)
+            results.update(GROUPS[name](groupdir, args.repeat))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✓ Wrote {len(results)} results to {args.output}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"⚠ {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✓ No case regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare the FreeType and glyph atlas text backends of MemeEngine.
+
+Draws the same layouts with both backends, for several image sizes and
+quote lengths, and reports the median drawing time of each and how many
+pixels differ between the two results:
+
+    python scripts/bench_text_backend.py
+    python scripts/bench_text_backend.py --repeat 50 --font DejaVuSerif
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Ensure local src is importable when running this script directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from PIL import Image, ImageChops
+
+from motivacional_meme_generator.MemeEngine import MemeEngine
+
+SIZES = {"small": (320, 240), "medium": (500, 375), "large": (1200, 900)}
+QUOTES = {
+    "short": "Sit. Stay. Smile.",
+    "medium": "Life is short, chase the ball every single day and nap in the sun",
+    "long": (
+        "Every dog has its day, but the best days are the ones spent running "
+        "through the park, digging in the garden, and sleeping at your feet "
+        "while the rain taps on the window and dinner is almost ready"
+    ),
+}
+
+
+def time_draw(engine, layout, size, repeat):
+    """Return the median seconds to draw a layout, and the last result."""
+    base = Image.new("RGB", size, (90, 110, 130))
+    engine.draw_text(base.copy(), layout)  # warm caches
+    times = []
+    for _ in range(repeat):
+        img = base.copy()
+        started = time.perf_counter()
+        engine.draw_text(img, layout)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), img
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Timed draws per case")
+    parser.add_argument("--font", default="arial.ttf", help="Font name or path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        freetype = MemeEngine(workdir, font=args.font)
+        atlas = MemeEngine(workdir, font=args.font, text_backend="atlas")
+
+    print(
+        f"{'case':<16} {'freetype ms':>12} {'atlas ms':>9} {'speedup':>8} "
+        f"{'diff px':>8} {'max diff':>9}"
+    )
+    for size_name, size in SIZES.items():
+        for quote_name, quote in QUOTES.items():
+            layout = freetype.layout(quote, "Rex", *size)
+            slow, expected = time_draw(freetype, layout, size, args.repeat)
+            fast, actual = time_draw(atlas, layout, size, args.repeat)
+            diff = ImageChops.difference(expected, actual).convert("L")
+            histogram = diff.histogram()
+            changed = sum(histogram[1:])
+            worst = max(i for i, count in enumerate(histogram) if count)
+            print(
+                f"{size_name + '/' + quote_name:<16} {slow * 1000:>12.2f} "
+                f"{fast * 1000:>9.2f} {slow / fast:>7.1f}x {changed:>8} {worst:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
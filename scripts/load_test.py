@@ -0,0 +1,231 @@
+"""Load test: throughput and tail latency of the web routes.
+
+Starts create_app on a local threaded server, plus a stand-in HTTP server
+serving the sample photos for the image_url of POST /create. It then sends
+requests from a number of concurrent clients and reports requests per
+second and p50/p95/p99 latency per route:
+
+    python scripts/load_test.py --concurrency 16 --duration 30
+    python scripts/load_test.py --route /create --unique-images \\
+        --config MEME_RENDER_WORKERS=4 --json load.json
+"""
+
+import argparse
+import functools
+import http.server
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+# Ensure local src is importable when running this script directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from motivacional_meme_generator.photo_manifest import IMAGE_EXTENSIONS
+from motivacional_meme_generator.services import DEFAULT_CONFIG
+from motivacional_meme_generator.web import create_app
+
+PHOTOS = os.path.join(SRC, "motivacional_meme_generator", "_data", "photos", "dog")
+ROUTES = ("/", "/create")
+
+# Suffixes for --unique-images, never reused across warm-up and timed runs
+_unique_ids = itertools.count()
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, *args):
+        pass
+
+
+def parse_config(pairs):
+    """Convert KEY=VALUE arguments to typed create_app overrides."""
+    config = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        if key not in DEFAULT_CONFIG:
+            raise SystemExit(f"❌ Unknown setting: {key}")
+        config[key] = type(DEFAULT_CONFIG[key])(value)
+    return config
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def start_servers(workdir, config):
+    """Start the stand-in image server and the app; return them and their URLs."""
+    handler = functools.partial(QuietHandler, directory=PHOTOS)
+    image_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=image_server.serve_forever, daemon=True).start()
+
+    config.setdefault("MEME_IMAGE_CACHE_DIR", os.path.join(workdir, "image_cache"))
+    app = create_app(static_dir=os.path.join(workdir, "static"), config=config)
+    app_server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=app_server.serve_forever, daemon=True).start()
+    return (
+        app,
+        app_server,
+        image_server,
+        f"http://127.0.0.1:{app_server.server_port}",
+        f"http://127.0.0.1:{image_server.server_address[1]}",
+    )
+
+
+def run(base_url, image_base, routes, concurrency, total, duration, unique_images):
+    """Send requests until total is reached or duration elapses.
+
+    Returns:
+        tuple: Latencies by route, status counts by route, and elapsed seconds.
+    """
+    photos = sorted(
+        name for name in os.listdir(PHOTOS)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    deadline = time.perf_counter() + duration if duration else None
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        session = local.session
+        while True:
+            n = next(counter)
+            if (total and n >= total) or (deadline and time.perf_counter() > deadline):
+                return
+            route = routes[n % len(routes)]
+            started = time.perf_counter()
+            try:
+                if route == "/create":
+                    image_url = f"{image_base}/{photos[n % len(photos)]}"
+                    if unique_images:
+                        # A new URL every time defeats the download cache
+                        image_url += f"?n={next(_unique_ids)}"
+                    res = session.post(
+                        base_url + route,
+                        data={"image_url": image_url, "body": "Load", "author": "Bench"},
+                        timeout=60,
+                    )
+                else:
+                    res = session.get(base_url + route, timeout=60)
+                status = str(res.status_code)
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[route].append(elapsed)
+                statuses[route][status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(latencies, statuses, elapsed):
+    """Build the report: throughput and latency percentiles per route."""
+    report = {"elapsed_seconds": round(elapsed, 3), "routes": {}}
+    for route, values in sorted(latencies.items()):
+        values = sorted(values)
+        report["routes"][route] = {
+            "requests": len(values),
+            "requests_per_second": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "statuses": dict(sorted(statuses[route].items())),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--route", choices=ROUTES, action="append",
+        help="Route to load, repeatable (default: all, interleaved)",
+    )
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="Total requests")
+    parser.add_argument(
+        "--duration", "-d", type=float, default=0.0,
+        help="Run for this many seconds instead of a fixed number of requests",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=None,
+        help="Untimed requests sent first, e.g. to start render workers "
+        "(default: the concurrency)",
+    )
+    parser.add_argument(
+        "--unique-images", action="store_true",
+        help="Give every /create request a new image URL (cold download cache)",
+    )
+    parser.add_argument(
+        "--config", action="append", default=[], metavar="KEY=VALUE",
+        help="MEME_* setting for the app under test, repeatable",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the report to FILE")
+    args = parser.parse_args()
+
+    config = parse_config(args.config)
+    with tempfile.TemporaryDirectory() as workdir:
+        app, app_server, image_server, base_url, image_base = start_servers(
+            workdir, config
+        )
+        try:
+            warmup = args.concurrency if args.warmup is None else args.warmup
+            if warmup:
+                run(base_url, image_base, args.route or ROUTES, args.concurrency,
+                    warmup, 0, args.unique_images)
+            latencies, statuses, elapsed = run(
+                base_url,
+                image_base,
+                args.route or ROUTES,
+                args.concurrency,
+                0 if args.duration else args.requests,
+                args.duration,
+                args.unique_images,
+            )
+        finally:
+            app_server.shutdown()
+            image_server.shutdown()
+            app.extensions["meme_services"].close()
+
+    report = summarize(latencies, statuses, elapsed)
+    report["concurrency"] = args.concurrency
+    print(f"{'route':<8} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for route, stats in report["routes"].items():
+        print(
+            f"{route:<8} {stats['requests']:>6} {stats['requests_per_second']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}  "
+            f"{stats['statuses']}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
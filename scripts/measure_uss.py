@@ -0,0 +1,136 @@
+"""Measure the private memory (USS) of prefork web workers.
+
+Runs a small prefork master in a fresh interpreter for each mode, forks
+--workers workers that each create the Flask app and serve --requests
+random memes, and then reads every worker's unique set size (memory no
+other process shares) and proportional set size from
+/proc/<pid>/smaps_rollup. The "preload" mode calls services.preload() in
+the master before forking; "plain" does not:
+
+    python scripts/measure_uss.py
+    python scripts/measure_uss.py --workers 8 --requests 50
+
+Linux only.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Ensure local src is importable when running this script directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+MODES = ("plain", "preload")
+
+
+def memory_kb(pid):
+    """Return the USS and PSS of a process in kB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0])
+    return fields["Private_Clean"] + fields["Private_Dirty"], fields["Pss"]
+
+
+def run_worker(static_dir, requests, ready_fd):
+    """Create the app in a forked worker, serve requests, then wait."""
+    from motivacional_meme_generator.web import create_app
+
+    app = create_app(static_dir=static_dir)
+    client = app.test_client()
+    for _ in range(requests):
+        response = client.get("/")
+        assert response.status_code == 200, response.status_code
+    os.write(ready_fd, b"r")
+    # Stay alive until the master has measured this process
+    os.read(0, 1)
+
+
+def run_master(mode, workers, requests):
+    """Fork the workers, measure them and print one JSON line."""
+    from motivacional_meme_generator.services import preload
+
+    if mode == "preload":
+        preload()
+
+    with tempfile.TemporaryDirectory() as static_dir:
+        ready_r, ready_w = os.pipe()
+        hold_r, hold_w = os.pipe()
+        pids = []
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                os.dup2(hold_r, 0)
+                # Only the master may hold the write end, or reads never end
+                os.close(hold_w)
+                # Keep the worker's own output out of the report
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, 1)
+                os.dup2(devnull, 2)
+                try:
+                    run_worker(static_dir, requests, ready_w)
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+        os.close(ready_w)
+
+        for _ in pids:
+            if not os.read(ready_r, 1):
+                raise SystemExit("❌ A worker exited before it was measured")
+        usage = [memory_kb(pid) for pid in pids]
+        os.close(hold_w)
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+    master_uss, _master_pss = memory_kb(os.getpid())
+    print(json.dumps({
+        "mode": mode,
+        "uss": [uss for uss, _pss in usage],
+        "pss": [pss for _uss, pss in usage],
+        "master_uss": master_uss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="Workers per mode")
+    parser.add_argument("--requests", type=int, default=20, help="Memes per worker")
+    parser.add_argument("--master", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("❌ /proc/<pid>/smaps_rollup is required (Linux 4.14+)")
+    if args.master:
+        run_master(args.master, args.workers, args.requests)
+        return
+
+    print(
+        f"{'mode':<8} {'median USS MB':>14} {'total USS MB':>13} "
+        f"{'total PSS MB':>13} {'master USS MB':>14}"
+    )
+    for mode in MODES:
+        # A fresh interpreter per mode, so one cannot warm up the other
+        output = subprocess.run(
+            [sys.executable, __file__, "--master", mode,
+             "--workers", str(args.workers), "--requests", str(args.requests)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<8} {statistics.median(result['uss']) / 1024:>14.1f} "
+            f"{sum(result['uss']) / 1024:>13.1f} {sum(result['pss']) / 1024:>13.1f} "
+            f"{result['master_uss'] / 1024:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,91 @@ Simple, well-typed implementation using Pillow.
 
 from __future__ import annotations
 
+import io
 import os
-import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Union
 
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    from .fonts import resolve_font
+    from .glyphs import GlyphAtlas, draw_glyphs
+    from .hooks import Hooks
+    from .layout import LayoutCache, TextLayout, fit_text
+    from .prep import DEFAULT_PREP_DIR, prepared_photos
+    from .shared_images import shared_image_cache
+    from .storage import new_meme_name, shard_path
+except ImportError:  # imported as a top-level module by meme.py and app.py
+    from fonts import resolve_font
+    from glyphs import GlyphAtlas, draw_glyphs
+    from hooks import Hooks
+    from layout import LayoutCache, TextLayout, fit_text
+    from prep import DEFAULT_PREP_DIR, prepared_photos
+    from shared_images import shared_image_cache
+    from storage import new_meme_name, shard_path
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
 except Exception:  # Pillow is optional at import time
-    Image = ImageDraw = ImageFont = None
+    Image = ImageDraw = ImageFont = ImageOps = None
+
+# Output formats: name -> (file extension, Pillow format, MIME type)
+OUTPUT_FORMATS = {
+    "jpeg": (".jpg", "JPEG", "image/jpeg"),
+    "webp": (".webp", "WEBP", "image/webp"),
+    "avif": (".avif", "AVIF", "image/avif"),
+}
+
+# Animated sources are saved as one of these: name -> (extension, format, MIME)
+ANIMATED_FORMATS = {
+    "gif": (".gif", "GIF", "image/gif"),
+    "webp": OUTPUT_FORMATS["webp"],
+}
+# Animations with more frames than this are composited by a thread pool
+PARALLEL_FRAMES = 16
+# Frames sampled to build the palette shared by all frames of a GIF
+PALETTE_SAMPLES = 8
+# Largest animations rendered: frames, and pixels decoded over all frames
+MAX_ANIMATION_FRAMES = 500
+MAX_ANIMATION_PIXELS = 50_000_000
+
+# EXIF tag holding how the camera was turned
+ORIENTATION = 0x0112
+
+# Ways of drawing text: FreeType line by line, or from cached glyph bitmaps
+TEXT_BACKENDS = ("freetype", "atlas")
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Return the output formats the installed Pillow can encode.
+
+    Returns:
+        Tuple[str, ...]: Names from OUTPUT_FORMATS, in declaration order.
+    """
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(
+        name for name, (_ext, pil_format, _mime) in OUTPUT_FORMATS.items()
+        if pil_format in Image.SAVE
+    )
+
+
+def media_type(path: str) -> str:
+    """Return the MIME type of a meme by its file extension.
+
+    Args:
+        path: Path of a file written by MemeEngine.
+
+    Returns:
+        str: MIME type, or 'application/octet-stream' for other files.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for ext, _pil_format, mime in (*OUTPUT_FORMATS.values(), *ANIMATED_FORMATS.values()):
+        if ext == extension:
+            return mime
+    return "application/octet-stream"
 
 
 class MemeEngine:
@@ -23,24 +101,124 @@ class MemeEngine:
 
     Attributes:
         output_dir: Directory where generated memes are saved.
+        shard_depth: Levels of hash-prefixed subdirectories memes are spread
+            over; 0 keeps them all directly in output_dir.
+        output_format: Default output format, a key of OUTPUT_FORMATS.
+        quality: Encoder quality, from 1 (smallest) to 100 (best).
+        progressive: Whether JPEG output is progressive.
+        optimize: Whether the encoder spends extra time on smaller files.
+        prepared: Lookup of prepared copies of source photos, or None.
+        shared_images: Decoded photos shared between processes, or None.
+
+        hooks: Callbacks notified of renders and their stages; shared by
+            all engines unless replaced on an instance (see hooks.py).
 
     Example:
         meme = MemeEngine('./tmp')
         path = meme.make_meme(img_path, 'hello', 'author')
     """
 
-    def __init__(self, output_dir: str) -> None:
+    hooks = Hooks()
+
+    def __init__(
+        self,
+        output_dir: str,
+        shard_depth: int = 0,
+        output_format: str = "jpeg",
+        quality: int = 75,
+        progressive: bool = True,
+        optimize: bool = True,
+        font: str = "arial.ttf",
+        layout_cache_size: int = 256,
+        overlay_cache_size: int = 16,
+        text_backend: str = "freetype",
+        animate: bool = True,
+        prep_dir: Optional[str] = DEFAULT_PREP_DIR,
+        shared_images: Optional[str] = None,
+    ) -> None:
         """Initialize the MemeEngine with an output directory.
 
         Args:
             output_dir: Directory where generated memes will be saved.
+            shard_depth: Levels of hash-prefixed subdirectories to use.
+            output_format: Default output format, a key of OUTPUT_FORMATS.
+            quality: Encoder quality, from 1 (smallest) to 100 (best).
+            progressive: Whether JPEG output is progressive.
+            optimize: Whether the encoder spends extra time on smaller files.
+            font: TrueType font file, by path or by name in the system fonts;
+                fonts that are not installed fall back to the bundled
+                DejaVuSans.
+            layout_cache_size: Number of text layouts kept; 0 disables the
+                cache.
+            overlay_cache_size: Number of pre-rendered text overlays kept.
+            text_backend: 'freetype' draws every line with ImageDraw.text;
+                'atlas' rasterizes each glyph once per font size and composes
+                lines from the cached bitmaps (see glyphs.py).
+            animate: Whether animated sources (GIF, WebP) produce animated
+                memes; if False, only their first frame is used.
+            prep_dir: Root directory of the copies written by the CLI's
+                ``prep`` command, which photos given by path are rendered
+                from when a current one exists; None always decodes the
+                source (see prep.py).
+            shared_images: Name of a SharedImageCache block holding decoded
+                photos, which photos given by path are taken from without
+                decoding; None decodes every photo in this process (see
+                shared_images.py).
+
+        Raises:
+            ValueError: If output_format or text_backend is unknown.
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        if text_backend not in TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend: {text_backend}")
         self.output_dir = output_dir
+        self.shard_depth = shard_depth
+        self.output_format = output_format
+        self.quality = quality
+        self.progressive = progressive
+        self.optimize = optimize
+        self.font = font
+        self.layouts = LayoutCache(layout_cache_size)
+        self.overlays = LayoutCache(overlay_cache_size)
+        self.text_backend = text_backend
+        self.animate = animate
+        self.prepared = prepared_photos(prep_dir) if prep_dir else None
+        self.shared_images = shared_image_cache(shared_images) if shared_images else None
+        self._atlases: dict = {}
+        self._fonts: dict = {}
+        self._font_path: Optional[str] = None
         os.makedirs(self.output_dir, exist_ok=True)
 
+    def _save_options(self, output_format: str) -> dict:
+        """Return the Pillow save() arguments for an output format.
+
+        Args:
+            output_format: A key of OUTPUT_FORMATS.
+
+        Returns:
+            dict: Keyword arguments for Image.save.
+        """
+        pil_format = OUTPUT_FORMATS[output_format][1]
+        options = {"format": pil_format, "quality": self.quality}
+        if output_format == "jpeg":
+            options.update(progressive=self.progressive, optimize=self.optimize)
+        elif output_format == "webp":
+            # method 6 is the slowest, smallest setting; 4 is Pillow's default
+            options["method"] = 6 if self.optimize else 4
+        elif output_format == "avif":
+            # Lower speeds are smaller but far too slow to encode per request
+            options["speed"] = 6 if self.optimize else 8
+        return options
+
     def _load_font(self, size: int = 20) -> ImageFont.FreeTypeFont:
         """Load a font with the specified size.
 
+        The font is resolved through the system font index, falling back to
+        the bundled DejaVuSans. If even that cannot be loaded, Pillow's
+        built-in font is used; when it cannot scale either, the same font
+        is returned for every size, which tells fit_text to stop shrinking.
+
         Args:
             size: Font size in points.
 
@@ -50,23 +228,322 @@ class MemeEngine:
         Raises:
             RuntimeError: If Pillow is not available.
         """
-        # Try to use a common system font; fallback to default
         if ImageFont is None:
             raise RuntimeError("Pillow is required for MemeEngine")
 
-        try:
-            return ImageFont.truetype("arial.ttf", size=size)
-        except Exception:
-            return ImageFont.load_default()
+        font = self._fonts.get(size)
+        if font is None:
+            if self._font_path is None:
+                self._font_path = resolve_font(self.font)
+            try:
+                font = ImageFont.truetype(self._font_path, size=size)
+            except Exception:
+                try:
+                    # Scalable when Pillow has FreeType support
+                    font = ImageFont.load_default(size=size)
+                except Exception:
+                    font = self._fonts.setdefault(None, ImageFont.load_default())
+            self._fonts[size] = font
+        return font
+
+    def layout(self, text: str, author: str, width: int, height: int) -> TextLayout:
+        """Return the text layout of a quote on an image of the given size.
+
+        Layouts are cached by text, author, font and image size, so a
+        repeated render does no text measuring at all.
+
+        Args:
+            text: Quote body text.
+            author: Quote author.
+            width: Image width in pixels.
+            height: Image height in pixels.
+
+        Returns:
+            TextLayout: Font, lines and line positions.
+        """
+        return self.layouts.get(
+            (text, author, self.font, width, height),
+            lambda: fit_text(text, author, width, height, self._load_font),
+        )
+
+    def draw_text(self, img, layout: TextLayout) -> None:
+        """Draw a text layout onto an image with the engine's text backend.
+
+        Args:
+            img: Target image, modified in place.
+            layout: Layout computed for the image size.
+        """
+        if self.text_backend == "atlas":
+            atlas = self._atlases.get(layout.font)
+            if atlas is None:
+                atlas = self._atlases.setdefault(layout.font, GlyphAtlas(layout.font))
+            draw_glyphs(img, layout, atlas)
+        else:
+            layout.draw(ImageDraw.Draw(img))
+
+    def _open(self, img_path: Union[str, bytes], width: int):
+        """Open and decode a source image, upright.
+
+        Photos given by path are taken from the shared image cache, or else
+        read from their narrowest prepared copy at least width pixels wide,
+        when there is a current one.
+
+        Raises:
+            FileNotFoundError: If the source image file cannot be read.
+            ValueError: If in-memory image data cannot be decoded.
+        """
+        if isinstance(img_path, (bytes, bytearray)):
+            try:
+                img = Image.open(io.BytesIO(img_path))
+                img.load()
+            except Exception as e:
+                raise ValueError("Cannot decode image data") from e
+        else:
+            if self.shared_images is not None:
+                img = self.shared_images.get(img_path, width)
+                if img is not None:
+                    return img
+            prepared = self.prepared.find(img_path, width) if self.prepared else None
+            img = None
+            if prepared is not None:
+                try:
+                    img = Image.open(prepared)
+                    img.load()
+                except Exception:
+                    # e.g. a cleaned temp directory: decode the source instead
+                    img = None
+            if img is None:
+                try:
+                    img = Image.open(img_path)
+                    img.load()
+                except Exception as e:
+                    raise FileNotFoundError(f"Image not found: {img_path}") from e
+        # Prepared copies are upright already; so are most sources
+        if not getattr(img, "is_animated", False) and img.getexif().get(ORIENTATION, 1) != 1:
+            img = ImageOps.exif_transpose(img)
+        return img
+
+    @staticmethod
+    def _resize(img, width: int):
+        """Shrink an image to at most width pixels, keeping its aspect ratio.
+
+        Palette, bilevel and 32-bit images are converted to RGB, or RGBA if
+        they have transparency, first: text cannot be pasted onto them, and
+        they would only be resized with nearest-neighbour sampling.
+        """
+        if img.mode not in ("RGB", "RGBA", "RGBX", "L", "LA"):
+            has_alpha = "A" in img.getbands() or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        ratio = min(1, width / img.width)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.LANCZOS)
+        # Shared photos are mapped as RGBX: drop the padding once resized
+        return img.convert("RGB") if img.mode == "RGBX" else img
+
+    def _save(self, img, output_format: str) -> str:
+        """Encode a finished meme into a new file and return its path."""
+        # JPEG has no alpha channel or palette: flatten those images first
+        if output_format == "jpeg":
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in img.getbands() or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+
+        out_path = self._new_path(OUTPUT_FORMATS[output_format][0])
+        img.save(out_path, **self._save_options(output_format))
+        return out_path
+
+    def _new_path(self, extension: str) -> str:
+        """Return the path of a new meme file, creating its shard directory."""
+        out_path = shard_path(
+            self.output_dir, new_meme_name(extension), self.shard_depth
+        )
+        if self.shard_depth:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        return out_path
+
+    def _make_animated(
+        self,
+        img,
+        text: str,
+        author: str,
+        width: int,
+        output_format: str,
+        started: Optional[float] = None,
+    ) -> str:
+        """Put a quote on every frame of an animation and save it.
+
+        Frames are downscaled to the output size as they are decoded. The
+        layout and its overlay are computed once for that size and
+        composited onto each frame, in a thread pool for long animations.
+        WebP output stays WebP; any other format is saved as GIF, with one
+        palette built from a sample of frames and reused for all of them.
+
+        Args:
+            img: The decoded animated source image.
+            text: Quote body text.
+            author: Quote author.
+            width: Maximum width of the output in pixels.
+            output_format: Requested output format.
+            started: perf_counter() value decoding started at, for hooks.
+
+        Returns:
+            str: Path to the animated meme.
+
+        Raises:
+            ValueError: If the animation has more than MAX_ANIMATION_FRAMES
+                frames or MAX_ANIMATION_PIXELS pixels over all frames.
+        """
+        hooks = self.hooks
+        started = time.perf_counter() if started is None else started
+        animated_format = "webp" if output_format == "webp" else "gif"
+        # A small file can hold hundreds of large frames: check before decoding
+        if img.n_frames > MAX_ANIMATION_FRAMES:
+            raise ValueError(
+                f"Animation has {img.n_frames} frames; at most "
+                f"{MAX_ANIMATION_FRAMES} are supported"
+            )
+        if img.width * img.height * img.n_frames > MAX_ANIMATION_PIXELS:
+            raise ValueError(
+                f"Animation of {img.n_frames} frames of {img.width}x{img.height} "
+                f"is too large to render"
+            )
+        ratio = min(1, width / img.width)
+        size = (int(img.width * ratio), int(img.height * ratio))
+        frames, durations = [], []
+        for index in range(img.n_frames):
+            img.seek(index)
+            durations.append(img.info.get("duration", 100))
+            frame = img.convert("RGBA")
+            if frame.size != size:
+                frame = frame.resize(size, Image.LANCZOS)
+            frames.append(frame)
+        loop = img.info.get("loop", 0)
+        checkpoint = time.perf_counter()
+        if hooks:
+            hooks.emit(
+                "make_meme.decode", "end", checkpoint - started,
+                size=img.size, frames=len(frames),
+            )
+
+        overlay = self.overlay(text, author, *size)
+        started, checkpoint = checkpoint, time.perf_counter()
+        if hooks:
+            hooks.emit("make_meme.layout", "end", checkpoint - started, size=size)
+
+        def composite(frame):
+            frame = Image.alpha_composite(frame, overlay)
+            # GIF transparency is one palette entry: flatten to opaque frames
+            return frame if animated_format == "webp" else frame.convert("RGB")
+
+        def each_frame(func, frames):
+            if len(frames) <= PARALLEL_FRAMES:
+                return [func(frame) for frame in frames]
+            # Pillow releases the GIL while compositing and mapping
+            with ThreadPoolExecutor(min(8, os.cpu_count() or 1)) as pool:
+                return list(pool.map(func, frames))
+
+        frames = each_frame(composite, frames)
+
+        options = {
+            "save_all": True,
+            "append_images": frames[1:],
+            "duration": durations,
+            "loop": loop,
+        }
+        if animated_format == "gif":
+            # One palette from evenly spaced frames, mapped onto every frame
+            step = max(1, len(frames) // PALETTE_SAMPLES)
+            samples = frames[::step][:PALETTE_SAMPLES]
+            strip = Image.new("RGB", (size[0], size[1] * len(samples)))
+            for i, frame in enumerate(samples):
+                strip.paste(frame, (0, size[1] * i))
+            palette = strip.quantize(256, method=Image.FASTOCTREE)
+
+            def remap(frame):
+                return frame.quantize(palette=palette, dither=Image.NONE)
+
+            frames = each_frame(remap, frames)
+            options.update(append_images=frames[1:], format="GIF", disposal=1)
+        else:
+            options.update(self._save_options("webp"))
+            # method 6 costs about 15x as much per frame for a few percent
+            options["method"] = 4
+        started, checkpoint = checkpoint, time.perf_counter()
+        if hooks:
+            hooks.emit(
+                "make_meme.frames", "end", checkpoint - started, frames=len(frames)
+            )
+
+        out_path = self._new_path(ANIMATED_FORMATS[animated_format][0])
+        frames[0].save(out_path, **options)
+        if hooks:
+            hooks.emit(
+                "make_meme.encode", "end", time.perf_counter() - checkpoint,
+                bytes=os.path.getsize(out_path),
+            )
+        return out_path
+
+    def _stage(self, stage: str, started: float, **info) -> float:
+        """Report the end of a render stage to the hooks.
 
-    def make_meme(self, img_path: str, text: str, author: str, width: int = 500) -> str:
+        Args:
+            stage: Stage name, reported as 'make_meme.<stage>'.
+            started: perf_counter() value the stage started at.
+            **info: Extra event fields.
+
+        Returns:
+            float: perf_counter() value the stage ended at.
+        """
+        finished = time.perf_counter()
+        if self.hooks:
+            self.hooks.emit(f"make_meme.{stage}", "end", finished - started, **info)
+        return finished
+
+    def _render_still(
+        self, img, text: str, author: str, output_format: str, started: float
+    ) -> Tuple[str, float]:
+        """Draw a quote on a resized still image and save it, reporting stages.
+
+        Args:
+            img: Image already resized to the output size, modified in place.
+            text: Quote body text.
+            author: Quote author.
+            output_format: Output format.
+            started: perf_counter() value the layout stage starts at.
+
+        Returns:
+            Tuple[str, float]: Path of the meme and the time encoding ended.
+        """
+        layout = self.layout(text, author, img.width, img.height)
+        checkpoint = self._stage(
+            "layout", started, font_size=layout.font_size, lines=len(layout.lines) - 1
+        )
+        self.draw_text(img, layout)
+        checkpoint = self._stage("draw", checkpoint)
+        out_path = self._save(img, output_format)
+        size = os.path.getsize(out_path) if self.hooks else 0
+        return out_path, self._stage("encode", checkpoint, bytes=size)
+
+    def make_meme(
+        self,
+        img_path: Union[str, bytes],
+        text: str,
+        author: str,
+        width: int = 500,
+        output_format: Optional[str] = None,
+    ) -> str:
         """Create meme with given text and author, return path to saved image.
 
         Args:
-            img_path: Path to the source image file.
+            img_path: Path to the source image file, or the encoded image
+                itself (e.g. a download held in memory).
             text: Quote body text to display on the meme.
             author: Quote author to display on the meme.
             width: Maximum width for the output image in pixels.
+            output_format: Output format for this meme; defaults to the
+                engine's output_format.
 
         Returns:
             str: Path to the generated meme image file.
@@ -74,92 +551,226 @@ class MemeEngine:
         Raises:
             RuntimeError: If Pillow is not available.
             FileNotFoundError: If the source image file is not found.
+            ValueError: If in-memory image data cannot be decoded, the
+                output format is unknown, or an animation is too large.
         """
         if Image is None:
             raise RuntimeError("Pillow is required for MemeEngine")
+        output_format = output_format or self.output_format
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        hooks = self.hooks
+        if hooks:
+            source = img_path if isinstance(img_path, str) else len(img_path)
+            hooks.emit("make_meme", "start", source=source, width=width)
+        started = begin = time.perf_counter()
+        img = self._open(img_path, width)
+        if self.animate and getattr(img, "is_animated", False):
+            out_path = self._make_animated(
+                img, text, author, width, output_format, started
+            )
+            if hooks:
+                hooks.emit(
+                    "make_meme", "end", time.perf_counter() - begin,
+                    path=out_path, bytes=os.path.getsize(out_path),
+                )
+            return out_path
+        checkpoint = self._stage("decode", started, size=img.size)
+        img = self._resize(img, width)
+        checkpoint = self._stage("resize", checkpoint, size=img.size)
+        out_path, finished = self._render_still(
+            img, text, author, output_format, checkpoint
+        )
+        if hooks:
+            hooks.emit(
+                "make_meme", "end", finished - begin,
+                path=out_path, bytes=os.path.getsize(out_path),
+            )
+        return out_path
 
-        try:
-            img = Image.open(img_path)
-        except Exception as e:
-            raise FileNotFoundError(f"Image not found: {img_path}") from e
+    def make_meme_variants(
+        self,
+        img_path: Union[str, bytes],
+        text: str,
+        author: str,
+        widths: Iterable[int] = (320, 640, 1080),
+        output_format: Optional[str] = None,
+    ) -> List[Tuple[int, str]]:
+        """Create the same meme at several widths from a single decode.
+
+        Each variant is downscaled from the next larger one and gets the
+        layout cached for its own size. Widths above the source width are
+        capped at it, so a small source yields fewer variants. Animated
+        sources are rendered once per width.
 
-        # Resize maintaining aspect ratio
-        ratio = min(1, width / img.width)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, Image.LANCZOS)
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            text: Quote body text to display on the memes.
+            author: Quote author to display on the memes.
+            widths: Maximum widths of the variants in pixels.
+            output_format: Output format; defaults to the engine's.
 
-        draw = ImageDraw.Draw(img)
-
-        # Prepare text: body + author on next line
-        body = f'"{text}"'
-        author_line = f"- {author}"
-
-        # compute max text width (image width minus padding)
-        padding = 20
-        max_width = img.width - 2 * padding
-
-        # dynamic font sizing: start large and shrink until text fits
-        font_size = min(40, int(img.height / 10))
-        font = None
-
-        def wrap_text(s: str, font_obj, max_w: int) -> list[str]:
-            words = s.split()
-            lines: list[str] = []
-            current = []
-            for w in words:
-                candidate = " ".join(current + [w]) if current else w
-                w_box = draw.textbbox((0, 0), candidate, font=font_obj)
-                w_width = w_box[2] - w_box[0]
-                if w_width <= max_w:
-                    current.append(w)
-                else:
-                    if current:
-                        lines.append(" ".join(current))
-                    current = [w]
-            if current:
-                lines.append(" ".join(current))
-            return lines
-
-        # Pick font size so that wrapped body + author fits vertically
-        while font_size > 10:
-            try:
-                font = self._load_font(size=font_size)
-            except RuntimeError:
-                raise
-            body_lines = wrap_text(body, font, max_width)
-            author_lines = wrap_text(author_line, font, max_width)
-            # compute total height
-            line_height = draw.textbbox((0, 0), "Ay", font=font)[3]
-            total_h = (len(body_lines) + len(author_lines)) * (line_height + 4)
-            if total_h < img.height * 0.5:  # don't take more than half image height
-                break
-            font_size -= 2
-
-        # Compose final lines
-        lines = body_lines + [""] + author_lines
-
-        # start vertical position centered in the lower half
-        total_h = len(lines) * (line_height + 4)
-        y_start = int(img.height * 0.6 - total_h // 2)
-
-        # Draw each line centered horizontally with an outline for readability
-        for i, line in enumerate(lines):
-            if not line:
+        Returns:
+            List[Tuple[int, str]]: Actual width and path of each variant,
+                narrowest first.
+
+        Raises:
+            RuntimeError: If Pillow is not available.
+            FileNotFoundError: If the source image file is not found.
+            ValueError: If image data cannot be decoded, the output format is
+                unknown, no width is given, or an animation is too large.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is required for MemeEngine")
+        output_format = output_format or self.output_format
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        widths = sorted(set(widths), reverse=True)
+        if not widths:
+            raise ValueError("At least one width is required")
+
+        hooks = self.hooks
+        if hooks:
+            source = img_path if isinstance(img_path, str) else len(img_path)
+            hooks.emit("make_meme_variants", "start", source=source, widths=widths)
+        begin = time.perf_counter()
+
+        img = self._open(img_path, widths[0])
+        animated = self.animate and getattr(img, "is_animated", False)
+        # Animations report their own stages, frames included
+        checkpoint = begin if animated else self._stage("decode", begin, size=img.size)
+        variants: List[Tuple[int, str]] = []
+        for width in widths:
+            width = min(width, img.width)
+            if variants and variants[-1][0] == width:
                 continue
-            w_box = draw.textbbox((0, 0), line, font=font)
-            text_w = w_box[2] - w_box[0]
-            x = (img.width - text_w) // 2
-            y = y_start + i * (line_height + 4)
-            # outline
-            for dx in (-1, 0, 1):
-                for dy in (-1, 0, 1):
-                    if dx == 0 and dy == 0:
-                        continue
-                    draw.text((x + dx, y + dy), line, font=font, fill="black")
-            draw.text((x, y), line, font=font, fill="white")
-
-        out_path = os.path.join(
-            self.output_dir, f"meme_{random.randint(0, 1000000)}.jpg"
-        )
-        img.save(out_path)
-        return out_path
+            if animated:
+                path = self._make_animated(img, text, author, width, output_format)
+            else:
+                # Downscale from the previous, larger variant: fewer pixels
+                img = self._resize(img, width)
+                checkpoint = self._stage("resize", checkpoint, size=img.size)
+                path, checkpoint = self._render_still(
+                    img.copy(), text, author, output_format, checkpoint
+                )
+            variants.append((width, path))
+
+        if hooks:
+            hooks.emit(
+                "make_meme_variants", "end", time.perf_counter() - begin,
+                paths=[path for _width, path in variants],
+            )
+        return variants[::-1]
+
+    def overlay(self, text: str, author: str, width: int, height: int):
+        """Return a quote pre-rendered on a transparent image.
+
+        Args:
+            text: Quote body text.
+            author: Quote author.
+            width: Image width in pixels.
+            height: Image height in pixels.
+
+        Returns:
+            Image.Image: RGBA image of the given size holding only the text.
+        """
+
+        def render():
+            layout = self.layout(text, author, width, height)
+            # Transparent black: anti-aliased outline edges blend to black
+            overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+            self.draw_text(overlay, layout)
+            return overlay
+
+        return self.overlays.get((text, author, self.font, width, height), render)
+
+    @staticmethod
+    def _composite(img, overlay):
+        """Blend a text overlay onto an image of the same size."""
+        if img.mode == "RGBA":
+            return Image.alpha_composite(img, overlay)
+        if img.mode != "RGB":
+            has_alpha = "A" in img.getbands() or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+            if img.mode == "RGBA":
+                return Image.alpha_composite(img, overlay)
+        img.paste(overlay, (0, 0), overlay)
+        return img
+
+    def make_memes(
+        self,
+        jobs: Iterable[Tuple[Union[str, bytes], str, str]],
+        width: int = 500,
+        output_format: Optional[str] = None,
+    ) -> List[str]:
+        """Create many memes, rasterizing each repeated quote only once.
+
+        Jobs are grouped by quote. For a quote used more than once, the text
+        is drawn once per output size into a transparent overlay that is then
+        composited onto every image; other jobs go through make_meme.
+
+        Args:
+            jobs: (image, text, author) triples; see make_meme for images.
+            width: Maximum width for the output images in pixels.
+            output_format: Output format; defaults to the engine's.
+
+        Returns:
+            List[str]: Paths of the generated memes, in job order.
+
+        Raises:
+            RuntimeError: If Pillow is not available.
+            FileNotFoundError: If a source image file is not found.
+            ValueError: If image data cannot be decoded, the output format is
+                unknown, or an animation is too large.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is required for MemeEngine")
+        output_format = output_format or self.output_format
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        groups: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        for index, (img_path, text, author) in enumerate(jobs):
+            groups.setdefault((text, author), []).append((index, img_path))
+
+        hooks = self.hooks
+        count = sum(len(members) for members in groups.values())
+        if hooks:
+            hooks.emit("make_memes", "start", jobs=count, quotes=len(groups))
+        begin = time.perf_counter()
+
+        paths: List[Optional[str]] = [None] * count
+        for (text, author), members in groups.items():
+            if len(members) == 1:
+                index, img_path = members[0]
+                paths[index] = self.make_meme(
+                    img_path, text, author, width, output_format
+                )
+                continue
+            for index, img_path in members:
+                started = time.perf_counter()
+                img = self._open(img_path, width)
+                if self.animate and getattr(img, "is_animated", False):
+                    paths[index] = self._make_animated(
+                        img, text, author, width, output_format, started
+                    )
+                    continue
+                checkpoint = self._stage("decode", started, size=img.size)
+                img = self._resize(img, width)
+                checkpoint = self._stage("resize", checkpoint, size=img.size)
+                # Cached after the first member: layout and drawing cost nothing
+                overlay = self.overlay(text, author, img.width, img.height)
+                checkpoint = self._stage("layout", checkpoint)
+                img = self._composite(img, overlay)
+                checkpoint = self._stage("draw", checkpoint)
+                paths[index] = self._save(img, output_format)
+                size = os.path.getsize(paths[index]) if self.hooks else 0
+                self._stage("encode", checkpoint, bytes=size)
+
+        if hooks:
+            hooks.emit(
+                "make_memes", "end", time.perf_counter() - begin,
+                jobs=count, quotes=len(groups),
+            )
+        return paths
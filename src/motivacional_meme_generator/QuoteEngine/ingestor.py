@@ -5,8 +5,13 @@ to provide a unified interface for parsing different file types. It automaticall
 selects the appropriate ingestor based on the file extension.
 """
 
+import time
 from typing import List
 
+try:
+    from ..hooks import Hooks
+except ImportError:  # QuoteEngine imported as a top-level package by meme.py and app.py
+    from hooks import Hooks
 from .csv_ingestor import CSVIngestor
 from .docx_ingestor import DocxIngestor
 from .ingestor_interface import IngestorInterface
@@ -28,11 +33,16 @@ class Ingestor(IngestorInterface):
         - .docx (Microsoft Word documents)
         - .pdf (Portable Document Format)
 
+    Attributes:
+        hooks: Callbacks notified when a file is parsed (see hooks.py).
+
     Note:
         This class inherits from IngestorInterface but doesn't define
         allowed_extensions since it delegates to specific ingestors.
     """
 
+    hooks = Hooks()
+
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
         """Parse the file at path and return a list of QuoteModel objects.
@@ -57,9 +67,30 @@ class Ingestor(IngestorInterface):
         
         for ingestor in (TextIngestor, CSVIngestor, DocxIngestor, PDFIngestor):
             if ingestor.can_ingest(path):
+                hooks = cls.hooks
+                if hooks:
+                    info = {
+                        "path": path,
+                        "format": os.path.splitext(path)[1].lstrip(".").lower(),
+                        "bytes": os.path.getsize(path),
+                    }
+                    hooks.emit("parse", "start", **info)
+                started = time.perf_counter()
+                quotes = None
                 try:
-                    return ingestor.parse(path)
+                    quotes = ingestor.parse(path)
+                    return quotes
                 except Exception as e:
                     raise ValueError(f"Failed to parse {path} with {ingestor.__name__}: {e}") from e
+                finally:
+                    if hooks:
+                        count = None if quotes is None else len(quotes)
+                        hooks.emit(
+                            "parse",
+                            "end",
+                            time.perf_counter() - started,
+                            quotes=count,
+                            **info,
+                        )
         
         raise ValueError(f"No available ingestor for file type: {path}")
@@ -12,6 +12,7 @@ import requests
 from flask import Flask, abort, flash, redirect, render_template, request, url_for
 
 from MemeEngine import MemeEngine
+from photo_manifest import load_manifest
 from QuoteEngine.ingestor import Ingestor
 
 # Configure Flask to serve static files from the parent directory
@@ -55,15 +56,7 @@ def setup():
     images_path = os.path.join(script_dir, "_data/photos/dog/")
     imgs = []
     if os.path.exists(images_path):
-        for root, _dirs, files in os.walk(images_path):
-            for name in files:
-                # skip Windows ADS artifacts and non-image files
-                if ":" in name:
-                    continue
-                lower = name.lower()
-                if not lower.endswith((".jpg", ".jpeg", ".png", ".gif")):
-                    continue
-                imgs.append(os.path.join(root, name))
+        imgs = list(load_manifest(images_path).paths)
         print(f"✓ Found {len(imgs)} images")
     else:
         print(f"⚠ Images directory not found: {images_path}")
@@ -0,0 +1,533 @@
+"""Asynchronous (ASGI) web interface for the Motivacional Meme Generator.
+
+This module provides create_asgi_app, an asyncio counterpart of
+web.create_app with the same routes and templates. Image downloads go
+through an async HTTP client and rendering runs in an executor, so a slow
+image host only holds a coroutine instead of a worker thread and one process
+can keep hundreds of uploads in flight. It needs the optional httpx package,
+and an ASGI server such as uvicorn to run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import mimetypes
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from jinja2 import Environment, FileSystemLoader, pass_context, select_autoescape
+from werkzeug.http import parse_etags, parse_range_header, quote_etag
+
+from . import metrics
+from .fetch import AsyncImageFetcher
+from .http_cache import IMMUTABLE_CACHE_CONTROL
+from .render_pool import RenderQueueFull
+from .services import (
+    PAGE_WIDTH,
+    MemeServices,
+    RenderJob,
+    Variants,
+    fetch_error_message,
+    load_config,
+    parse_render_jobs,
+)
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Endpoint names used by url_for() in the templates
+ROUTE_URLS = {"meme_rand": "/", "meme_form": "/create", "meme_post": "/create"}
+
+# Largest form body accepted on POST /create
+MAX_FORM_BYTES = 64 * 1024
+
+# Largest JSON body accepted on POST /api/memes
+MAX_JSON_BYTES = 256 * 1024
+
+
+@pass_context
+def _get_flashed_messages(context, with_categories: bool = False) -> list:
+    """Template helper mirroring Flask's get_flashed_messages."""
+    flashes = context.get("flashes", [])
+    if with_categories:
+        return list(flashes)
+    return [message for _category, message in flashes]
+
+
+class MemeASGIApp:
+    """ASGI application serving the meme generator routes.
+
+    Attributes:
+        services: Corpus, rendering and download components.
+        templates: Jinja environment loading the shared HTML templates.
+    """
+
+    def __init__(self, services: MemeServices) -> None:
+        """Initialize the application around a set of services.
+
+        Args:
+            services: Corpus, rendering and download components.
+        """
+        self.services = services
+        self.templates = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.templates.globals["url_for"] = lambda endpoint, **_: ROUTE_URLS[endpoint]
+        self.templates.globals["get_flashed_messages"] = _get_flashed_messages
+        self._fetcher: Optional[AsyncImageFetcher] = None
+
+    @property
+    def fetcher(self) -> AsyncImageFetcher:
+        """Async HTTP client, created inside the running event loop."""
+        if self._fetcher is None:
+            config = self.services.config
+            self._fetcher = AsyncImageFetcher(
+                max_bytes=config["MEME_FETCH_MAX_BYTES"],
+                timeout=config["MEME_FETCH_TIMEOUT"],
+                pool_size=config["MEME_FETCH_POOL_SIZE"],
+            )
+        return self._fetcher
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        """Handle one ASGI connection."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        try:
+            if path == "/" and method == "GET":
+                await self.meme_rand(scope, send)
+            elif path == "/create" and method == "GET":
+                await self.meme_form(send)
+            elif path == "/create" and method == "POST":
+                await self.meme_post(scope, receive, send)
+            elif path == "/api/memes" and method == "POST":
+                await self.api_memes(receive, send)
+            elif path == "/metrics" and method == "GET":
+                await self._send(
+                    send, 200, metrics.REGISTRY.expose().encode("utf-8"),
+                    metrics.CONTENT_TYPE,
+                )
+            elif path == "/stats" and method == "GET":
+                await self._send(
+                    send, 200, json.dumps(self.services.stats()), "application/json"
+                )
+            elif path.startswith("/memes/") and method == "GET":
+                await self.meme_file(path[len("/memes/"):], scope, send)
+            elif path.startswith("/static/") and method == "GET":
+                await self.static(path[len("/static/"):], send)
+            else:
+                await self._send(send, 404, "Not Found", "text/plain")
+        except RenderQueueFull as e:
+            await self._send(
+                send,
+                503,
+                "Server busy, please retry shortly",
+                "text/plain",
+                [("Retry-After", str(e.retry_after))],
+            )
+
+    async def _lifespan(self, receive, send) -> None:
+        """Answer lifespan events, releasing resources on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and stop the background services."""
+        if self._fetcher is not None:
+            await self._fetcher.aclose()
+            self._fetcher = None
+        self.services.close()
+
+    @staticmethod
+    async def _send(
+        send,
+        status: int,
+        body: Union[str, bytes],
+        content_type: str,
+        headers: Iterable[Tuple[str, str]] = (),
+    ) -> None:
+        """Send a complete response."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+            content_type = f"{content_type}; charset=utf-8"
+        raw_headers = [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        raw_headers += [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ]
+        await send(
+            {"type": "http.response.start", "status": status, "headers": raw_headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _render_page(
+        self,
+        send,
+        template: str,
+        status: int = 200,
+        headers: Iterable[Tuple[str, str]] = (),
+        **context,
+    ) -> None:
+        """Render one of the HTML templates and send it."""
+        html = self.templates.get_template(template).render(**context)
+        await self._send(send, status, html, "text/html", headers)
+
+    @staticmethod
+    def _accept(scope: dict) -> Optional[str]:
+        """Return the Accept header of a request, if any."""
+        for key, value in scope.get("headers", []):
+            if key.lower() == b"accept":
+                return value.decode("latin-1")
+        return None
+
+    async def _render(
+        self,
+        img: Union[str, bytes],
+        body: str,
+        author: str,
+        output_format: Optional[str] = None,
+    ) -> str:
+        """Render a meme without blocking the event loop.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        executor = self.services.executor
+        if executor is not None:
+            path, _started, _finished, _metrics = await asyncio.wrap_future(
+                executor.submit(img, body, author, output_format=output_format)
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    self.services.meme_engine.make_meme,
+                    img,
+                    body,
+                    author,
+                    output_format=output_format,
+                ),
+            )
+        self.services.rendered(path)
+        return path
+
+    async def _render_variants(
+        self,
+        img: Union[str, bytes],
+        body: str,
+        author: str,
+        output_format: Optional[str] = None,
+    ) -> Variants:
+        """Render a page's meme variants without blocking the event loop.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        widths = self.services.output_widths
+        if not widths:
+            path = await self._render(img, body, author, output_format)
+            return [(PAGE_WIDTH, path)]
+        executor = self.services.executor
+        if executor is not None:
+            variants, _started, _finished, _metrics = await asyncio.wrap_future(
+                executor.submit(
+                    img, body, author, output_format=output_format, widths=widths
+                )
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            variants = await loop.run_in_executor(
+                None,
+                self.services.meme_engine.make_meme_variants,
+                img,
+                body,
+                author,
+                widths,
+                output_format,
+            )
+        for _width, path in variants:
+            self.services.rendered(path)
+        return variants
+
+    async def _download(self, url: str) -> bytes:
+        """Return the image at url, from the cache or over async HTTP."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            data = await self._fetch(url)
+            outcome = "ok"
+            return data
+        finally:
+            metrics.IMAGE_DOWNLOAD_SECONDS.observe(
+                time.perf_counter() - started, outcome=outcome
+            )
+
+    async def _fetch(self, url: str) -> bytes:
+        """Get the image at url through the cache; see _download."""
+        cache = self.services.image_cache
+        loop = asyncio.get_running_loop()
+        data, stale = await loop.run_in_executor(None, cache.cached, url)
+        if data is not None:
+            return data
+        result = await self.fetcher.get(url, headers=cache.validators(stale))
+        # Resizing the download is CPU work: keep it off the event loop
+        return await loop.run_in_executor(None, cache.complete, url, stale, result)
+
+    async def _read_body(self, receive, send, limit: int) -> Optional[bytes]:
+        """Read a request body, answering 413 if it is larger than limit.
+
+        Returns:
+            Optional[bytes]: The body, or None if a 413 response was sent.
+        """
+        raw = bytearray()
+        while True:
+            message = await receive()
+            raw.extend(message.get("body", b""))
+            if len(raw) > limit:
+                await self._send(send, 413, "Request Entity Too Large", "text/plain")
+                return None
+            if not message.get("more_body", False):
+                return bytes(raw)
+
+    async def _render_job(self, job: RenderJob, inline: bool) -> dict:
+        """Download, render and describe one JSON API job.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        try:
+            if job.image is None:
+                image = self.services.job_image(job)
+            else:
+                image = await self._download(job.image)
+        except LookupError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": fetch_error_message(e)}
+        try:
+            path = await self._render(image, job.body, job.author, job.output_format)
+        except RenderQueueFull:
+            raise
+        except Exception as e:
+            return {"error": f"Error generating meme: {e}"}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.services.api_result, path, inline
+        )
+
+    async def api_memes(self, receive, send) -> None:
+        """Render one or many memes from a JSON request; see web.api_memes."""
+        raw = await self._read_body(receive, send, MAX_JSON_BYTES)
+        if raw is None:
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            payload = None
+        try:
+            jobs = parse_render_jobs(
+                payload,
+                self.services.config["MEME_API_MAX_BATCH"],
+                self.services.output_formats,
+            )
+        except ValueError as e:
+            await self._send(
+                send, 400, json.dumps({"error": str(e)}), "application/json"
+            )
+            return
+        inline = bool(payload.get("inline"))
+        # All jobs run at once: downloads overlap and renders fan out
+        tasks = [asyncio.ensure_future(self._render_job(job, inline)) for job in jobs]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # Like render_batch: drop the renders this batch already queued
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        await self._send(
+            send, 200, json.dumps({"memes": results}), "application/json"
+        )
+
+    async def meme_rand(self, scope: dict, send) -> None:
+        """Generate a random meme and render it."""
+        output_format = self.services.negotiate_format(self._accept(scope))
+        variants = self.services.pop_prerendered(output_format)
+        if variants is None:
+            try:
+                img, quote = self.services.pick_random()
+            except LookupError:
+                await self._send(send, 500, "Resources not available", "text/plain")
+                return
+            variants = await self._render_variants(
+                img, quote.body, quote.author, output_format
+            )
+        await self._render_page(
+            send,
+            "meme.html",
+            headers=[("Vary", "Accept")],
+            **self.services.page_image(variants),
+        )
+
+    async def meme_form(self, send, flashes: Optional[list] = None) -> None:
+        """Display the form, with error messages if any."""
+        status = 400 if flashes else 200
+        await self._render_page(send, "meme_form.html", status, flashes=flashes or [])
+
+    async def meme_post(self, scope: dict, receive, send) -> None:
+        """Create a user defined meme from form data."""
+        raw = await self._read_body(receive, send, MAX_FORM_BYTES)
+        if raw is None:
+            return
+        form = {k: v[0] for k, v in parse_qs(raw.decode("utf-8", "replace")).items()}
+        image_url = form.get("image_url")
+        body = form.get("body")
+        author = form.get("author")
+
+        # Basic validation
+        if not image_url:
+            await self.meme_form(send, [("danger", "Image URL is required")])
+            return
+        if not body or not author:
+            await self.meme_form(
+                send, [("danger", "Both quote body and author are required")]
+            )
+            return
+
+        try:
+            image_data = await self._download(image_url)
+        except Exception as e:
+            await self.meme_form(send, [("danger", fetch_error_message(e))])
+            return
+
+        output_format = self.services.negotiate_format(self._accept(scope))
+        try:
+            variants = await self._render_variants(
+                image_data, body, author, output_format
+            )
+        except RenderQueueFull:
+            raise
+        except Exception as e:
+            await self.meme_form(send, [("danger", f"Error generating meme: {e}")])
+            return
+        await self._render_page(
+            send,
+            "meme.html",
+            headers=[("Vary", "Accept")],
+            **self.services.page_image(variants),
+        )
+
+    async def meme_file(self, name: str, scope: dict, send) -> None:
+        """Serve a generated meme with long-lived caching headers.
+
+        Answers If-None-Match with 304 and a single byte range with 206,
+        like the Flask route of the same name.
+        """
+        path = self.services.meme_file(name)
+        if path is None:
+            await self._send(send, 404, "Not Found", "text/plain")
+            return
+        loop = asyncio.get_running_loop()
+        etag = quote_etag(
+            await loop.run_in_executor(None, self.services.etags.etag, path)
+        )
+        self.services.served(path)
+        request_headers = {
+            key.decode("latin-1").lower(): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", IMMUTABLE_CACHE_CONTROL),
+            ("Accept-Ranges", "bytes"),
+        ]
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+        if parse_etags(request_headers.get("if-none-match")).contains_weak(etag[1:-1]):
+            await self._send(send, 304, b"", content_type, headers)
+            return
+
+        data = await loop.run_in_executor(None, Path(path).read_bytes)
+        ranges = None
+        if request_headers.get("if-range", etag) == etag:
+            ranges = parse_range_header(request_headers.get("range"))
+        # Multipart byte ranges are not worth supporting: send the whole file
+        if ranges is None or len(ranges.ranges) != 1:
+            await self._send(send, 200, data, content_type, headers)
+            return
+        span = ranges.range_for_length(len(data))
+        if span is None:
+            headers.append(("Content-Range", f"bytes */{len(data)}"))
+            await self._send(send, 416, b"", content_type, headers)
+            return
+        start, stop = span
+        headers.append(("Content-Range", f"bytes {start}-{stop - 1}/{len(data)}"))
+        await self._send(send, 206, data[start:stop], content_type, headers)
+
+    async def static(self, name: str, send) -> None:
+        """Serve a generated meme from the static directory."""
+        path = self.services.meme_file(name)
+        if path is None:
+            await self._send(send, 404, "Not Found", "text/plain")
+            return
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, Path(path).read_bytes)
+        self.services.served(path)
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        await self._send(send, 200, data, content_type)
+
+
+def create_asgi_app(
+    data_dir: str = None, static_dir: str = None, config: dict = None
+) -> MemeASGIApp:
+    """Create the ASGI application.
+
+    Args:
+        data_dir: Directory containing quotes and images data.
+        static_dir: Directory for static files (generated memes).
+        config: Overrides for the MEME_* settings in DEFAULT_CONFIG.
+
+    Returns:
+        MemeASGIApp: Configured ASGI application.
+    """
+    return MemeASGIApp(MemeServices(load_config(config), data_dir, static_dir))
+
+
+def main():
+    """Main entry point for the asynchronous web application."""
+    try:
+        import uvicorn  # Local import to keep optional dependency
+    except ImportError as exc:
+        raise RuntimeError("uvicorn is required to run the ASGI app") from exc
+
+    host = os.environ.get('FLASK_HOST', '127.0.0.1')
+    port = int(os.environ.get('FLASK_PORT', 5000))
+
+    print(f"🌐 Starting Motivacional Meme Generator Async Web Interface")
+    print(f"📍 Server: http://{host}:{port}")
+
+    uvicorn.run(create_asgi_app(), host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,19 @@ This module provides a CLI interface for generating memes from the command line.
 """
 
 import argparse
+import cProfile
+import json
 import os
 import random
 import sys
 from pathlib import Path
 from typing import Optional
 
+from .hooks import EventRecorder
 from .QuoteEngine import Ingestor, QuoteModel
 from .MemeEngine import MemeEngine
+from .photo_manifest import load_manifest
+from .prep import DEFAULT_PREP_DIR, prepare_library
 
 
 def load_quotes(data_dir: str = None) -> list[QuoteModel]:
@@ -59,6 +64,9 @@ def load_quotes(data_dir: str = None) -> list[QuoteModel]:
 def load_images(data_dir: str = None) -> list[str]:
     """Load image file paths from the data directory.
     
+    Paths come from the persisted photo manifest, which only rescans what
+    changed since the last run.
+    
     Args:
         data_dir: Directory containing image files. If None, uses package data.
         
@@ -70,27 +78,67 @@ def load_images(data_dir: str = None) -> list[str]:
         package_dir = Path(__file__).parent
         data_dir = str(package_dir / "_data")
     
-    images = []
     photos_dir = f"{data_dir}/photos"
+    if not os.path.exists(photos_dir):
+        return []
+    return list(load_manifest(photos_dir).paths)
+
+
+def prepare_photos(
+    data_dir: str = None,
+    widths: Optional[list[int]] = None,
+    prep_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """Prepare the photo library for fast rendering (see prep.py).
+    
+    Args:
+        data_dir: Directory containing image files. If None, uses package data.
+        widths: Widths to pre-scale to. If None, the page width and the
+            widths of MEME_OUTPUT_WIDTHS.
+        prep_dir: Where prepared copies are written. If None, MEME_PREP_DIR.
+        workers: Processes preparing photos. If None, one per CPU.
+        
+    Returns:
+        int: Number of photos prepared in this run.
+    """
+    # The web configuration is only needed by this command
+    from .services import PAGE_WIDTH, load_config
     
-    if os.path.exists(photos_dir):
-        for root, _dirs, files in os.walk(photos_dir):
-            for name in files:
-                # Skip Windows ADS artifacts and non-image files
-                if ":" in name:
-                    continue
-                lower = name.lower()
-                if lower.endswith((".jpg", ".jpeg", ".png", ".gif", ".bmp")):
-                    images.append(os.path.join(root, name))
-    
-    return images
+    if data_dir is None:
+        data_dir = str(Path(__file__).parent / "_data")
+    config = load_config()
+    if widths is None:
+        configured = config["MEME_OUTPUT_WIDTHS"].split(",")
+        widths = [PAGE_WIDTH] + [int(w) for w in configured if w.strip()]
+    prep_dir = prep_dir or config["MEME_PREP_DIR"] or DEFAULT_PREP_DIR
+    
+    prepared, current = prepare_library(
+        f"{data_dir}/photos", widths, prep_dir, workers
+    )
+    print(
+        f"✓ Prepared {prepared} photos at widths {sorted(set(widths))} "
+        f"({current} already up to date) in {prep_dir}"
+    )
+    return prepared
 
 
-def generate_random_meme(output_dir: str = "./static") -> str:
+def generate_random_meme(
+    output_dir: str = "./static",
+    quotes: Optional[list[QuoteModel]] = None,
+    images: Optional[list[str]] = None,
+    meme_engine: Optional[MemeEngine] = None,
+) -> str:
     """Generate a random meme using random quote and image.
     
+    Pass quotes, images and meme_engine when generating many memes, so that
+    the data files are parsed and the engine is built only once.
+    
     Args:
         output_dir: Directory to save the generated meme.
+        quotes: Quotes to choose from. If None, loads them from package data.
+        images: Image paths to choose from. If None, loads them from package data.
+        meme_engine: Engine to render with. If None, creates one for output_dir.
         
     Returns:
         str: Path to the generated meme file.
@@ -98,8 +146,10 @@ def generate_random_meme(output_dir: str = "./static") -> str:
     Raises:
         ValueError: If no quotes or images are available.
     """
-    quotes = load_quotes()
-    images = load_images()
+    if quotes is None:
+        quotes = load_quotes()
+    if images is None:
+        images = load_images()
     
     if not quotes:
         raise ValueError("No quotes available")
@@ -112,7 +162,8 @@ def generate_random_meme(output_dir: str = "./static") -> str:
     print(f"Selected quote: {quote}")
     print(f"Selected image: {os.path.basename(image)}")
     
-    meme_engine = MemeEngine(output_dir)
+    if meme_engine is None:
+        meme_engine = MemeEngine(output_dir)
     meme_path = meme_engine.make_meme(image, quote.body, quote.author)
     
     print(f"Generated meme: {meme_path}")
@@ -129,6 +180,10 @@ Examples:
   %(prog)s                          # Generate random meme
   %(prog)s --output ./memes          # Save to custom directory
   %(prog)s --quote "Hello World" --author "Test" --image ./photo.jpg
+  %(prog)s --count 20 --profile cli.prof   # Profile a batch of 20 memes
+  %(prog)s --count 20 --trace trace.json   # Trace render stages (Perfetto)
+  %(prog)s prep                     # Pre-scale the photo library
+  %(prog)s prep --widths 320,640 --workers 4
         """
     )
     
@@ -158,13 +213,67 @@ Examples:
         help="Directory containing quotes and images data"
     )
     
+    parser.add_argument(
+        "--count", "-n",
+        type=int,
+        default=1,
+        help="Number of random memes to generate (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile statistics of the run to FILE (read with pstats)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a Chrome trace of parse and render stages to FILE"
+    )
+    
+    subcommands = parser.add_subparsers(dest="command", metavar="{prep}")
+    prep_parser = subcommands.add_parser(
+        "prep",
+        help="Store oriented, pre-scaled copies of the photos for fast rendering"
+    )
+    prep_parser.add_argument(
+        "--widths",
+        help="Comma-separated widths (default: 500 and MEME_OUTPUT_WIDTHS)"
+    )
+    prep_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes (default: one per CPU)"
+    )
+    prep_parser.add_argument(
+        "--prep-dir",
+        help="Directory for the prepared copies (default: MEME_PREP_DIR)"
+    )
+    
     args = parser.parse_args()
     
+    recorder = None
+    if args.trace:
+        recorder = EventRecorder()
+        MemeEngine.hooks.add(recorder)
+        Ingestor.hooks.add(recorder)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    
     try:
         # Create output directory
-        os.makedirs(args.output, exist_ok=True)
+        if args.command != "prep":
+            os.makedirs(args.output, exist_ok=True)
         
-        if args.quote and args.author:
+        if args.command == "prep":
+            widths = None
+            if args.widths:
+                widths = [int(w) for w in args.widths.split(",") if w.strip()]
+            prepare_photos(args.data_dir, widths, args.prep_dir, args.workers)
+        
+        elif args.quote and args.author:
             # Custom quote provided
             if not args.image:
                 raise ValueError("Image file required when using custom quote")
@@ -179,14 +288,19 @@ Examples:
             print(f"🎉 Custom meme generated: {meme_path}")
             
         else:
-            # Generate random meme
-            meme_path = generate_random_meme(args.output)
+            # Generate random memes; load data and engine once, so a profiled
+            # batch measures rendering rather than parsing
+            quotes = load_quotes(args.data_dir)
+            images = load_images(args.data_dir)
+            meme_engine = MemeEngine(args.output)
+            for _ in range(args.count):
+                meme_path = generate_random_meme(
+                    args.output, quotes, images, meme_engine
+                )
             print(f"\n🎉 Success! Your motivational meme has been generated!")
             print(f"📁 File location: {meme_path}")
             
             # Show some statistics
-            quotes = load_quotes(args.data_dir)
-            images = load_images(args.data_dir)
             print(f"\n📊 Statistics:")
             print(f"   • Total quotes loaded: {len(quotes)}")
             print(f"   • Total images available: {len(images)}")
@@ -194,6 +308,17 @@ Examples:
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"✓ Profile written to {args.profile} (python -m pstats {args.profile})")
+        if recorder is not None:
+            MemeEngine.hooks.remove(recorder)
+            Ingestor.hooks.remove(recorder)
+            with open(args.trace, "w", encoding="utf-8") as f:
+                json.dump(recorder.chrome_trace(), f)
+            print(f"✓ Trace of {len(recorder.events)} events written to {args.trace}")
 
 
 if __name__ == "__main__":
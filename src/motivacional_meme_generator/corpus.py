@@ -0,0 +1,261 @@
+"""Quote and image corpus with incremental, file-watching reloads.
+
+This module provides the Corpus class, which keeps the quotes and image paths
+used by the web application in an immutable snapshot, and the CorpusWatcher
+thread, which polls the data files for changes and refreshes the corpus in the
+background. Only files whose modification time or size changed are parsed
+again, images come from an incrementally refreshed PhotoManifest, and
+readers never need a lock: a refresh builds a new snapshot and
+swaps it in with a single attribute assignment. preload_corpus loads a
+corpus once in the master of a prefork server, and load_corpus hands that
+same corpus to every application built afterwards, in the workers too.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .photo_manifest import DEFAULT_MANIFEST_DIR, PhotoManifest, default_manifest_path
+from .QuoteEngine import Ingestor, QuoteModel
+
+QUOTE_EXTENSIONS = (".txt", ".csv", ".docx", ".pdf")
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int]:
+    """Return the (mtime_ns, size) pair used to detect file changes."""
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """Immutable view of the corpus at one point in time.
+
+    Attributes:
+        quotes: All quotes loaded from the quote files.
+        images: Paths of all images found in the image directory.
+        version: Incremented every time a refresh changes the corpus.
+    """
+
+    quotes: Tuple[QuoteModel, ...] = ()
+    images: Tuple[str, ...] = ()
+    version: int = 0
+
+
+class Corpus:
+    """Quotes and images loaded from disk, refreshed incrementally.
+
+    Quote sources may be files or directories; directories contribute every
+    supported quote file they contain, so dropping a new file into them is
+    enough to have it picked up by the next refresh.
+
+    Attributes:
+        quote_paths: Quote files or directories containing quote files.
+        images_dir: Directory searched recursively for images.
+        photos: Persisted manifest of the images (see photo_manifest.py).
+
+    Example:
+        corpus = Corpus(["./_data/DogQuotes"], "./_data/photos/dog")
+        quotes = corpus.snapshot.quotes
+    """
+
+    def __init__(
+        self,
+        quote_paths: Sequence[str],
+        images_dir: str,
+        manifest_dir: Optional[str] = DEFAULT_MANIFEST_DIR,
+    ) -> None:
+        """Initialize the corpus and load it for the first time.
+
+        Args:
+            quote_paths: Quote files or directories containing quote files.
+            images_dir: Directory searched recursively for images.
+            manifest_dir: Directory the photo manifest is saved in, or None
+                to keep it in memory.
+        """
+        self.quote_paths = list(quote_paths)
+        self.images_dir = images_dir
+        self._quote_cache: Dict[str, Tuple[Tuple[int, int], List[QuoteModel]]] = {}
+        self.photos = PhotoManifest(
+            images_dir,
+            default_manifest_path(images_dir, manifest_dir) if manifest_dir else None,
+        )
+        self._refresh_lock = threading.Lock()
+        self.snapshot = CorpusSnapshot()
+        self.refresh()
+
+    def _quote_files(self) -> List[str]:
+        """Expand the configured quote paths into a list of quote files."""
+        files = []
+        for path in self.quote_paths:
+            if os.path.isdir(path):
+                for name in sorted(os.listdir(path)):
+                    # Skip Windows ADS artifacts and unsupported files
+                    if ":" in name or not name.lower().endswith(QUOTE_EXTENSIONS):
+                        continue
+                    files.append(os.path.join(path, name))
+            elif os.path.exists(path):
+                files.append(path)
+            else:
+                print(f"⚠ File not found: {path}")
+        return files
+
+    def _refresh_quotes(self) -> Tuple[List[QuoteModel], bool]:
+        """Re-parse quote files whose stamp changed since the last refresh.
+
+        Returns:
+            tuple: The full list of quotes and whether anything changed.
+        """
+        changed = False
+        seen = set()
+        quotes: List[QuoteModel] = []
+        for path in self._quote_files():
+            seen.add(path)
+            try:
+                stamp = _stamp(os.stat(path))
+            except OSError:
+                continue
+            cached = self._quote_cache.get(path)
+            if cached is None or cached[0] != stamp:
+                changed = True
+                try:
+                    parsed = Ingestor.parse(path)
+                    print(f"✓ Loaded quotes from {os.path.basename(path)}")
+                except Exception as e:
+                    print(f"⚠ Failed to load {os.path.basename(path)}: {e}")
+                    parsed = []
+                cached = (stamp, parsed)
+                self._quote_cache[path] = cached
+            quotes.extend(cached[1])
+
+        for path in set(self._quote_cache) - seen:
+            del self._quote_cache[path]
+            changed = True
+
+        return quotes, changed
+
+    def _refresh_images(self) -> Tuple[List[str], bool]:
+        """Refresh the photo manifest.
+
+        Returns:
+            tuple: The full list of image paths and whether anything changed.
+        """
+        changed = self.photos.refresh()
+        return list(self.photos.paths), changed
+
+    def refresh(self) -> bool:
+        """Reload changed files and atomically publish a new snapshot.
+
+        Returns:
+            bool: True if the corpus changed, False otherwise.
+        """
+        with self._refresh_lock:
+            quotes, quotes_changed = self._refresh_quotes()
+            images, images_changed = self._refresh_images()
+            if not (quotes_changed or images_changed):
+                return False
+            self.snapshot = CorpusSnapshot(
+                quotes=tuple(quotes),
+                images=tuple(images),
+                version=self.snapshot.version + 1,
+            )
+            print(f"✓ Corpus now has {len(quotes)} quotes and {len(images)} images")
+            return True
+
+
+class CorpusWatcher(threading.Thread):
+    """Background thread that polls a corpus for file changes.
+
+    Attributes:
+        corpus: Corpus refreshed by this watcher.
+        interval: Seconds to wait between two polls.
+    """
+
+    def __init__(self, corpus: Corpus, interval: float = 2.0) -> None:
+        """Initialize the watcher as a daemon thread.
+
+        Args:
+            corpus: Corpus refreshed by this watcher.
+            interval: Seconds to wait between two polls.
+        """
+        super().__init__(name="corpus-watcher", daemon=True)
+        self.corpus = corpus
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Poll the corpus until stop() is called."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.corpus.refresh()
+            except Exception as e:
+                print(f"⚠ Corpus refresh failed: {e}")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the watcher to stop and wait for it to finish.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the thread.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+# Corpora loaded before forking, by (quote paths, images directory)
+_preloaded: Dict[Tuple[Tuple[str, ...], str], Corpus] = {}
+
+
+def _corpus_key(
+    quote_paths: Sequence[str], images_dir: str
+) -> Tuple[Tuple[str, ...], str]:
+    """Return the key of a corpus, however its paths are spelled."""
+    return tuple(os.path.abspath(p) for p in quote_paths), os.path.abspath(images_dir)
+
+
+def preload_corpus(
+    quote_paths: Sequence[str],
+    images_dir: str,
+    manifest_dir: Optional[str] = DEFAULT_MANIFEST_DIR,
+) -> Corpus:
+    """Load a corpus that later load_corpus calls for the same paths reuse.
+
+    Meant for the master process of a prefork server: workers forked
+    afterwards share the loaded quotes with the master instead of each
+    parsing its own copy.
+
+    Args:
+        quote_paths: Quote files or directories containing quote files.
+        images_dir: Directory searched recursively for images.
+        manifest_dir: Directory the photo manifest is saved in.
+
+    Returns:
+        Corpus: The loaded corpus.
+    """
+    corpus = Corpus(quote_paths, images_dir, manifest_dir)
+    _preloaded[_corpus_key(quote_paths, images_dir)] = corpus
+    return corpus
+
+
+def load_corpus(
+    quote_paths: Sequence[str],
+    images_dir: str,
+    manifest_dir: Optional[str] = DEFAULT_MANIFEST_DIR,
+) -> Corpus:
+    """Return the preloaded corpus for these paths, or load a new one.
+
+    Args:
+        quote_paths: Quote files or directories containing quote files.
+        images_dir: Directory searched recursively for images.
+        manifest_dir: Directory the photo manifest of a new corpus is
+            saved in.
+
+    Returns:
+        Corpus: The shared preloaded corpus, or a corpus of its own.
+    """
+    corpus = _preloaded.get(_corpus_key(quote_paths, images_dir))
+    if corpus is None:
+        corpus = Corpus(quote_paths, images_dir, manifest_dir)
+    return corpus
@@ -0,0 +1,247 @@
+"""Download of user-supplied images over a shared, pooled HTTP session.
+
+This module provides the ImageFetcher class used by the web interface to
+download images for custom memes. Connections are reused through one
+requests.Session, bodies are streamed with a hard size limit, and the first
+bytes are sniffed so that anything that is not an image is rejected before
+the rest of it is downloaded.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Magic numbers of the image formats MemeEngine can read
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLarge(ValueError):
+    """Raised when a download exceeds the configured maximum size."""
+
+
+class UnsupportedImageType(ValueError):
+    """Raised when a download does not look like a supported image."""
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Identify an image format from its first bytes.
+
+    Args:
+        head: The first bytes of the file (at least 12 are recommended).
+
+    Returns:
+        Optional[str]: MIME type of the image, or None if not recognized.
+    """
+    for signature, mime in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a (possibly conditional) image download.
+
+    Attributes:
+        status: HTTP status code of the response.
+        body: The image, or None for a 304 Not Modified response.
+        etag: ETag header of the response, if any.
+        last_modified: Last-Modified header of the response, if any.
+    """
+
+    status: int
+    body: Optional[bytes]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class _BodyReader:
+    """Accumulate a streamed body while enforcing size and type limits."""
+
+    def __init__(self, max_bytes: int, content_length: Optional[str]) -> None:
+        """Reject the body up front if its declared length is too large."""
+        self.max_bytes = max_bytes
+        self.body = bytearray()
+        if (
+            content_length
+            and content_length.isdigit()
+            and int(content_length) > max_bytes
+        ):
+            raise ImageTooLarge(f"Image is larger than {max_bytes} bytes")
+
+    def feed(self, chunk: bytes) -> None:
+        """Append one chunk, failing as soon as a limit is violated."""
+        # Check the signature once enough bytes have arrived
+        if len(self.body) < 12 <= len(self.body) + len(chunk):
+            if sniff_image_type(bytes(self.body + chunk[:12])) is None:
+                raise UnsupportedImageType("URL does not point to a supported image")
+        self.body.extend(chunk)
+        if len(self.body) > self.max_bytes:
+            raise ImageTooLarge(f"Image is larger than {self.max_bytes} bytes")
+
+    def finish(self) -> bytes:
+        """Return the complete body once it is known to be an image."""
+        if sniff_image_type(bytes(self.body[:12])) is None:
+            raise UnsupportedImageType("URL does not point to a supported image")
+        return bytes(self.body)
+
+
+class ImageFetcher:
+    """Stream images from URLs with connection pooling and a size cap.
+
+    Attributes:
+        max_bytes: Largest download accepted, in bytes.
+        timeout: Connect and read timeout in seconds.
+        session: Shared requests session holding the connection pool.
+
+    Example:
+        fetcher = ImageFetcher(max_bytes=5 * 1024 * 1024)
+        data = fetcher.fetch('https://example.com/dog.jpg')
+    """
+
+    def __init__(
+        self, max_bytes: int = 10 * 1024 * 1024, timeout: float = 5.0, pool_size: int = 10
+    ) -> None:
+        """Initialize the fetcher and its connection pool.
+
+        Args:
+            max_bytes: Largest download accepted, in bytes.
+            timeout: Connect and read timeout in seconds.
+            pool_size: Connections kept open per host.
+        """
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str, headers: Optional[dict] = None) -> FetchResult:
+        """Download an image, stopping as soon as a limit is violated.
+
+        Args:
+            url: URL of the image.
+            headers: Extra request headers, e.g. conditional ones.
+
+        Returns:
+            FetchResult: Status, body and cache validators of the response.
+
+        Raises:
+            requests.RequestException: If the request fails.
+            ImageTooLarge: If the body is larger than max_bytes.
+            UnsupportedImageType: If the body is not a supported image.
+        """
+        with self.session.get(
+            url, headers=headers, stream=True, timeout=self.timeout
+        ) as res:
+            etag = res.headers.get("ETag")
+            last_modified = res.headers.get("Last-Modified")
+            if res.status_code == 304:
+                return FetchResult(304, None, etag, last_modified)
+            res.raise_for_status()
+            reader = _BodyReader(self.max_bytes, res.headers.get("Content-Length"))
+            for chunk in res.iter_content(CHUNK_SIZE):
+                reader.feed(chunk)
+            return FetchResult(res.status_code, reader.finish(), etag, last_modified)
+
+    def fetch(self, url: str) -> bytes:
+        """Download an image unconditionally.
+
+        Args:
+            url: URL of the image.
+
+        Returns:
+            bytes: The complete image file.
+
+        Raises:
+            requests.RequestException: If the request fails.
+            ImageTooLarge: If the body is larger than max_bytes.
+            UnsupportedImageType: If the body is not a supported image.
+        """
+        return self.get(url).body
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+class AsyncImageFetcher:
+    """Asyncio counterpart of ImageFetcher built on httpx.
+
+    Attributes:
+        max_bytes: Largest download accepted, in bytes.
+        timeout: Connect and read timeout in seconds.
+        client: Shared httpx.AsyncClient holding the connection pool.
+    """
+
+    def __init__(
+        self, max_bytes: int = 10 * 1024 * 1024, timeout: float = 5.0, pool_size: int = 10
+    ) -> None:
+        """Initialize the fetcher and its connection pool.
+
+        Args:
+            max_bytes: Largest download accepted, in bytes.
+            timeout: Connect and read timeout in seconds.
+            pool_size: Idle connections kept open for reuse.
+
+        Raises:
+            RuntimeError: If httpx is not installed.
+        """
+        try:
+            import httpx  # Local import to keep optional dependency
+        except ImportError as exc:
+            raise RuntimeError("httpx is required for asynchronous downloads") from exc
+
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        # Only idle connections are capped: slow hosts must not queue others
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=None, max_keepalive_connections=pool_size
+            ),
+        )
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> FetchResult:
+        """Download an image without blocking the event loop.
+
+        Args:
+            url: URL of the image.
+            headers: Extra request headers, e.g. conditional ones.
+
+        Returns:
+            FetchResult: Status, body and cache validators of the response.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            ImageTooLarge: If the body is larger than max_bytes.
+            UnsupportedImageType: If the body is not a supported image.
+        """
+        async with self.client.stream("GET", url, headers=headers) as res:
+            etag = res.headers.get("ETag")
+            last_modified = res.headers.get("Last-Modified")
+            if res.status_code == 304:
+                return FetchResult(304, None, etag, last_modified)
+            res.raise_for_status()
+            reader = _BodyReader(self.max_bytes, res.headers.get("Content-Length"))
+            async for chunk in res.aiter_bytes(CHUNK_SIZE):
+                reader.feed(chunk)
+            return FetchResult(res.status_code, reader.finish(), etag, last_modified)
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.client.aclose()
@@ -0,0 +1,218 @@
+"""Font lookup: a persisted index of the system fonts and a bundled font.
+
+This module provides resolve_font, which turns a font given by name, such
+as 'arial.ttf' or 'DejaVuSans', into the path of a font file. Names are
+looked up in a FontIndex built by scanning the system font directories
+once; the index is saved as JSON and only rebuilt when one of the scanned
+directories changes, so engines started in every worker process do not
+each walk the font tree. Fonts that are not installed resolve to the
+bundled DejaVuSans, which is scalable like any TrueType font.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+try:
+    from .user_cache import make_private_dir, user_cache_dir
+except ImportError:  # imported as a top-level module by meme.py and app.py
+    from user_cache import make_private_dir, user_cache_dir
+
+# Scalable font shipped with the package (see _data/fonts/LICENSE.txt)
+BUNDLED_FONT = os.path.join(os.path.dirname(__file__), "_data", "fonts", "DejaVuSans.ttf")
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+DEFAULT_INDEX_PATH = user_cache_dir("font_index.json")
+
+
+def system_font_dirs() -> List[str]:
+    """Return the directories fonts are installed in on this platform."""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", "")
+        return [
+            os.path.join(windir, "Fonts"),
+            os.path.join(local, "Microsoft", "Windows", "Fonts"),
+        ]
+    if sys.platform == "darwin":
+        return [
+            "/System/Library/Fonts",
+            "/Library/Fonts",
+            os.path.join(home, "Library", "Fonts"),
+        ]
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(data_home, "fonts"),
+        os.path.join(home, ".fonts"),
+    ]
+
+
+class FontIndex:
+    """Font files by lowercase name, with and without extension.
+
+    The index records the modification time of every directory it scanned.
+    Installing or removing a font changes the time of its directory, which
+    makes the saved index stale and triggers a rescan on the next load.
+
+    Attributes:
+        path: JSON file the index is saved to, or None to keep it in memory.
+        dirs: Font directories scanned, recursively.
+        fonts: Path of each font file by lowercase name.
+
+    Example:
+        index = FontIndex()
+        path = index.find('Arial')
+    """
+
+    def __init__(
+        self, path: Optional[str] = DEFAULT_INDEX_PATH, dirs: Optional[List[str]] = None
+    ) -> None:
+        """Initialize an index; it is loaded or built on first use.
+
+        Args:
+            path: JSON file the index is saved to, or None to keep it in memory.
+            dirs: Font directories to scan; defaults to the system ones.
+        """
+        self.path = path
+        self.dirs = list(dirs) if dirs is not None else system_font_dirs()
+        self.fonts: Dict[str, str] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _fresh(self, mtimes: Dict[str, int]) -> bool:
+        """Return whether no scanned directory appeared, vanished or changed."""
+        for directory in self.dirs:
+            if os.path.isdir(directory) and directory not in mtimes:
+                return False
+        for directory, mtime in mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _indexed(self, path: str) -> bool:
+        """Return whether a path is a font file below a scanned directory."""
+        if os.path.splitext(path)[1].lower() not in FONT_EXTENSIONS:
+            return False
+        path = os.path.abspath(path)
+        for directory in self.dirs:
+            directory = os.path.abspath(directory)
+            try:
+                if os.path.commonpath([path, directory]) == directory:
+                    return True
+            except ValueError:  # e.g. on different drives
+                continue
+        return False
+
+    def _load(self) -> bool:
+        """Read the saved index; return whether it is usable.
+
+        An index naming files outside the scanned directories was not
+        written by scan() and is ignored.
+        """
+        if not self.path:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("dirs_scanned") != self.dirs or not self._fresh(saved["mtimes"]):
+                return False
+            if not all(self._indexed(path) for path in saved["fonts"].values()):
+                return False
+            self.fonts, self._mtimes = saved["fonts"], saved["mtimes"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def scan(self) -> None:
+        """Rebuild the index from the font directories and save it."""
+        fonts: Dict[str, str] = {}
+        mtimes: Dict[str, int] = {}
+        for root_dir in self.dirs:
+            if not os.path.isdir(root_dir):
+                continue
+            for directory, _subdirs, files in os.walk(root_dir):
+                try:
+                    mtimes[directory] = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                for name in sorted(files):
+                    stem, ext = os.path.splitext(name.lower())
+                    if ext not in FONT_EXTENSIONS:
+                        continue
+                    path = os.path.join(directory, name)
+                    # The first directory listed wins, like a search path
+                    fonts.setdefault(name.lower(), path)
+                    fonts.setdefault(stem, path)
+        self.fonts, self._mtimes = fonts, mtimes
+        self._loaded = True
+        if self.path:
+            self._save()
+
+    def _save(self) -> None:
+        """Write the index atomically; failures only cost a rescan later."""
+        saved = {"dirs_scanned": self.dirs, "mtimes": self._mtimes, "fonts": self.fonts}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            make_private_dir(os.path.dirname(os.path.abspath(self.path)))
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠ Could not save font index to {self.path}: {e}")
+
+    def find(self, name: str) -> Optional[str]:
+        """Return the path of an installed font.
+
+        Args:
+            name: File name or name without extension, in any case.
+
+        Returns:
+            Optional[str]: Path of the font file, or None if not installed.
+        """
+        with self._lock:
+            if not self._loaded:
+                if not self._load():
+                    self.scan()
+                self._loaded = True
+        key = os.path.basename(name).lower()
+        return self.fonts.get(key) or self.fonts.get(os.path.splitext(key)[0])
+
+
+_default_index: Optional[FontIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_index() -> FontIndex:
+    """Return the process-wide index of the system fonts."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = FontIndex()
+        return _default_index
+
+
+def resolve_font(font: str) -> str:
+    """Return the path of a font file given by path or by name.
+
+    Args:
+        font: Path to a font file, or the name of an installed font.
+
+    Returns:
+        str: The existing file, the installed font of that name, or
+            BUNDLED_FONT if there is none.
+    """
+    if os.path.isfile(font):
+        return font
+    return default_index().find(font) or BUNDLED_FONT
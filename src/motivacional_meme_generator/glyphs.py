@@ -0,0 +1,135 @@
+"""Glyph atlas text backend: draw meme text from cached glyph bitmaps.
+
+Drawing a TextLayout with ImageDraw.text rasterizes every line through
+FreeType nine times, once per outline offset and once for the fill. This
+module provides GlyphAtlas, which rasterizes each character of one font at
+one size only once, and draw_glyphs, which builds one coverage mask per
+line from the cached glyphs and pastes the outline and fill colors through
+it. Glyphs are placed by their advance without kerning, as Pillow's basic
+layout does, so the result matches the FreeType path pixel for pixel on
+typical quotes (see scripts/bench_text_backend.py).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Tuple
+
+try:
+    from .layout import TextLayout
+except ImportError:  # imported as a top-level module by meme.py and app.py
+    from layout import TextLayout
+
+try:
+    from PIL import Image, ImageChops, ImageDraw
+except Exception:  # Pillow is optional at import time
+    Image = ImageChops = ImageDraw = None
+
+# mask, left and top offset from the pen position, advance
+Glyph = Tuple[object, int, int, float]
+
+
+class GlyphAtlas:
+    """Rasterized glyphs of one font at one size, keyed by character.
+
+    Attributes:
+        font: The font glyphs are rasterized with.
+        hits: Number of glyph lookups answered from the atlas.
+        misses: Number of glyphs rasterized.
+
+    Example:
+        atlas = GlyphAtlas(ImageFont.truetype('DejaVuSans.ttf', 30))
+        mask, left, top = atlas.line_mask('Good boy')
+    """
+
+    def __init__(self, font) -> None:
+        """Initialize an empty atlas.
+
+        Args:
+            font: Font used to rasterize glyphs.
+        """
+        self.font = font
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._glyphs: Dict[str, Glyph] = {}
+
+    def glyph(self, char: str) -> Glyph:
+        """Return the coverage mask and metrics of one character.
+
+        Args:
+            char: A single character.
+
+        Returns:
+            Glyph: "L" mask, its left and top offset from the pen position,
+                and the pen advance in pixels.
+        """
+        glyph = self._glyphs.get(char)
+        if glyph is not None:
+            self.hits += 1
+            return glyph
+        font = self.font
+        left, top, right, bottom = font.getbbox(char)
+        mask = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+        ImageDraw.Draw(mask).text((-left, -top), char, font=font, fill=255)
+        glyph = (mask, left, top, font.getlength(char))
+        with self._lock:
+            self.misses += 1
+            return self._glyphs.setdefault(char, glyph)
+
+    def line_mask(self, text: str):
+        """Compose the coverage mask of one line of text.
+
+        Args:
+            text: The line to compose.
+
+        Returns:
+            tuple: "L" mask of the line, and the left and top offset of the
+                mask from the position the line would be drawn at.
+        """
+        placed = []
+        pen = 0.0
+        for char in text:
+            mask, left, top, advance = self.glyph(char)
+            placed.append((mask, int(pen) + left, top))
+            pen += advance
+        x0 = min(x for _mask, x, _y in placed)
+        y0 = min(y for _mask, _x, y in placed)
+        x1 = max(x + mask.width for mask, x, _y in placed)
+        y1 = max(y + mask.height for mask, _x, y in placed)
+
+        line = Image.new("L", (x1 - x0, y1 - y0))
+        for mask, x, y in placed:
+            box = (x - x0, y - y0, x - x0 + mask.width, y - y0 + mask.height)
+            # Overlapping glyphs keep the higher coverage, like FreeType lines
+            line.paste(ImageChops.lighter(line.crop(box), mask), box)
+        return line, x0, y0
+
+    def __len__(self) -> int:
+        """Return the number of cached glyphs."""
+        return len(self._glyphs)
+
+
+def draw_glyphs(
+    img, layout: TextLayout, atlas: GlyphAtlas, fill: str = "white", outline: str = "black"
+) -> None:
+    """Draw a layout like TextLayout.draw, from the glyphs in an atlas.
+
+    Args:
+        img: Target image, modified in place.
+        layout: Layout to draw; its font must be the atlas font.
+        atlas: Glyphs of layout.font.
+        fill: Color of the text.
+        outline: Color of the outline.
+    """
+    for line, (x, y) in zip(layout.lines, layout.origins):
+        if not line:
+            continue
+        mask, left, top = atlas.line_mask(line)
+        x, y = x + left, y + top
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                img.paste(outline, (x + dx, y + dy), mask)
+        img.paste(fill, (x, y), mask)
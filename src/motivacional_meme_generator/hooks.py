@@ -0,0 +1,149 @@
+"""Callback hooks for observing MemeEngine and Ingestor at work.
+
+This module provides the Hooks class. MemeEngine.hooks and Ingestor.hooks
+are instances of it: callbacks added to them receive a HookEvent when an
+operation starts and ends, and when each stage of a render ends, with its
+duration and sizes. The instrumented code checks ``if hooks:`` before
+building an event, so hooks cost next to nothing while nothing is
+subscribed. The /metrics histograms and the CLI's --trace output are both
+built on these hooks.
+
+Events:
+    make_meme (start, end): source, width; path and bytes on end.
+    make_meme.decode, .resize, .layout, .draw, .encode (end): the render
+        stages, with image size, font size and line count, or output bytes.
+        Animated sources report decode, layout, frames and encode instead.
+    make_memes (start, end): number of jobs and of distinct quotes.
+    make_meme_variants (start, end): source and widths; paths on end.
+    parse (start, end): path, format and bytes; quotes on end.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+
+@dataclass
+class HookEvent:
+    """One event reported to hook callbacks.
+
+    Attributes:
+        name: Operation or stage name, e.g. 'make_meme.encode'.
+        phase: 'start' or 'end'.
+        time: time.perf_counter() value at which the event was emitted.
+        seconds: Duration of the operation or stage, for end events.
+        info: Event-specific details such as sizes and paths.
+    """
+
+    name: str
+    phase: str
+    time: float
+    seconds: Optional[float] = None
+    info: dict = field(default_factory=dict)
+
+
+class Hooks:
+    """List of callbacks notified of HookEvents.
+
+    A Hooks object is falsy while it has no callbacks, which is what keeps
+    disabled hooks free.
+
+    Example:
+        MemeEngine.hooks.add(lambda event: print(event.name, event.seconds))
+    """
+
+    def __init__(self) -> None:
+        """Initialize without callbacks."""
+        self._lock = threading.Lock()
+        self._callbacks: tuple = ()
+
+    def __bool__(self) -> bool:
+        """Return whether any callback is registered."""
+        return bool(self._callbacks)
+
+    def add(self, callback: Callable[[HookEvent], None]) -> None:
+        """Register a callback, unless it is already registered.
+
+        Args:
+            callback: Called with every HookEvent, in the emitting thread.
+        """
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks = self._callbacks + (callback,)
+
+    def remove(self, callback: Callable[[HookEvent], None]) -> None:
+        """Unregister a callback; unknown callbacks are ignored.
+
+        Args:
+            callback: A callback previously passed to add().
+        """
+        with self._lock:
+            self._callbacks = tuple(c for c in self._callbacks if c is not callback)
+
+    def emit(
+        self, name: str, phase: str, seconds: Optional[float] = None, **info
+    ) -> None:
+        """Notify every callback of an event.
+
+        Errors raised by callbacks are reported and otherwise ignored, so a
+        broken observer never breaks a render.
+
+        Args:
+            name: Operation or stage name.
+            phase: 'start' or 'end'.
+            seconds: Duration of the operation or stage, for end events.
+            **info: Event-specific details.
+        """
+        event = HookEvent(name, phase, time.perf_counter(), seconds, info)
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠ Hook {callback!r} failed on {name}: {e}")
+
+
+class EventRecorder:
+    """Hook callback keeping every event, e.g. to write a trace file.
+
+    Attributes:
+        events: Recorded events, in emission order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty recording."""
+        self._lock = threading.Lock()
+        self.events: List[HookEvent] = []
+
+    def __call__(self, event: HookEvent) -> None:
+        """Record one event."""
+        with self._lock:
+            self.events.append(event)
+
+    def chrome_trace(self) -> dict:
+        """Convert the events to the Chrome trace-event format.
+
+        End events become complete ("X") events spanning their duration, so
+        the file can be opened in chrome://tracing or Perfetto.
+
+        Returns:
+            dict: A JSON-serializable trace.
+        """
+        trace = []
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            if event.phase != "end" or event.seconds is None:
+                continue
+            trace.append({
+                "name": event.name,
+                "ph": "X",
+                "ts": (event.time - event.seconds) * 1e6,
+                "dur": event.seconds * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {key: str(value) for key, value in event.info.items()},
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
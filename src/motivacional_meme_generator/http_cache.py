@@ -0,0 +1,73 @@
+"""HTTP caching helpers for serving generated memes.
+
+Generated memes get a unique name and are never rewritten, so they can be
+cached by browsers and CDNs forever. This module provides the Cache-Control
+value used for them and the ContentETags class, which computes strong ETags
+from file contents and remembers them so a file is hashed only once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+# One year, the longest max-age HTTP caches are expected to honor
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+
+
+class ContentETags:
+    """Bounded LRU of content-hash ETags keyed by path, mtime and size.
+
+    Attributes:
+        max_entries: Maximum number of ETags remembered.
+
+    Example:
+        etags = ContentETags()
+        tag = etags.etag('./static/meme_x.jpg')
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        """Initialize an empty ETag cache.
+
+        Args:
+            max_entries: Maximum number of ETags remembered.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._tags: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+
+    def etag(self, path: str) -> str:
+        """Return the strong ETag (unquoted) of a file.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            str: Hex SHA-256 digest of the file contents.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            tag = self._tags.get(key)
+            if tag is not None:
+                self._tags.move_to_end(key)
+                return tag
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(chunk)
+        tag = digest.hexdigest()
+
+        with self._lock:
+            self._tags[key] = tag
+            while len(self._tags) > self.max_entries:
+                self._tags.popitem(last=False)
+        return tag
@@ -0,0 +1,358 @@
+"""URL-keyed cache of downloaded, pre-resized images.
+
+This module provides the RemoteImageCache class used by the web interface
+for images given by URL. Downloads are resized to the meme width once and
+kept in a size-bounded in-memory LRU backed by a size-bounded directory on
+disk. Within the freshness window a cached image is returned without any
+network traffic; after that it is revalidated with If-None-Match /
+If-Modified-Since and only downloaded again if the server reports a change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from .fetch import FetchResult, ImageFetcher
+from .user_cache import make_private_dir, user_cache_dir
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow is optional at import time
+    Image = ImageOps = None
+
+DEFAULT_IMAGE_CACHE_DIR = user_cache_dir("images")
+
+
+@dataclass
+class CacheEntry:
+    """One cached image and the validators needed to revalidate it.
+
+    Attributes:
+        url: URL the image was downloaded from.
+        data: The resized image, encoded.
+        etag: ETag header of the last response, if any.
+        last_modified: Last-Modified header of the last response, if any.
+        validated_at: Time of the last download or successful revalidation.
+    """
+
+    url: str
+    data: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    validated_at: float = 0.0
+
+
+def prepare_image(data: bytes, width: int) -> bytes:
+    """Downscale an encoded image to at most width pixels and re-encode it.
+
+    Args:
+        data: The encoded source image.
+        width: Maximum width of the result in pixels.
+
+    Returns:
+        bytes: Upright JPEG for opaque images, PNG for images with
+            transparency or a palette, or the original bytes if no resize
+            was needed or the image is animated.
+
+    Raises:
+        RuntimeError: If Pillow is not available.
+        ValueError: If the image cannot be decoded.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required for RemoteImageCache")
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception as e:
+        raise ValueError("Cannot decode image data") from e
+
+    # Animations are resized frame by frame by MemeEngine
+    if getattr(img, "is_animated", False):
+        return data
+    # Re-encoding drops EXIF: rotate first, as MemeEngine does for the original
+    upright = ImageOps.exif_transpose(img)
+    if upright.width <= width:
+        return data
+    ratio = width / upright.width
+    img = upright.resize((width, int(upright.height * ratio)), Image.LANCZOS)
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        # e.g. CMYK or 16-bit images, which neither JPEG nor PNG can hold
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+    out = io.BytesIO()
+    if img.mode in ("RGB", "L"):
+        img.save(out, format="JPEG", quality=95)
+    else:
+        img.save(out, format="PNG")
+    return out.getvalue()
+
+
+class RemoteImageCache:
+    """Two-level (memory and disk) LRU cache of images fetched by URL.
+
+    Attributes:
+        fetcher: Fetcher used for downloads by get().
+        cache_dir: Directory of the disk cache, or None for memory only.
+        max_memory_bytes: Size cap of the in-memory cache.
+        max_disk_bytes: Size cap of the disk cache.
+        ttl: Seconds during which an entry is used without revalidation.
+        width: Width images are resized to before being cached.
+
+    Example:
+        cache = RemoteImageCache(ImageFetcher(), cache_dir='/var/cache/memes')
+        data = cache.get('https://example.com/dog.jpg')
+    """
+
+    def __init__(
+        self,
+        fetcher: ImageFetcher,
+        cache_dir: Optional[str] = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        ttl: float = 3600.0,
+        width: int = 500,
+    ) -> None:
+        """Initialize the cache and index the existing disk entries.
+
+        Args:
+            fetcher: Fetcher used for downloads by get().
+            cache_dir: Directory of the disk cache, or None for memory only.
+            max_memory_bytes: Size cap of the in-memory cache.
+            max_disk_bytes: Size cap of the disk cache.
+            ttl: Seconds during which an entry is used without revalidation.
+            width: Width images are resized to before being cached.
+        """
+        self.fetcher = fetcher
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.width = width
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        if cache_dir:
+            make_private_dir(cache_dir)
+            self._index_disk()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """Return the cache key of a URL."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _disk_paths(self, key: str) -> tuple[str, str]:
+        """Return the image and metadata paths of a disk entry."""
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.img", f"{base}.json"
+
+    def _index_disk(self) -> None:
+        """Load the disk entries into the LRU index, oldest access first."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if item.name.endswith(".img"):
+                    st = item.stat()
+                    entries.append((st.st_atime, item.name[:-4], st.st_size))
+        for _atime, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Put an entry in memory, evicting least recently used ones."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old.data)
+        if len(entry.data) > self.max_memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_bytes += len(entry.data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.data)
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        """Write a file atomically, replacing rather than following a link."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _persist(self, key: str, entry: CacheEntry) -> None:
+        """Write an entry to disk, evicting least recently used ones."""
+        if not self.cache_dir or len(entry.data) > self.max_disk_bytes:
+            return
+        img_path, meta_path = self._disk_paths(key)
+        meta = asdict(entry)
+        del meta["data"]
+        self._write(img_path, entry.data)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(entry.data)
+            self._disk_bytes += len(entry.data)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            for path in self._disk_paths(old_key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        """Look an entry up in memory, then on disk."""
+        with self._lock:
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if not on_disk:
+            return None
+
+        img_path, meta_path = self._disk_paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(img_path, "rb") as f:
+                entry = CacheEntry(data=f.read(), **meta)
+            os.utime(img_path)
+        except (OSError, ValueError, TypeError):
+            return None
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def cached(self, url: str) -> Tuple[Optional[bytes], Optional[CacheEntry]]:
+        """Look a URL up without touching the network.
+
+        Args:
+            url: URL of the image.
+
+        Returns:
+            tuple: (data, None) if a fresh copy is cached, otherwise
+                (None, stale_entry) where stale_entry may be None.
+        """
+        entry = self._load(self._key(url))
+        if entry is not None and time.time() - entry.validated_at < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return entry.data, None
+        return None, entry
+
+    @staticmethod
+    def validators(entry: Optional[CacheEntry]) -> dict:
+        """Build the conditional request headers for a stale entry.
+
+        Args:
+            entry: Stale cache entry, or None.
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers, possibly empty.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def complete(
+        self, url: str, stale: Optional[CacheEntry], result: FetchResult
+    ) -> bytes:
+        """Store the outcome of a download and return the cached image.
+
+        Args:
+            url: URL of the image.
+            stale: Entry returned by cached(), if any.
+            result: Response to the (conditional) request.
+
+        Returns:
+            bytes: The encoded, resized image.
+
+        Raises:
+            ValueError: If the image cannot be decoded.
+        """
+        key = self._key(url)
+        now = time.time()
+        if result.status == 304 and stale is not None:
+            with self._lock:
+                self.revalidations += 1
+            stale.validated_at = now
+            self._persist(key, stale)
+            return stale.data
+        if result.body is None:
+            raise ValueError(f"Unexpected {result.status} response for {url}")
+
+        entry = CacheEntry(
+            url=url,
+            data=prepare_image(result.body, self.width),
+            etag=result.etag,
+            last_modified=result.last_modified,
+            validated_at=now,
+        )
+        with self._lock:
+            self.misses += 1
+            self._remember(key, entry)
+        self._persist(key, entry)
+        return entry.data
+
+    def get(self, url: str) -> bytes:
+        """Return the resized image at url, downloading it only if needed.
+
+        Args:
+            url: URL of the image.
+
+        Returns:
+            bytes: The encoded, resized image.
+
+        Raises:
+            requests.RequestException: If a download is needed and fails.
+            ImageTooLarge: If the download exceeds the fetcher's limit.
+            UnsupportedImageType: If the download is not a supported image.
+            ValueError: If the image cannot be decoded.
+        """
+        data, stale = self.cached(url)
+        if data is not None:
+            return data
+        result = self.fetcher.get(url, headers=self.validators(stale))
+        return self.complete(url, stale, result)
+
+    def stats(self) -> dict:
+        """Return hit counters and current cache sizes.
+
+        Returns:
+            dict: Hits, revalidations, misses, and entries and bytes held in
+                memory and on disk.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
@@ -0,0 +1,208 @@
+"""Text layout of memes: line wrapping, font fitting and placement.
+
+This module provides fit_text, which decides how a quote is drawn on an
+image of a given size (font size, wrapped lines and where each line goes),
+and TextLayout, the immutable result. Fitting measures every candidate line
+with the font, which makes it the most expensive part of a render after
+decoding; LayoutCache keeps recent layouts so that repeated renders of the
+same quote on images of the same size skip all measuring.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, List, Optional, Tuple
+
+# Horizontal margin on each side of the text, in pixels
+PADDING = 20
+# Extra space between two lines, in pixels
+LINE_SPACING = 4
+# Smallest font size tried while shrinking the text
+MIN_FONT_SIZE = 10
+
+
+@dataclass(frozen=True)
+class TextLayout:
+    """Where and how the lines of a quote are drawn.
+
+    Attributes:
+        font_size: Size the font was loaded at.
+        line_height: Height of one line, without LINE_SPACING.
+        lines: Body lines, a blank separator, then author lines.
+        origins: Top-left (x, y) of each line, blank ones included.
+        font: Font the lines are drawn with.
+    """
+
+    font_size: int
+    line_height: int
+    lines: Tuple[str, ...]
+    origins: Tuple[Tuple[int, int], ...]
+    font: object = field(compare=False, repr=False)
+
+    def draw(self, draw, fill: str = "white", outline: str = "black") -> None:
+        """Draw the text, with a one-pixel outline for readability.
+
+        Args:
+            draw: ImageDraw.Draw of the target image.
+            fill: Color of the text.
+            outline: Color of the outline.
+        """
+        font = self.font
+        for line, (x, y) in zip(self.lines, self.origins):
+            if not line:
+                continue
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if dx == 0 and dy == 0:
+                        continue
+                    draw.text((x + dx, y + dy), line, font=font, fill=outline)
+            draw.text((x, y), line, font=font, fill=fill)
+
+
+def _text_width(font, text: str) -> int:
+    """Return the rendered width of one line of text."""
+    box = font.getbbox(text)
+    return box[2] - box[0]
+
+
+def wrap_text(text: str, font, max_width: int) -> List[str]:
+    """Greedily wrap words into lines no wider than max_width.
+
+    A single word wider than max_width gets a line of its own.
+
+    Args:
+        text: Text to wrap.
+        font: Font used to measure the lines.
+        max_width: Maximum line width in pixels.
+
+    Returns:
+        List[str]: The wrapped lines.
+    """
+    lines: List[str] = []
+    current: List[str] = []
+    for word in text.split():
+        candidate = " ".join(current + [word]) if current else word
+        if _text_width(font, candidate) <= max_width:
+            current.append(word)
+        else:
+            if current:
+                lines.append(" ".join(current))
+            current = [word]
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def fit_text(
+    text: str, author: str, width: int, height: int, load_font: Callable[[int], object]
+) -> TextLayout:
+    """Lay out a quote on an image of the given size.
+
+    The font starts at a tenth of the image height (at most 40) and shrinks
+    until the wrapped quote and author take less than half of the height.
+    The block of text is centered at 60% of the height. If load_font
+    returns the same font object for a smaller size, the font is taken to be
+    fixed-size and shrinking stops.
+
+    Args:
+        text: Quote body text.
+        author: Quote author.
+        width: Image width in pixels.
+        height: Image height in pixels.
+        load_font: Returns the font at a given size, or the same object
+            for every size if the font cannot scale.
+
+    Returns:
+        TextLayout: The fitted layout.
+    """
+    body = f'"{text}"'
+    author_line = f"- {author}"
+    max_width = width - 2 * PADDING
+
+    font_size = min(40, int(height / 10))
+    previous = None
+    while True:
+        font = load_font(font_size)
+        if font is previous:
+            # A font that does not scale would wrap the same way at every size
+            font_size += 2
+            break
+        body_lines = wrap_text(body, font, max_width)
+        author_lines = wrap_text(author_line, font, max_width)
+        line_height = font.getbbox("Ay")[3]
+        total_h = (len(body_lines) + len(author_lines)) * (line_height + LINE_SPACING)
+        # don't take more than half image height
+        if total_h < height * 0.5 or font_size - 2 <= MIN_FONT_SIZE:
+            break
+        previous = font
+        font_size -= 2
+
+    lines = tuple(body_lines + [""] + author_lines)
+    step = line_height + LINE_SPACING
+    y_start = int(height * 0.6 - len(lines) * step // 2)
+    origins = tuple(
+        ((width - _text_width(font, line)) // 2 if line else 0, y_start + i * step)
+        for i, line in enumerate(lines)
+    )
+    return TextLayout(font_size, line_height, lines, origins, font)
+
+
+class LayoutCache:
+    """Bounded LRU of text layouts, or of anything else derived from them.
+
+    MemeEngine also keeps its pre-rendered text overlays in one.
+
+    Attributes:
+        max_entries: Maximum number of layouts kept.
+        hits: Number of lookups answered from the cache.
+        misses: Number of layouts computed.
+
+    Example:
+        cache = LayoutCache()
+        layout = cache.get(key, lambda: fit_text(...))
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of layouts kept; 0 disables caching.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._layouts: "OrderedDict[Hashable, TextLayout]" = OrderedDict()
+
+    def get(self, key: Hashable, compute: Callable[[], TextLayout]) -> TextLayout:
+        """Return the layout for key, computing it on a miss.
+
+        Args:
+            key: Everything the layout depends on, e.g. text, author, font
+                and target box.
+            compute: Computes the layout when it is not cached.
+
+        Returns:
+            TextLayout: The cached or computed layout.
+        """
+        with self._lock:
+            layout: Optional[TextLayout] = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+                return layout
+            self.misses += 1
+
+        layout = compute()
+        if self.max_entries > 0:
+            with self._lock:
+                self._layouts[key] = layout
+                while len(self._layouts) > self.max_entries:
+                    self._layouts.popitem(last=False)
+        return layout
+
+    def __len__(self) -> int:
+        """Return the number of cached layouts."""
+        return len(self._layouts)
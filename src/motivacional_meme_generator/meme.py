@@ -5,11 +5,11 @@ QuoteEngine and MemeEngine components. It can generate random memes or create
 custom memes with specific images and quotes.
 """
 
-import os
 import random
 from typing import Optional
 
 from MemeEngine import MemeEngine
+from photo_manifest import load_manifest
 from QuoteEngine.ingestor import Ingestor
 from QuoteEngine.quote_model import QuoteModel
 
@@ -31,16 +31,8 @@ def generate_meme(
         ValueError: If author is required but not provided.
     """
     if path is None:
-        images = "./_data/photos/dog/"
-        imgs = []
-        for root, _dirs, files in os.walk(images):
-            for name in files:
-                if ":" in name:
-                    continue
-                if not name.lower().endswith((".jpg", ".jpeg", ".png", ".gif")):
-                    continue
-                imgs.append(os.path.join(root, name))
-        img = random.choice(imgs)
+        # Scanned once per process; later calls sample from memory
+        img = load_manifest("./_data/photos/dog/").sample()
     else:
         img = path
 
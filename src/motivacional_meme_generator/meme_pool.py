@@ -0,0 +1,155 @@
+"""Pool of pre-rendered memes kept topped up by a background thread.
+
+This module provides the MemePool class. A producer thread calls a render
+function ahead of time and stores the resulting meme paths in a bounded
+queue, so a request for a random meme only has to take one from the pool
+instead of paying the full render time.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+# Wait after the first failed render, doubled per failure up to the cap
+FAILURE_BACKOFF = 0.1
+MAX_FAILURE_BACKOFF = 30.0
+
+
+class MemePool:
+    """Bounded pool of pre-rendered meme paths.
+
+    Attributes:
+        render: Callable producing one new meme and returning its path, or
+            any other description of it such as its size variants.
+        size: Maximum number of memes kept ready in the pool.
+        refill_interval: Seconds the producer waits after each render, which
+            caps the refill rate at 1 / refill_interval memes per second;
+            failed renders back off exponentially beyond it.
+        warmup: Number of memes rendered synchronously by start().
+
+    Example:
+        pool = MemePool(lambda: engine.make_meme(img, body, author), size=4)
+        pool.start()
+        path = pool.pop()
+    """
+
+    def __init__(
+        self,
+        render: Callable[[], Any],
+        size: int = 8,
+        refill_interval: float = 0.0,
+        warmup: int = 0,
+    ) -> None:
+        """Initialize an empty pool; call start() to fill it.
+
+        Args:
+            render: Callable producing one new meme and returning its path
+                or another description of it.
+            size: Maximum number of memes kept ready in the pool.
+            refill_interval: Seconds the producer waits after each render.
+            warmup: Number of memes rendered synchronously by start().
+
+        Raises:
+            ValueError: If size is not positive.
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.render = render
+        self.size = size
+        self.refill_interval = refill_interval
+        self.warmup = min(warmup, size)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=size)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Current wait after a failure; 0 while renders succeed
+        self._backoff = 0.0
+        # Meme rendered by the producer while it waits for a free slot
+        self._held: Optional[Any] = None
+
+    def __len__(self) -> int:
+        """Return the number of memes currently ready."""
+        return self._queue.qsize()
+
+    def _render_one(self) -> Optional[Any]:
+        """Render one meme, reporting failures instead of raising them.
+
+        Only the first failure of a streak is reported; each one doubles
+        the producer's wait before the next attempt, up to
+        MAX_FAILURE_BACKOFF, and a success resets it.
+        """
+        try:
+            path = self.render()
+        except Exception as e:
+            if not self._backoff:
+                print(f"⚠ Failed to pre-render meme: {e}")
+            self._backoff = min(
+                MAX_FAILURE_BACKOFF, max(FAILURE_BACKOFF, self._backoff * 2)
+            )
+            return None
+        if self._backoff:
+            print("✓ Pre-rendering memes again")
+            self._backoff = 0.0
+        return path
+
+    def _produce(self) -> None:
+        """Keep the pool full until stop() is called."""
+        while not self._stop_event.is_set():
+            path = self._held = self._render_one()
+            if path is not None:
+                # Blocks while the pool is full; wake up regularly to see stop()
+                while not self._stop_event.is_set():
+                    try:
+                        self._queue.put(path, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                self._held = None
+            if self._stop_event.wait(max(self.refill_interval, self._backoff)):
+                break
+
+    def start(self) -> None:
+        """Render the warm-up memes and start the producer thread."""
+        for _ in range(self.warmup):
+            path = self._render_one()
+            if path is not None:
+                self._queue.put_nowait(path)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._produce, name="meme-pool", daemon=True
+            )
+            self._thread.start()
+
+    def pop(self) -> Optional[Any]:
+        """Take one pre-rendered meme without waiting.
+
+        Returns:
+            Optional[Any]: What render returned for the meme, or None if the
+                pool is empty.
+        """
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def pending(self) -> List[Any]:
+        """Return the memes rendered but not taken yet, without removing them.
+
+        Returns:
+            List[Any]: What render returned for each meme in the pool.
+        """
+        with self._queue.mutex:
+            items = list(self._queue.queue)
+        held = self._held
+        return items + [held] if held is not None else items
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the producer thread.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,227 @@
+"""Latency histograms exported in the Prometheus text format.
+
+This module provides a small, dependency-free metrics registry and the
+histograms recorded by the meme generator: the stages of
+MemeEngine.make_meme, Ingestor.parse per file format, and image downloads
+for custom memes. Render and parse timings come from the MemeEngine and
+Ingestor hooks once install() has subscribed to them. Worker processes of
+the render pool record into their own registry; its contents are shipped
+back with every render and merged into the registry of the web process,
+which exports them at /metrics.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from .hooks import HookEvent
+from .MemeEngine import MemeEngine
+from .QuoteEngine import Ingestor
+
+# Upper bounds in seconds, from sub-millisecond parsing to slow downloads
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Label values -> (bucket counts, sum of values, number of values)
+HistogramState = Dict[Tuple[str, ...], Tuple[List[int], float, int]]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Thread-safe histogram with optional labels.
+
+    Attributes:
+        name: Metric name, e.g. 'meme_render_stage_seconds'.
+        help: One-line description exported with the metric.
+        labelnames: Names of the labels every observation must set.
+        buckets: Sorted upper bounds of the buckets, without +Inf.
+
+    Example:
+        hist = Histogram('job_seconds', 'Job latency', ('kind',))
+        with hist.time(kind='resize'):
+            ...
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            name: Metric name.
+            help: One-line description exported with the metric.
+            labelnames: Names of the labels every observation must set.
+            buckets: Sorted upper bounds of the buckets, without +Inf.
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._state: HistogramState = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one value.
+
+        Args:
+            value: The observed value, in seconds for latencies.
+            **labels: One value per name in labelnames.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._state.get(key) or (
+                [0] * (len(self.buckets) + 1), 0.0, 0
+            )
+            counts[index] += 1
+            self._state[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of a with block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def drain(self) -> HistogramState:
+        """Return the recorded values and reset the histogram."""
+        with self._lock:
+            state, self._state = self._state, {}
+        return state
+
+    def merge(self, state: HistogramState) -> None:
+        """Add the values drained from a histogram of the same shape."""
+        with self._lock:
+            for key, (counts, total, count) in state.items():
+                own = self._state.get(key)
+                if own is not None:
+                    counts = [a + b for a, b in zip(own[0], counts)]
+                    total += own[1]
+                    count += own[2]
+                self._state[key] = (list(counts), total, count)
+
+    def expose(self) -> List[str]:
+        """Return the metric in the Prometheus text format, one line each."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._state.items())
+        for key, (counts, total, count) in items:
+            pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{labels}}} {cumulative}")
+            suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of histograms.
+
+    Attributes:
+        histograms: Registered histograms by name.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.histograms: Dict[str, Histogram] = {}
+
+    def histogram(
+        self, name: str, help: str, labelnames: Tuple[str, ...] = ()
+    ) -> Histogram:
+        """Register a histogram, or return the one with that name.
+
+        Args:
+            name: Metric name.
+            help: One-line description exported with the metric.
+            labelnames: Names of the labels every observation must set.
+
+        Returns:
+            Histogram: The registered histogram.
+        """
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help, labelnames)
+        return self.histograms[name]
+
+    def drain(self) -> Dict[str, HistogramState]:
+        """Return and reset the values of every histogram that has any."""
+        drained = {name: hist.drain() for name, hist in self.histograms.items()}
+        return {name: state for name, state in drained.items() if state}
+
+    def merge(self, drained: Dict[str, HistogramState]) -> None:
+        """Add values drained from another process's registry."""
+        for name, state in drained.items():
+            hist = self.histograms.get(name)
+            if hist is not None:
+                hist.merge(state)
+
+    def expose(self) -> str:
+        """Return every histogram in the Prometheus text format."""
+        lines: List[str] = []
+        for hist in self.histograms.values():
+            lines.extend(hist.expose())
+        return "\n".join(lines) + "\n"
+
+
+# Registry of the current process
+REGISTRY = MetricsRegistry()
+
+RENDER_STAGE_SECONDS = REGISTRY.histogram(
+    "meme_render_stage_seconds",
+    "Time spent in each stage of MemeEngine.make_meme",
+    ("stage",),
+)
+QUOTE_PARSE_SECONDS = REGISTRY.histogram(
+    "meme_quote_parse_seconds",
+    "Time spent parsing one quote file, by file format",
+    ("format",),
+)
+IMAGE_DOWNLOAD_SECONDS = REGISTRY.histogram(
+    "meme_image_download_seconds",
+    "Time spent getting a custom meme image by URL, cache included",
+    ("outcome",),
+)
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def observe_hook_event(event: HookEvent) -> None:
+    """Hook callback recording render stages and quote parsing.
+
+    Args:
+        event: Event emitted by MemeEngine or Ingestor.
+    """
+    if event.phase != "end" or event.seconds is None:
+        return
+    if event.name.startswith("make_meme."):
+        RENDER_STAGE_SECONDS.observe(
+            event.seconds, stage=event.name[len("make_meme."):]
+        )
+    elif event.name == "parse":
+        QUOTE_PARSE_SECONDS.observe(event.seconds, format=event.info["format"])
+
+
+def install() -> None:
+    """Subscribe the histograms to the MemeEngine and Ingestor hooks."""
+    MemeEngine.hooks.add(observe_hook_event)
+    Ingestor.hooks.add(observe_hook_event)
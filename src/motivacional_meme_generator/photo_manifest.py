@@ -0,0 +1,322 @@
+"""Persisted manifest of the photos memes are made from.
+
+This module provides the PhotoManifest class: the path, size, modification
+time, dimensions and format of every photo below a directory. The manifest
+is saved as JSON and refreshed incrementally: directories whose mtime did
+not change are not listed again, and only new or modified files have their
+header read. Every entry point (CLI, web apps, the meme.py and app.py
+scripts) samples photos from a manifest instead of walking the photo
+directory itself. Manifests are saved in the per-user cache directory.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .user_cache import make_private_dir, user_cache_dir
+except ImportError:  # imported as a top-level module by meme.py and app.py
+    from user_cache import make_private_dir, user_cache_dir
+
+try:
+    from PIL import Image
+except Exception:  # Pillow is optional at import time
+    Image = None
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+
+# Bumped whenever the saved format changes
+MANIFEST_VERSION = 1
+
+DEFAULT_MANIFEST_DIR = user_cache_dir("photos")
+
+
+@dataclass(frozen=True)
+class PhotoEntry:
+    """One photo of the manifest.
+
+    Attributes:
+        path: Path of the photo file.
+        size: File size in bytes.
+        mtime_ns: Modification time of the file, in nanoseconds.
+        width: Width in pixels, 0 if the header could not be read.
+        height: Height in pixels, 0 if the header could not be read.
+        format: Pillow format name, e.g. 'JPEG', or "" if unreadable.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    width: int
+    height: int
+    format: str
+
+
+def default_manifest_path(
+    photos_dir: str, manifest_dir: str = DEFAULT_MANIFEST_DIR
+) -> str:
+    """Return where the manifest of a photo directory is saved by default.
+
+    Args:
+        photos_dir: The photo directory.
+        manifest_dir: Directory the manifests are saved in.
+
+    Returns:
+        str: A file in manifest_dir, unique to the photo directory.
+    """
+    digest = hashlib.sha1(os.path.abspath(photos_dir).encode("utf-8")).hexdigest()
+    return os.path.join(manifest_dir, f"{digest[:16]}.json")
+
+
+def read_photo(path: str, st: os.stat_result) -> PhotoEntry:
+    """Read the header of a photo, without decoding its pixels.
+
+    Photos Pillow cannot open are kept, with zero dimensions: rendering them
+    fails the same way it did before there was a manifest.
+
+    Args:
+        path: Path of the photo file.
+        st: Result of os.stat on the file.
+
+    Returns:
+        PhotoEntry: The entry.
+    """
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            fmt = img.format or ""
+    except Exception as e:
+        print(f"⚠ Cannot read photo {os.path.basename(path)}: {e}")
+        width = height = 0
+        fmt = ""
+    return PhotoEntry(path, st.st_size, st.st_mtime_ns, width, height, fmt)
+
+
+class PhotoManifest:
+    """Photos below a directory, with their size and format.
+
+    Attributes:
+        photos_dir: Directory searched recursively for photos.
+        path: JSON file the manifest is saved to, or None to keep it in memory.
+        entries: Photos in path order.
+
+    Example:
+        manifest = PhotoManifest('./_data/photos/dog')
+        manifest.refresh()
+        photo = manifest.sample()
+    """
+
+    def __init__(self, photos_dir: str, path: Optional[str] = "") -> None:
+        """Initialize the manifest from its saved copy, if any.
+
+        Call refresh() to bring it up to date with the disk.
+
+        Args:
+            photos_dir: Directory searched recursively for photos.
+            path: JSON file to save to; "" picks default_manifest_path and
+                None disables saving.
+
+        Raises:
+            RuntimeError: If Pillow is not available.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is required for PhotoManifest")
+        self.photos_dir = os.path.normpath(photos_dir)
+        self.path = default_manifest_path(photos_dir) if path == "" else path
+        self.entries: Tuple[PhotoEntry, ...] = ()
+        self._paths: Tuple[str, ...] = ()
+        # Directory -> (mtime_ns, photo files, subdirectories)
+        self._dirs: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def paths(self) -> Tuple[str, ...]:
+        """Paths of all photos, in order."""
+        return self._paths
+
+    def __len__(self) -> int:
+        """Return the number of photos."""
+        return len(self.entries)
+
+    def sample(self) -> str:
+        """Return the path of a random photo.
+
+        Raises:
+            LookupError: If the manifest has no photos.
+        """
+        paths = self._paths
+        if not paths:
+            raise LookupError(f"No photos in {self.photos_dir}")
+        return random.choice(paths)
+
+    def _load(self) -> None:
+        """Read the saved manifest; a missing or invalid one is ignored."""
+        if not self.path:
+            return
+
+        # Paths are saved relative to photos_dir, however it was spelled
+        def join(relative: str) -> str:
+            return os.path.normpath(os.path.join(self.photos_dir, relative))
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved["version"] != MANIFEST_VERSION or saved["photos_dir"] != (
+                os.path.abspath(self.photos_dir)
+            ):
+                return
+            entries = tuple(
+                PhotoEntry(**dict(entry, path=join(entry["path"])))
+                for entry in saved["entries"]
+            )
+            dirs = {
+                join(directory): (
+                    mtime, [join(f) for f in files], [join(sub) for sub in subdirs]
+                )
+                for directory, (mtime, files, subdirs) in saved["dirs"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self.entries, self._dirs = entries, dirs
+        self._paths = tuple(entry.path for entry in entries)
+
+    def _save(self) -> None:
+        """Write the manifest atomically; failures only cost a rebuild later."""
+        relpath = functools.partial(os.path.relpath, start=self.photos_dir)
+        saved = {
+            "version": MANIFEST_VERSION,
+            "photos_dir": os.path.abspath(self.photos_dir),
+            "entries": [
+                dict(asdict(entry), path=relpath(entry.path)) for entry in self.entries
+            ],
+            "dirs": {
+                relpath(directory): (
+                    mtime, [relpath(f) for f in files], [relpath(sub) for sub in subdirs]
+                )
+                for directory, (mtime, files, subdirs) in self._dirs.items()
+            },
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            make_private_dir(os.path.dirname(os.path.abspath(self.path)))
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠ Could not save photo manifest to {self.path}: {e}")
+
+    def _list_dir(self, path: str, seen: set) -> List[str]:
+        """Return the photo files below path, listing only changed directories.
+
+        Args:
+            path: Directory to scan.
+            seen: Set collecting every directory visited in this refresh.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        seen.add(path)
+        cached = self._dirs.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            files, subdirs = [], []
+            with os.scandir(path) as it:
+                for item in sorted(it, key=lambda e: e.name):
+                    if item.is_dir():
+                        subdirs.append(item.path)
+                    # Skip Windows ADS artifacts and non-image files
+                    elif ":" not in item.name and item.name.lower().endswith(
+                        IMAGE_EXTENSIONS
+                    ):
+                        files.append(item.path)
+            cached = self._dirs[path] = (mtime_ns, files, subdirs)
+
+        found = list(cached[1])
+        for sub in cached[2]:
+            found.extend(self._list_dir(sub, seen))
+        return found
+
+    def refresh(self) -> bool:
+        """Bring the manifest up to date with the disk and save it.
+
+        Every photo is stat'ed, but headers are only read for new or
+        modified files.
+
+        Returns:
+            bool: True if the manifest changed, False otherwise.
+        """
+        with self._lock:
+            if not os.path.isdir(self.photos_dir):
+                print(f"⚠ Images directory not found: {self.photos_dir}")
+                changed = bool(self.entries)
+                self.entries, self._paths = (), ()
+                self._dirs.clear()
+                if changed and self.path:
+                    self._save()
+                return changed
+
+            listed = dict(self._dirs)
+            seen: set = set()
+            files = self._list_dir(self.photos_dir, seen)
+            for path in set(self._dirs) - seen:
+                del self._dirs[path]
+            dirs_changed = self._dirs != listed
+
+            known = {entry.path: entry for entry in self.entries}
+            entries: List[PhotoEntry] = []
+            for path in files:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entry = known.get(path)
+                if entry is None or (entry.mtime_ns, entry.size) != (
+                    st.st_mtime_ns, st.st_size
+                ):
+                    entry = read_photo(path, st)
+                entries.append(entry)
+
+            changed = dirs_changed or tuple(entries) != self.entries
+            self.entries = tuple(entries)
+            self._paths = tuple(entry.path for entry in entries)
+            if changed and self.path:
+                self._save()
+            return changed
+
+
+_manifests: Dict[str, PhotoManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def load_manifest(
+    photos_dir: str, manifest_dir: Optional[str] = DEFAULT_MANIFEST_DIR
+) -> PhotoManifest:
+    """Return the process-wide manifest of a directory, refreshed once.
+
+    The first call for a directory loads the saved manifest and refreshes
+    it; later calls return the same object without touching the disk.
+
+    Args:
+        photos_dir: Directory searched recursively for photos.
+        manifest_dir: Directory the manifest is saved in, or None to keep
+            it in memory.
+
+    Returns:
+        PhotoManifest: The manifest.
+    """
+    key = os.path.abspath(photos_dir)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            path = default_manifest_path(photos_dir, manifest_dir) if manifest_dir else None
+            manifest = _manifests[key] = PhotoManifest(photos_dir, path)
+            manifest.refresh()
+        return manifest
@@ -0,0 +1,364 @@
+"""Offline preparation of the photo library.
+
+Source photos are full-size files with EXIF orientation, and every render
+used to decode and downscale them from scratch. This module provides
+prepare_library, behind the CLI's ``prep`` command, which stores oriented
+RGB copies of each photo pre-scaled to the widths memes are rendered at.
+The copies are baseline JPEGs, which decode faster than progressive ones,
+and sit next to a JSON manifest per source directory. PreparedPhotos looks
+up the copy to render from; MemeEngine consults it for every photo given
+by path, and falls back to the source when no current copy exists.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .photo_manifest import PhotoManifest
+    from .user_cache import make_private_dir, user_cache_dir
+except ImportError:  # imported as a top-level module by meme.py and app.py
+    from photo_manifest import PhotoManifest
+    from user_cache import make_private_dir, user_cache_dir
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow is optional at import time
+    Image = ImageOps = None
+
+DEFAULT_PREP_DIR = user_cache_dir("prepared")
+
+# Bumped whenever the saved format changes
+PREP_VERSION = 1
+# Copies are resized again by every render: keep them close to the source
+PREP_QUALITY = 90
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass(frozen=True)
+class PreparedPhoto:
+    """Prepared copies of one source photo.
+
+    Attributes:
+        size: File size of the source when it was prepared, in bytes.
+        mtime_ns: Modification time of the source, in nanoseconds.
+        width: Width of the source once oriented, in pixels.
+        widths: Widths requested when it was prepared.
+        variants: (width, file name) of each copy, narrowest first.
+    """
+
+    size: int
+    mtime_ns: int
+    width: int
+    widths: Tuple[int, ...]
+    variants: Tuple[Tuple[int, str], ...]
+
+
+def prepared_dir(source_dir: str, prep_dir: str = DEFAULT_PREP_DIR) -> str:
+    """Return the directory holding the copies of a source directory.
+
+    Args:
+        source_dir: Directory of the source photos.
+        prep_dir: Root of all prepared copies.
+
+    Returns:
+        str: A subdirectory of prep_dir, unique to source_dir.
+    """
+    digest = hashlib.sha1(os.path.abspath(source_dir).encode("utf-8")).hexdigest()
+    return os.path.join(prep_dir, digest[:16])
+
+
+def _is_basename(name: str) -> bool:
+    """Return whether a name is a plain file name, without any directory."""
+    return name not in ("", ".", "..") and os.path.basename(name) == name
+
+
+def _read_manifest(path: str) -> Dict[str, PreparedPhoto]:
+    """Read a saved manifest; a missing or invalid one reads as empty.
+
+    Names are joined onto the prepared directory, so a manifest naming
+    anything but plain files, e.g. '../x.jpg', is invalid.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["version"] != PREP_VERSION:
+            return {}
+        photos = {
+            name: PreparedPhoto(
+                entry["size"],
+                entry["mtime_ns"],
+                entry["width"],
+                tuple(entry["widths"]),
+                tuple((width, file) for width, file in entry["variants"]),
+            )
+            for name, entry in saved["photos"].items()
+        }
+        for name, photo in photos.items():
+            if not all(_is_basename(file) for file in (name, *dict(photo.variants).values())):
+                raise ValueError(f"Not a file name in {path}")
+        return photos
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _write_manifest(path: str, source_dir: str, photos: Dict[str, PreparedPhoto]) -> None:
+    """Write a manifest atomically."""
+    saved = {
+        "version": PREP_VERSION,
+        "source_dir": os.path.abspath(source_dir),
+        "photos": {
+            name: {
+                "size": photo.size,
+                "mtime_ns": photo.mtime_ns,
+                "width": photo.width,
+                "widths": list(photo.widths),
+                "variants": [list(variant) for variant in photo.variants],
+            }
+            for name, photo in sorted(photos.items())
+        },
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(saved, f)
+    os.replace(tmp, path)
+
+
+def prepare_photo(
+    source: str, widths: Tuple[int, ...], out_dir: str
+) -> Optional[PreparedPhoto]:
+    """Write the prepared copies of one photo.
+
+    Each copy is resized from the oriented source, not from another copy, so
+    a render from a copy of the exact width matches a render from the source.
+
+    Args:
+        source: Path of the source photo.
+        widths: Widths to prepare; those above the source width are capped.
+        out_dir: Directory the copies are written to.
+
+    Returns:
+        Optional[PreparedPhoto]: The copies, or None for photos that are
+            kept as they are: animations and images with transparency.
+
+    Raises:
+        OSError: If the source cannot be read or a copy cannot be written.
+    """
+    st = os.stat(source)
+    with Image.open(source) as img:
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        if getattr(img, "is_animated", False) or has_alpha:
+            return None
+        img = ImageOps.exif_transpose(img).convert("RGB")
+
+    name = os.path.basename(source)
+    variants: List[Tuple[int, str]] = []
+    for width in sorted({min(width, img.width) for width in widths}):
+        height = max(1, int(img.height * width / img.width))
+        copy = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        file = f"{name}.{width}.jpg"
+        copy.save(os.path.join(out_dir, file), "JPEG", quality=PREP_QUALITY)
+        variants.append((width, file))
+    return PreparedPhoto(
+        st.st_size, st.st_mtime_ns, img.width, tuple(sorted(widths)), tuple(variants)
+    )
+
+
+def _prepare(job: Tuple[str, Tuple[int, ...], str]) -> Tuple[str, Optional[PreparedPhoto], str]:
+    """Run prepare_photo in a worker; return the source, result and error."""
+    source, widths, out_dir = job
+    try:
+        return source, prepare_photo(source, widths, out_dir), ""
+    except Exception as e:
+        return source, None, str(e)
+
+
+def _remove_copies(out_dir: str, photo: PreparedPhoto, keep: frozenset = frozenset()) -> None:
+    """Delete the copies of a photo, except the file names in keep."""
+    for _width, file in photo.variants:
+        if file not in keep:
+            try:
+                os.remove(os.path.join(out_dir, file))
+            except OSError:
+                pass
+
+
+def prepare_library(
+    photos_dir: str,
+    widths: Iterable[int],
+    prep_dir: str = DEFAULT_PREP_DIR,
+    workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Prepare every photo below a directory that changed since the last run.
+
+    Photos come from the photo manifest. Photos whose size, modification
+    time and requested widths are unchanged are skipped; copies of photos
+    that were modified or removed are deleted.
+
+    Args:
+        photos_dir: Directory searched recursively for photos.
+        widths: Widths to prepare, e.g. the page width and MEME_OUTPUT_WIDTHS.
+        prep_dir: Root directory of the prepared copies.
+        workers: Processes preparing photos; defaults to the CPU count,
+            and 1 prepares them in this process.
+
+    Returns:
+        Tuple[int, int]: Number of photos prepared and already up to date.
+
+    Raises:
+        RuntimeError: If Pillow is not available.
+        ValueError: If no width is given.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to prepare photos")
+    widths = tuple(sorted({int(width) for width in widths}))
+    if not widths or widths[0] <= 0:
+        raise ValueError("At least one positive width is required")
+
+    # The copies have their own manifests: list the photos in memory only
+    manifest = PhotoManifest(photos_dir, None)
+    manifest.refresh()
+    by_dir: Dict[str, List[str]] = {}
+    for path in manifest.paths:
+        by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+    saved: Dict[str, Dict[str, PreparedPhoto]] = {}
+    jobs: List[Tuple[str, Tuple[int, ...], str]] = []
+    current = 0
+    for source_dir, sources in by_dir.items():
+        out_dir = prepared_dir(source_dir, prep_dir)
+        make_private_dir(out_dir)
+        photos = _read_manifest(os.path.join(out_dir, MANIFEST_NAME))
+        names = {os.path.basename(source) for source in sources}
+        for name in set(photos) - names:
+            _remove_copies(out_dir, photos.pop(name))
+        for source in sources:
+            photo = photos.get(os.path.basename(source))
+            st = os.stat(source)
+            if photo is not None and (photo.size, photo.mtime_ns, photo.widths) == (
+                st.st_size, st.st_mtime_ns, widths
+            ):
+                current += 1
+                continue
+            jobs.append((source, widths, out_dir))
+        saved[source_dir] = photos
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_prepare(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(_prepare, jobs, chunksize=4))
+
+    prepared = 0
+    for source, photo, error in results:
+        source_dir, name = os.path.split(source)
+        photos = saved[source_dir]
+        old = photos.pop(name, None)
+        if old is not None:
+            # Copies at widths no longer requested would linger otherwise
+            keep = frozenset(file for _width, file in photo.variants) if photo else frozenset()
+            _remove_copies(prepared_dir(source_dir, prep_dir), old, keep)
+        if error:
+            print(f"⚠ Cannot prepare {name}: {error}")
+        elif photo is not None:
+            photos[name] = photo
+            prepared += 1
+
+    for source_dir, photos in saved.items():
+        out_dir = prepared_dir(source_dir, prep_dir)
+        _write_manifest(os.path.join(out_dir, MANIFEST_NAME), source_dir, photos)
+    return prepared, current
+
+
+class PreparedPhotos:
+    """Lookup of the prepared copy to render a photo from.
+
+    Manifests are read once per source directory and read again when their
+    file changes, so a server picks up a ``prep`` run without restarting.
+    A copy is only used while its source has the size and modification
+    time it was prepared from.
+
+    Attributes:
+        prep_dir: Root directory of the prepared copies.
+
+    Example:
+        prepared = PreparedPhotos()
+        path = prepared.find('./_data/photos/dog/xander_1.jpg', 500)
+    """
+
+    def __init__(self, prep_dir: str = DEFAULT_PREP_DIR) -> None:
+        """Initialize the lookup; manifests are read on first use.
+
+        Args:
+            prep_dir: Root directory of the prepared copies.
+        """
+        self.prep_dir = prep_dir
+        # Source directory -> (manifest mtime_ns, its photos)
+        self._dirs: Dict[str, Tuple[int, Dict[str, PreparedPhoto]]] = {}
+        self._lock = threading.Lock()
+
+    def _photos(self, source_dir: str) -> Dict[str, PreparedPhoto]:
+        """Return the prepared photos of a source directory."""
+        path = os.path.join(prepared_dir(source_dir, self.prep_dir), MANIFEST_NAME)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._dirs.get(source_dir)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, _read_manifest(path))
+            with self._lock:
+                self._dirs[source_dir] = cached
+        return cached[1]
+
+    def find(self, source: str, width: int) -> Optional[str]:
+        """Return the copy to render a photo from at a given width.
+
+        Args:
+            source: Path of the source photo.
+            width: Maximum width the photo is rendered at.
+
+        Returns:
+            Optional[str]: Path of the narrowest copy at least as wide as the
+                render, or None if there is none or it is out of date.
+        """
+        source_dir, name = os.path.split(os.path.abspath(source))
+        photo = self._photos(source_dir).get(name)
+        if photo is None:
+            return None
+        width = min(width, photo.width)
+        for variant_width, file in photo.variants:
+            if variant_width >= width:
+                break
+        else:
+            return None
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (photo.size, photo.mtime_ns):
+            return None
+        return os.path.join(prepared_dir(source_dir, self.prep_dir), file)
+
+
+_lookups: Dict[str, PreparedPhotos] = {}
+_lookups_lock = threading.Lock()
+
+
+def prepared_photos(prep_dir: str = DEFAULT_PREP_DIR) -> PreparedPhotos:
+    """Return the process-wide lookup of a prep directory."""
+    with _lookups_lock:
+        lookup = _lookups.get(prep_dir)
+        if lookup is None:
+            lookup = _lookups[prep_dir] = PreparedPhotos(prep_dir)
+        return lookup
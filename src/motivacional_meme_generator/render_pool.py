@@ -0,0 +1,257 @@
+"""Process pool for rendering memes outside the web request threads.
+
+This module provides the RenderExecutor class, which runs
+MemeEngine.make_meme in a pool of worker processes so that CPU-heavy Pillow
+work does not compete with request handling. The number of jobs waiting or
+running is bounded: once the queue is full, submit() raises RenderQueueFull
+immediately instead of letting a burst of renders pile up.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from .MemeEngine import MemeEngine
+from . import metrics
+
+# One engine per set of engine options, created lazily in each worker process
+_engines: Dict[tuple, MemeEngine] = {}
+
+
+def _render(
+    engine_options: dict,
+    img_path: Union[str, bytes],
+    text: str,
+    author: str,
+    width: int,
+    output_format: Optional[str] = None,
+    widths: Optional[Tuple[int, ...]] = None,
+) -> Tuple[Union[str, List[Tuple[int, str]]], float, float, dict]:
+    """Render one meme inside a worker process.
+
+    Returns:
+        tuple: Path of the meme, or its variants if widths is given (see
+            MemeEngine.make_meme_variants), the wall-clock times at which the
+            render started and finished, and the metrics the worker recorded
+            since its previous job (see MetricsRegistry.drain).
+    """
+    started = time.time()
+    key = tuple(sorted(engine_options.items()))
+    engine = _engines.get(key)
+    if engine is None:
+        metrics.install()
+        engine = _engines[key] = MemeEngine(**engine_options)
+    if widths:
+        path = engine.make_meme_variants(
+            img_path, text, author, widths, output_format=output_format
+        )
+    else:
+        path = engine.make_meme(
+            img_path, text, author, width=width, output_format=output_format
+        )
+    return path, started, time.time(), metrics.REGISTRY.drain()
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render queue has no room for another job.
+
+    Attributes:
+        retry_after: Suggested number of seconds before retrying.
+    """
+
+    def __init__(self, retry_after: int) -> None:
+        """Initialize the error with a retry hint.
+
+        Args:
+            retry_after: Suggested number of seconds before retrying.
+        """
+        super().__init__("Render queue is full")
+        self.retry_after = retry_after
+
+
+class RenderExecutor:
+    """Bounded process pool that renders memes.
+
+    Attributes:
+        output_dir: Directory where the workers save generated memes.
+        engine_options: Extra MemeEngine arguments used by the workers.
+        workers: Number of worker processes.
+        max_queue: Maximum number of jobs waiting or running at once.
+        retry_after: Seconds suggested to clients when the queue is full.
+
+    Example:
+        executor = RenderExecutor('./static', workers=2)
+        path = executor.render(img_path, 'hello', 'author')
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        workers: int = 2,
+        max_queue: Optional[int] = None,
+        retry_after: int = 1,
+        engine_options: Optional[dict] = None,
+    ) -> None:
+        """Initialize the executor; worker processes start on first use.
+
+        Args:
+            output_dir: Directory where the workers save generated memes.
+            workers: Number of worker processes.
+            max_queue: Maximum number of jobs waiting or running at once.
+                Defaults to four jobs per worker.
+            retry_after: Seconds suggested to clients when the queue is full.
+            engine_options: Extra MemeEngine arguments used by the workers,
+                e.g. {"shard_depth": 2}.
+        """
+        self.output_dir = output_dir
+        self.engine_options = dict(engine_options or {}, output_dir=output_dir)
+        self.workers = workers
+        self.max_queue = max_queue if max_queue is not None else workers * 4
+        self.retry_after = retry_after
+        # spawn: the web app runs background threads, which fork does not copy
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._render_total = 0.0
+
+    def _on_done(self, submitted_at: float, future: Future) -> None:
+        """Release the job's slot and record its timings."""
+        self._slots.release()
+        with self._lock:
+            self._depth -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            _path, started, finished, drained = future.result()
+            wait = max(0.0, started - submitted_at)
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._render_total += finished - started
+        # Stage timings were recorded in the worker: merge them into ours
+        metrics.REGISTRY.merge(drained)
+
+    def submit(
+        self,
+        img_path: Union[str, bytes],
+        text: str,
+        author: str,
+        width: int = 500,
+        output_format: Optional[str] = None,
+        widths: Optional[Tuple[int, ...]] = None,
+    ) -> Future:
+        """Queue a render job without blocking.
+
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            text: Quote body text to display on the meme.
+            author: Quote author to display on the meme.
+            width: Maximum width for the output image in pixels.
+            output_format: Output format; defaults to the engine's.
+            widths: Render a variant at each of these widths instead of one
+                meme at width.
+
+        Returns:
+            Future: Resolves to (path, started, finished, metrics); see
+                _render.
+
+        Raises:
+            RenderQueueFull: If max_queue jobs are already waiting or running.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise RenderQueueFull(self.retry_after)
+
+        submitted_at = time.time()
+        with self._lock:
+            self._depth += 1
+            self._submitted += 1
+        try:
+            future = self._pool.submit(
+                _render,
+                self.engine_options,
+                img_path,
+                text,
+                author,
+                width,
+                output_format,
+                widths,
+            )
+        except Exception:
+            with self._lock:
+                self._depth -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._on_done(submitted_at, f))
+        return future
+
+    def render(
+        self,
+        img_path: Union[str, bytes],
+        text: str,
+        author: str,
+        width: int = 500,
+        output_format: Optional[str] = None,
+    ) -> str:
+        """Render a meme in the pool and wait for the result.
+
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            text: Quote body text to display on the meme.
+            author: Quote author to display on the meme.
+            width: Maximum width for the output image in pixels.
+            output_format: Output format; defaults to the engine's.
+
+        Returns:
+            str: Path to the generated meme image file.
+
+        Raises:
+            RenderQueueFull: If the queue is saturated.
+        """
+        return self.submit(img_path, text, author, width, output_format).result()[0]
+
+    def stats(self) -> dict:
+        """Return queue depth and timing metrics.
+
+        Returns:
+            dict: Current queue depth and capacity, job counters, and average
+                and maximum queue wait plus average render time in seconds.
+        """
+        with self._lock:
+            completed = self._completed
+            return {
+                "queue_depth": self._depth,
+                "max_queue": self.max_queue,
+                "workers": self.workers,
+                "submitted": self._submitted,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "wait_avg_seconds": self._wait_total / completed if completed else 0.0,
+                "wait_max_seconds": self._wait_max,
+                "render_avg_seconds": (
+                    self._render_total / completed if completed else 0.0
+                ),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes.
+
+        Args:
+            wait: Whether to wait for queued jobs to finish.
+        """
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,265 @@
+"""Retention policy for the directory of generated memes.
+
+This module provides the RetentionManager class, which keeps the output
+directory under a maximum total size, a maximum number of files and a
+maximum age. Each enforcement pass rescans the directory, so the limits
+cover the memes written by every worker process and not only this one.
+Accesses recorded by this process are merged into the scan and written back
+as the file's access time, so the other processes see them too. The least
+recently accessed memes are evicted first.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+class RetentionManager:
+    """Evict generated memes by age, count and total size.
+
+    Limits set to 0 are disabled.
+
+    Attributes:
+        directory: Directory holding the generated memes.
+        max_bytes: Maximum total size of the directory.
+        max_files: Maximum number of files in the directory.
+        max_age: Seconds after the last access at which a file is evicted.
+        interval: Seconds between two background enforcement passes.
+        temp_glob: Pattern of leftover temporary files to sweep, or None.
+        temp_max_age: Age in seconds after which temp files are removed.
+        keep: Callable returning paths that must not be evicted, such as
+            memes pre-rendered but not served yet, or None.
+
+    Example:
+        retention = RetentionManager('./static', max_bytes=1024 ** 3)
+        retention.start()
+        retention.record(path)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 0,
+        max_files: int = 0,
+        max_age: float = 0.0,
+        interval: float = 60.0,
+        temp_glob: Optional[str] = None,
+        temp_max_age: float = 3600.0,
+        keep: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> None:
+        """Initialize the manager and index the directory once.
+
+        Args:
+            directory: Directory holding the generated memes.
+            max_bytes: Maximum total size of the directory.
+            max_files: Maximum number of files in the directory.
+            max_age: Seconds after the last access at which a file is evicted.
+            interval: Seconds between two background enforcement passes.
+            temp_glob: Pattern of leftover temporary files to sweep, or None.
+            temp_max_age: Age in seconds after which temp files are removed.
+            keep: Callable returning paths that must not be evicted, or None.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_age = max_age
+        self.interval = interval
+        self.temp_glob = temp_glob
+        self.temp_max_age = temp_max_age
+        self.keep = keep
+        self._lock = threading.Lock()
+        # path -> (size, last access), least recently accessed first
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.evicted = 0
+        self.rescan()
+
+    def rescan(self) -> None:
+        """Rebuild the index from the directory contents.
+
+        Files written by other processes are picked up, and files they
+        removed are dropped. A file's access time is the later of the one on
+        disk and the one already indexed.
+        """
+        started = time.time()
+        entries = []
+        stack = [self.directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for item in it:
+                        if item.is_dir(follow_symlinks=False):
+                            stack.append(item.path)
+                        elif item.is_file(follow_symlinks=False):
+                            try:
+                                st = item.stat()
+                            except FileNotFoundError:
+                                # Evicted by another process meanwhile
+                                continue
+                            accessed = max(st.st_atime, st.st_mtime)
+                            entries.append((accessed, item.path, st.st_size))
+            except FileNotFoundError:
+                continue
+
+        with self._lock:
+            known = self._index
+            scanned = set()
+            for i, (accessed, path, size) in enumerate(entries):
+                scanned.add(path)
+                if path in known:
+                    entries[i] = (max(accessed, known[path][1]), path, size)
+            # Keep files recorded by this process while the scan was running
+            for path, (size, accessed) in known.items():
+                if path not in scanned and accessed >= started:
+                    entries.append((accessed, path, size))
+            self._index = OrderedDict()
+            self._total_bytes = 0
+            for accessed, path, size in sorted(entries):
+                self._index[path] = (size, accessed)
+                self._total_bytes += size
+
+    def record(self, path: str) -> None:
+        """Add a newly written file to the index.
+
+        Args:
+            path: Path of the new file.
+        """
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        with self._lock:
+            old = self._index.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old[0]
+            self._index[path] = (size, time.time())
+            self._total_bytes += size
+
+    def touch(self, path: str) -> None:
+        """Mark a file as just accessed.
+
+        The access time is also set on disk, keeping the modification time,
+        so the rescans of other processes see it.
+
+        Args:
+            path: Path of the file that was served.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is not None:
+                self._index[path] = (entry[0], now)
+                self._index.move_to_end(path)
+        try:
+            os.utime(path, ns=(int(now * 1e9), os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+
+    def _select_victims(self, now: float) -> List[str]:
+        """Pop the index entries that violate a limit, oldest first.
+
+        Paths returned by keep are skipped, even if that leaves a limit
+        exceeded.
+        """
+        kept = set(self.keep()) if self.keep is not None else set()
+        victims = []
+        with self._lock:
+            for path, (size, accessed) in list(self._index.items()):
+                expired = self.max_age and now - accessed > self.max_age
+                too_big = self.max_bytes and self._total_bytes > self.max_bytes
+                too_many = self.max_files and len(self._index) > self.max_files
+                if not (expired or too_big or too_many):
+                    break
+                if path in kept:
+                    continue
+                del self._index[path]
+                self._total_bytes -= size
+                victims.append(path)
+        return victims
+
+    def sweep_temp(self, now: Optional[float] = None) -> int:
+        """Remove temporary files left behind by crashed requests.
+
+        Args:
+            now: Current time; defaults to time.time().
+
+        Returns:
+            int: Number of files removed.
+        """
+        if not self.temp_glob:
+            return 0
+        now = time.time() if now is None else now
+        removed = 0
+        for path in glob.glob(self.temp_glob):
+            try:
+                if now - os.stat(path).st_mtime > self.temp_max_age:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def enforce(self) -> List[str]:
+        """Rescan the directory and evict files until every limit is met.
+
+        Returns:
+            List[str]: Paths of the evicted files.
+        """
+        self.rescan()
+        victims = self._select_victims(time.time())
+        for path in victims:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠ Failed to evict {path}: {e}")
+        self.evicted += len(victims)
+        self.sweep_temp()
+        return victims
+
+    def _run(self) -> None:
+        """Enforce the limits every interval until stop() is called."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.enforce()
+            except Exception as e:
+                print(f"⚠ Retention pass failed: {e}")
+
+    def start(self) -> None:
+        """Start enforcing the limits in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="meme-retention", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Return the indexed size of the directory.
+
+        Returns:
+            dict: Number of files, total bytes and files evicted so far.
+        """
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self._total_bytes,
+                "evicted": self.evicted,
+            }
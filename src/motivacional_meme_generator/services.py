@@ -0,0 +1,812 @@
+"""Components shared by the web front ends of the meme generator.
+
+This module provides the configuration defaults and the MemeServices class,
+which builds the corpus, meme engine, render pool, image fetcher and image
+cache from one configuration mapping. Both the Flask application in web.py
+and the asyncio application in asgi.py are thin routing layers on top of it.
+"""
+
+from __future__ import annotations
+
+import base64
+import gc
+import os
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from werkzeug.security import safe_join
+
+from .corpus import Corpus, CorpusWatcher, load_corpus, preload_corpus
+from .fetch import ImageFetcher, ImageTooLarge, UnsupportedImageType
+from .fonts import resolve_font
+from .http_cache import ContentETags
+from .image_cache import DEFAULT_IMAGE_CACHE_DIR, RemoteImageCache
+from .meme_pool import MemePool
+from .photo_manifest import DEFAULT_MANIFEST_DIR
+from .prep import DEFAULT_PREP_DIR
+from . import metrics
+from .MemeEngine import OUTPUT_FORMATS, MemeEngine, available_formats, media_type
+from .render_pool import RenderExecutor, RenderQueueFull
+from .retention import RetentionManager
+from .shared_images import SharedImageCache
+from .storage import is_meme_name, shard_path
+
+# Tunables, each overridable through an environment variable of the same name
+DEFAULT_CONFIG = {
+    "MEME_WATCH_INTERVAL": 0.0,
+    "MEME_OUTPUT_SHARD_DEPTH": 0,
+    "MEME_OUTPUT_FORMATS": "jpeg",
+    "MEME_OUTPUT_QUALITY": 75,
+    "MEME_OUTPUT_WIDTHS": "",
+    "MEME_FONT": "arial.ttf",
+    "MEME_TEXT_BACKEND": "freetype",
+    "MEME_PHOTO_MANIFEST_DIR": DEFAULT_MANIFEST_DIR,
+    "MEME_PREP_DIR": DEFAULT_PREP_DIR,
+    "MEME_SHARED_IMAGES_BYTES": 0,
+    "MEME_POOL_SIZE": 0,
+    "MEME_POOL_REFILL_INTERVAL": 0.0,
+    "MEME_POOL_WARMUP": 0,
+    "MEME_RENDER_WORKERS": 0,
+    "MEME_RENDER_QUEUE": 0,
+    "MEME_RENDER_RETRY_AFTER": 1,
+    "MEME_FETCH_MAX_BYTES": 10 * 1024 * 1024,
+    "MEME_FETCH_TIMEOUT": 5.0,
+    "MEME_FETCH_POOL_SIZE": 10,
+    "MEME_IMAGE_CACHE_DIR": DEFAULT_IMAGE_CACHE_DIR,
+    "MEME_IMAGE_CACHE_MEMORY_BYTES": 64 * 1024 * 1024,
+    "MEME_IMAGE_CACHE_DISK_BYTES": 512 * 1024 * 1024,
+    "MEME_IMAGE_CACHE_TTL": 3600.0,
+    "MEME_RETENTION_MAX_BYTES": 0,
+    "MEME_RETENTION_MAX_FILES": 0,
+    "MEME_RETENTION_MAX_AGE": 0.0,
+    "MEME_RETENTION_INTERVAL": 60.0,
+    "MEME_RETENTION_TEMP_GLOB": "",
+    "MEME_API_MAX_BATCH": 16,
+}
+
+
+def load_config(overrides: dict = None) -> dict:
+    """Build the application config from defaults, environment and overrides.
+
+    Environment values are converted to the type of the matching default.
+
+    Args:
+        overrides: Values taking precedence over defaults and environment.
+
+    Returns:
+        dict: The resolved configuration.
+    """
+    config = dict(DEFAULT_CONFIG)
+    for key, default in DEFAULT_CONFIG.items():
+        if key in os.environ:
+            config[key] = type(default)(os.environ[key])
+    config.update(overrides or {})
+    return config
+
+
+# Width the page shows memes at; also the width of single-size memes
+PAGE_WIDTH = 500
+# sizes attribute matching the page layout, for srcset
+PAGE_IMAGE_SIZES = f"(max-width: {PAGE_WIDTH}px) 100vw, {PAGE_WIDTH}px"
+
+# Quotes and photos shipped with the package
+DEFAULT_DATA_DIR = str(Path(__file__).parent / "_data")
+
+
+def corpus_paths(data_dir: str) -> Tuple[List[str], str]:
+    """Return the quote paths and photo directory of a data directory."""
+    return [os.path.join(data_dir, "DogQuotes")], os.path.join(data_dir, "photos", "dog")
+
+
+def output_widths(config: dict) -> Tuple[int, ...]:
+    """Return the widths of the variants rendered for pages, narrowest first."""
+    return tuple(
+        sorted({int(w) for w in config["MEME_OUTPUT_WIDTHS"].split(",") if w.strip()})
+    )
+
+
+def share_photos(corpus: Corpus, config: dict) -> SharedImageCache:
+    """Decode the photos of a corpus into a new shared memory block.
+
+    Args:
+        corpus: Corpus whose current photos are decoded.
+        config: Resolved configuration; MEME_SHARED_IMAGES_BYTES caps the block.
+
+    Returns:
+        SharedImageCache: The block, owned by this process.
+    """
+    cache = SharedImageCache.create(
+        corpus.snapshot.images,
+        width=max(output_widths(config), default=PAGE_WIDTH),
+        max_bytes=config["MEME_SHARED_IMAGES_BYTES"],
+    )
+    print(f"✓ Shared {len(cache)} decoded photos")
+    return cache
+
+
+# Shared photos decoded by preload(), by absolute photo directory
+_preloaded_images: Dict[str, SharedImageCache] = {}
+
+
+def preload(data_dir: Optional[str] = None) -> None:
+    """Load what every worker needs once, in the master of a prefork server.
+
+    Parses the corpus, reads the font index and loads Pillow's plugins.
+    When MEME_SHARED_IMAGES_BYTES is set, it also decodes the photos into
+    the shared memory block every worker then maps. Finally it collects
+    garbage and freezes every surviving object with gc.freeze(). Frozen
+    objects are never scanned by the collector again, so the GC passes of
+    forked workers do not write to, and copy, the pages holding them. Call
+    it after the master is configured and before it forks; applications
+    created in the workers then reuse the corpus and the shared photos.
+
+    Args:
+        data_dir: Directory containing quotes and images data. If None,
+            uses package data.
+    """
+    config = load_config()
+    corpus = preload_corpus(
+        *corpus_paths(data_dir or DEFAULT_DATA_DIR),
+        config["MEME_PHOTO_MANIFEST_DIR"] or None,
+    )
+    if config["MEME_SHARED_IMAGES_BYTES"] > 0:
+        images_dir = os.path.abspath(corpus.images_dir)
+        _preloaded_images[images_dir] = share_photos(corpus, config)
+    resolve_font(config["MEME_FONT"])
+    available_formats()  # loads Pillow's plugins
+    # CPython cannot move objects: collecting first at least keeps garbage
+    # out of the frozen generation and lets workers reuse the freed memory
+    gc.collect()
+    gc.freeze()
+
+
+# A rendered page image: (width, path) of each variant, narrowest first
+Variants = List[Tuple[int, str]]
+
+
+def fetch_error_message(error: Exception) -> str:
+    """Return the message shown to users when an image download fails.
+
+    Args:
+        error: Exception raised while downloading the image.
+
+    Returns:
+        str: A short, user-facing explanation.
+    """
+    if isinstance(error, ImageTooLarge):
+        return "Image at the provided URL is too large"
+    if isinstance(error, UnsupportedImageType):
+        return "Provided URL does not point to a supported image"
+    return "Unable to fetch image from provided URL"
+
+
+@dataclass
+class RenderJob:
+    """One meme requested through the JSON API.
+
+    Attributes:
+        image: URL of the source image, or None for a random corpus photo.
+        body: Quote body text to display on the meme.
+        author: Quote author to display on the meme.
+        output_format: Output format, a key of OUTPUT_FORMATS.
+    """
+
+    image: Optional[str]
+    body: str
+    author: str
+    output_format: str = "jpeg"
+
+
+def parse_render_jobs(
+    payload, max_batch: int, formats: Optional[list] = None
+) -> List[RenderJob]:
+    """Validate a JSON API request and convert it to render jobs.
+
+    The payload is either one job object or {"memes": [job, ...]}, where a
+    job has a required "body" and "author", an optional image URL under
+    "image" and an optional "format". A top-level "inline" flag is read by
+    the routes, not here.
+
+    Args:
+        payload: Decoded JSON body of the request.
+        max_batch: Maximum number of jobs in one request.
+        formats: Formats a job may ask for, besides 'jpeg'.
+
+    Returns:
+        List[RenderJob]: The jobs, in request order.
+
+    Raises:
+        ValueError: If the payload is malformed, with a client-facing message.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    items = payload["memes"] if "memes" in payload else [payload]
+    if not isinstance(items, list) or not items:
+        raise ValueError("'memes' must be a non-empty list")
+    if len(items) > max_batch:
+        raise ValueError(f"At most {max_batch} memes per request")
+
+    allowed = set(formats or ()) | {"jpeg"}
+    jobs = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"Meme {i}: must be a JSON object")
+        body, author = item.get("body"), item.get("author")
+        if not (body and author and isinstance(body, str) and isinstance(author, str)):
+            raise ValueError(f"Meme {i}: both 'body' and 'author' are required")
+        image = item.get("image")
+        if image is not None and (
+            not isinstance(image, str) or not image.startswith(("http://", "https://"))
+        ):
+            raise ValueError(f"Meme {i}: 'image' must be an http(s) URL")
+        output_format = item.get("format", "jpeg")
+        if output_format not in allowed:
+            raise ValueError(f"Meme {i}: unsupported format {output_format!r}")
+        jobs.append(RenderJob(image, body, author, output_format))
+    return jobs
+
+
+class MemeServices:
+    """Corpus, rendering and download components of a web application.
+
+    Attributes:
+        config: Resolved MEME_* configuration.
+        data_dir: Directory containing quotes and images data.
+        static_dir: Directory where generated memes are saved.
+        corpus: Quotes and images available for random memes.
+        shared_images: Photos decoded once for all workers, or None.
+        meme_engine: Engine used when rendering in-process.
+        executor: Render process pool, or None to render in-process.
+        output_formats: Formats offered through content negotiation.
+        output_widths: Widths of the variants rendered for pages, or empty
+            for one meme at PAGE_WIDTH.
+        fetcher: Pooled HTTP client for user-supplied image URLs.
+        image_cache: Cache of images downloaded by URL.
+        pool: Pool of pre-rendered random memes, or None.
+        retention: Eviction policy of the static directory, or None.
+        etags: Content-hash ETags of the served memes.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        data_dir: Optional[str] = None,
+        static_dir: Optional[str] = None,
+    ) -> None:
+        """Build all components and start their background threads.
+
+        Args:
+            config: Resolved MEME_* configuration (see load_config).
+            data_dir: Directory containing quotes and images data. If None,
+                uses package data.
+            static_dir: Directory where generated memes are saved. If None,
+                uses ./static.
+        """
+        if data_dir is None:
+            data_dir = DEFAULT_DATA_DIR
+        if static_dir is None:
+            # Use default static directory
+            static_dir = str(Path.cwd() / "static")
+        self.config = config
+        self.data_dir = data_dir
+        # Record render and parse timings for /metrics
+        metrics.install()
+        self.static_dir = static_dir
+
+        os.makedirs(static_dir, exist_ok=True)
+        engine_options = {
+            "shard_depth": config["MEME_OUTPUT_SHARD_DEPTH"],
+            "quality": config["MEME_OUTPUT_QUALITY"],
+            "font": config["MEME_FONT"],
+            "text_backend": config["MEME_TEXT_BACKEND"],
+            "prep_dir": config["MEME_PREP_DIR"] or None,
+        }
+        # Formats offered to clients, most preferred first; JPEG is the fallback
+        supported = available_formats()
+        self.output_formats = [
+            name.strip()
+            for name in config["MEME_OUTPUT_FORMATS"].split(",")
+            if name.strip() in supported
+        ]
+        self.output_widths = output_widths(config)
+        self.etags = ContentETags()
+
+        # Load quotes and images, unless preload() already did; the watcher
+        # keeps them in sync with the disk
+        self.corpus = load_corpus(
+            *corpus_paths(data_dir), config["MEME_PHOTO_MANIFEST_DIR"] or None
+        )
+        self.watcher = None
+        if config["MEME_WATCH_INTERVAL"] > 0:
+            self.watcher = CorpusWatcher(
+                self.corpus, interval=config["MEME_WATCH_INTERVAL"]
+            )
+            self.watcher.start()
+
+        # Decode the photos once: in the master if preload() did, else for
+        # this process and its render workers. The block is never rebuilt;
+        # photos added or modified since are decoded on each render instead
+        self.shared_images = None
+        self._owns_shared_images = False
+        if config["MEME_SHARED_IMAGES_BYTES"] > 0:
+            self.shared_images = _preloaded_images.get(
+                os.path.abspath(self.corpus.images_dir)
+            )
+            if self.shared_images is None:
+                self.shared_images = share_photos(self.corpus, config)
+                self._owns_shared_images = True
+            engine_options["shared_images"] = self.shared_images.name
+        self.meme_engine = MemeEngine(static_dir, **engine_options)
+
+        # Render in worker processes when configured, else in the caller
+        self.executor = None
+        if config["MEME_RENDER_WORKERS"] > 0:
+            self.executor = RenderExecutor(
+                static_dir,
+                workers=config["MEME_RENDER_WORKERS"],
+                max_queue=config["MEME_RENDER_QUEUE"] or None,
+                retry_after=config["MEME_RENDER_RETRY_AFTER"],
+                engine_options=engine_options,
+            )
+
+        # One pooled HTTP session shared by all downloads
+        self.fetcher = ImageFetcher(
+            max_bytes=config["MEME_FETCH_MAX_BYTES"],
+            timeout=config["MEME_FETCH_TIMEOUT"],
+            pool_size=config["MEME_FETCH_POOL_SIZE"],
+        )
+        self.image_cache = RemoteImageCache(
+            self.fetcher,
+            cache_dir=config["MEME_IMAGE_CACHE_DIR"] or None,
+            max_memory_bytes=config["MEME_IMAGE_CACHE_MEMORY_BYTES"],
+            max_disk_bytes=config["MEME_IMAGE_CACHE_DISK_BYTES"],
+            ttl=config["MEME_IMAGE_CACHE_TTL"],
+            # Keep downloads large enough for the widest variant
+            width=max(self.output_widths, default=PAGE_WIDTH),
+        )
+
+        # Limit the static directory when any retention limit is set; pooled
+        # memes are exempt, and the pool is created below
+        self.pool = None
+        self.retention = None
+        if (
+            config["MEME_RETENTION_MAX_BYTES"] > 0
+            or config["MEME_RETENTION_MAX_FILES"] > 0
+            or config["MEME_RETENTION_MAX_AGE"] > 0
+            or config["MEME_RETENTION_TEMP_GLOB"]
+        ):
+            self.retention = RetentionManager(
+                static_dir,
+                max_bytes=config["MEME_RETENTION_MAX_BYTES"],
+                max_files=config["MEME_RETENTION_MAX_FILES"],
+                max_age=config["MEME_RETENTION_MAX_AGE"],
+                interval=config["MEME_RETENTION_INTERVAL"],
+                temp_glob=config["MEME_RETENTION_TEMP_GLOB"] or None,
+                keep=self._pooled_paths,
+            )
+            self.retention.start()
+
+        if config["MEME_POOL_SIZE"] > 0:
+            self.pool = MemePool(
+                self.render_random,
+                size=config["MEME_POOL_SIZE"],
+                refill_interval=config["MEME_POOL_REFILL_INTERVAL"],
+                warmup=config["MEME_POOL_WARMUP"],
+            )
+            self.pool.start()
+
+    def negotiate_format(self, accept: Optional[str]) -> str:
+        """Pick the output format of a meme from an Accept header.
+
+        Only formats the client names explicitly are chosen: a bare */* is
+        not taken as support for WebP or AVIF.
+
+        Args:
+            accept: Value of the request's Accept header, or None.
+
+        Returns:
+            str: The first configured format the client accepts, else 'jpeg'.
+        """
+        accepted = parse_accept_header(accept, MIMEAccept)
+        explicit = {value.lower() for value, quality in accepted if quality > 0}
+        for name in self.output_formats:
+            if OUTPUT_FORMATS[name][2] in explicit:
+                return name
+        return "jpeg"
+
+    def render(
+        self,
+        img_path: Union[str, bytes],
+        body: str,
+        author: str,
+        output_format: Optional[str] = None,
+    ) -> str:
+        """Render a meme, in the render pool if there is one.
+
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            body: Quote body text to display on the meme.
+            author: Quote author to display on the meme.
+            output_format: Output format, e.g. from negotiate_format();
+                defaults to JPEG.
+
+        Returns:
+            str: Path to the generated meme image file.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        if self.executor is not None:
+            path = self.executor.render(
+                img_path, body, author, output_format=output_format
+            )
+        else:
+            path = self.meme_engine.make_meme(
+                img_path, body, author, output_format=output_format
+            )
+        self.rendered(path)
+        return path
+
+    def render_variants(
+        self,
+        img_path: Union[str, bytes],
+        body: str,
+        author: str,
+        output_format: Optional[str] = None,
+    ) -> Variants:
+        """Render a meme for a page, at every configured output width.
+
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            body: Quote body text to display on the meme.
+            author: Quote author to display on the meme.
+            output_format: Output format; defaults to JPEG.
+
+        Returns:
+            Variants: Width and path of each variant, narrowest first; a
+                single PAGE_WIDTH meme if no output widths are configured.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        if not self.output_widths:
+            return [(PAGE_WIDTH, self.render(img_path, body, author, output_format))]
+        if self.executor is not None:
+            variants = self.executor.submit(
+                img_path, body, author,
+                output_format=output_format, widths=self.output_widths,
+            ).result()[0]
+        else:
+            variants = self.meme_engine.make_meme_variants(
+                img_path, body, author, self.output_widths, output_format
+            )
+        for _width, path in variants:
+            self.rendered(path)
+        return variants
+
+    def page_image(self, variants: Variants) -> dict:
+        """Return the template context of a meme's img element.
+
+        The src is the narrowest variant at least PAGE_WIDTH wide, or the
+        widest one; srcset lists every variant when there are several.
+
+        Args:
+            variants: Result of render_variants.
+
+        Returns:
+            dict: 'path', 'srcset' and 'sizes' for meme.html.
+        """
+        src = next(
+            (path for width, path in variants if width >= PAGE_WIDTH), variants[-1][1]
+        )
+        srcset = ""
+        if len(variants) > 1:
+            srcset = ", ".join(
+                f"{self.meme_url(path)} {width}w" for width, path in variants
+            )
+        return {"path": self.meme_url(src), "srcset": srcset, "sizes": PAGE_IMAGE_SIZES}
+
+    def submit(
+        self,
+        img_path: Union[str, bytes],
+        body: str,
+        author: str,
+        output_format: Optional[str] = None,
+    ) -> Future:
+        """Start a render without waiting for it.
+
+        Without a render pool the meme is rendered before returning, and the
+        returned future is already done.
+
+        Args:
+            img_path: Path to the source image file, or the encoded image.
+            body: Quote body text to display on the meme.
+            author: Quote author to display on the meme.
+            output_format: Output format; defaults to JPEG.
+
+        Returns:
+            Future: Resolves to (path, started, finished, metrics); see
+                render_pool._render.
+
+        Raises:
+            RenderQueueFull: If the render pool is saturated.
+        """
+        if self.executor is not None:
+            return self.executor.submit(
+                img_path, body, author, output_format=output_format
+            )
+        future: Future = Future()
+        try:
+            path = self.meme_engine.make_meme(
+                img_path, body, author, output_format=output_format
+            )
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result((path, None, None, {}))
+        return future
+
+    def job_image(self, job: RenderJob) -> Union[str, bytes]:
+        """Return the source image of a job.
+
+        Args:
+            job: The render job.
+
+        Returns:
+            Union[str, bytes]: A corpus photo path, or the downloaded image.
+
+        Raises:
+            LookupError: If no image URL is given and the corpus is empty.
+            Exception: Download errors; see fetch_error_message.
+        """
+        if job.image is None:
+            images = self.corpus.snapshot.images
+            if not images:
+                raise LookupError("Resources not available")
+            return random.choice(images)
+        return self.download(job.image)
+
+    def download(self, url: str) -> bytes:
+        """Get a user-supplied image by URL, from the cache if possible.
+
+        Args:
+            url: URL of the image.
+
+        Returns:
+            bytes: The image, downscaled for rendering.
+
+        Raises:
+            Exception: Download errors; see fetch_error_message.
+        """
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            data = self.image_cache.get(url)
+            outcome = "ok"
+            return data
+        finally:
+            metrics.IMAGE_DOWNLOAD_SECONDS.observe(
+                time.perf_counter() - started, outcome=outcome
+            )
+
+    def render_batch(self, jobs: List[RenderJob], inline: bool = False) -> List[dict]:
+        """Render API jobs, fanning them out to the render pool.
+
+        Images are downloaded concurrently, then every render is submitted
+        before any result is awaited.
+
+        Args:
+            jobs: Jobs from parse_render_jobs.
+            inline: Whether to include the encoded memes in the results.
+
+        Returns:
+            List[dict]: One api_result() or {"error": message} per job.
+
+        Raises:
+            RenderQueueFull: If the render pool cannot take the whole batch;
+                the jobs already queued are cancelled.
+        """
+        with ThreadPoolExecutor(max(1, min(len(jobs), 8))) as downloads:
+            images = [downloads.submit(self.job_image, job) for job in jobs]
+
+        futures: List[Union[Future, str]] = []
+        try:
+            for job, image in zip(jobs, images):
+                try:
+                    data = image.result()
+                except LookupError as e:
+                    futures.append(str(e))
+                    continue
+                except Exception as e:
+                    futures.append(fetch_error_message(e))
+                    continue
+                futures.append(
+                    self.submit(data, job.body, job.author, job.output_format)
+                )
+        except RenderQueueFull:
+            for future in futures:
+                if isinstance(future, Future):
+                    future.cancel()
+            raise
+
+        results = []
+        for job, future in zip(jobs, futures):
+            if isinstance(future, str):
+                results.append({"error": future})
+                continue
+            try:
+                path = future.result()[0]
+            except Exception as e:
+                results.append({"error": f"Error generating meme: {e}"})
+                continue
+            self.rendered(path)
+            results.append(self.api_result(path, inline))
+        return results
+
+    def api_result(self, path: str, inline: bool = False) -> dict:
+        """Describe a rendered meme in a JSON API response.
+
+        The content type follows the file, which is GIF or WebP for memes
+        made from animations whatever format was requested.
+
+        Args:
+            path: Path of the meme.
+            inline: Whether to include the encoded meme, base64-encoded.
+
+        Returns:
+            dict: URL and MIME type of the meme, plus its data if inline.
+        """
+        result = {
+            "url": self.meme_url(path),
+            "content_type": media_type(path),
+        }
+        if inline:
+            with open(path, "rb") as f:
+                result["data"] = base64.b64encode(f.read()).decode("ascii")
+        return result
+
+    def rendered(self, path: str) -> None:
+        """Account for a meme written to the static directory.
+
+        Args:
+            path: Path of the new meme.
+        """
+        if self.retention is not None:
+            self.retention.record(path)
+
+    def served(self, path: str) -> None:
+        """Account for a meme served from the static directory.
+
+        Args:
+            path: Path of the served meme.
+        """
+        if self.retention is not None:
+            self.retention.touch(path)
+
+    def pick_random(self) -> tuple:
+        """Pick a random image and quote from the corpus.
+
+        Returns:
+            tuple: An image path and a QuoteModel.
+
+        Raises:
+            LookupError: If the corpus has no quotes or no images.
+        """
+        # One attribute read: the snapshot is swapped whole, never mutated
+        snapshot = self.corpus.snapshot
+        if not snapshot.images or not snapshot.quotes:
+            raise LookupError("Resources not available")
+        return random.choice(snapshot.images), random.choice(snapshot.quotes)
+
+    def render_random(self, output_format: Optional[str] = None) -> Variants:
+        """Render a meme from a random quote and image of the corpus.
+
+        Args:
+            output_format: Output format; defaults to JPEG.
+
+        Returns:
+            Variants: The meme at each output width; see render_variants.
+
+        Raises:
+            LookupError: If the corpus has no quotes or no images.
+            RenderQueueFull: If the render pool is saturated.
+        """
+        img, quote = self.pick_random()
+        return self.render_variants(img, quote.body, quote.author, output_format)
+
+    def pop_prerendered(self, output_format: str = "jpeg") -> Optional[Variants]:
+        """Take a pre-rendered random meme, if the pool has one ready.
+
+        The pool only holds JPEG memes, so requests negotiated to another
+        format always render their own.
+
+        Args:
+            output_format: Output format negotiated for the request.
+
+        Returns:
+            Optional[Variants]: The meme's variants, or None.
+        """
+        if self.pool is None or output_format != "jpeg":
+            return None
+        while True:
+            variants = self.pool.pop()
+            # Skip memes whose files were removed while they waited
+            if variants is None or all(os.path.exists(p) for _, p in variants):
+                return variants
+
+    def _pooled_paths(self) -> List[str]:
+        """Return the paths of the pre-rendered memes not served yet."""
+        if self.pool is None:
+            return []
+        return [path for variants in self.pool.pending() for _, path in variants]
+
+    def meme_url(self, path: str) -> str:
+        """Convert the path of a generated meme to its URL.
+
+        Args:
+            path: Path returned by a render.
+
+        Returns:
+            str: URL under /memes, including any shard subdirectories.
+        """
+        relative = os.path.relpath(path, self.static_dir)
+        return "/memes/" + relative.replace(os.sep, "/")
+
+    def meme_file(self, name: str) -> Optional[str]:
+        """Resolve the name part of a /memes or /static URL to a file.
+
+        A bare meme name that is not found at the top of the static
+        directory is looked up in its shard, so URLs handed out before the
+        directory was migrated to MEME_OUTPUT_SHARD_DEPTH keep working.
+
+        Args:
+            name: Path of the meme relative to the static directory.
+
+        Returns:
+            Optional[str]: Path of the meme, or None if there is no such file.
+        """
+        path = safe_join(self.static_dir, name)
+        if path is None:
+            return None
+        depth = self.config["MEME_OUTPUT_SHARD_DEPTH"]
+        if not os.path.isfile(path) and depth > 0 and is_meme_name(name):
+            path = shard_path(self.static_dir, name, depth)
+        return path if os.path.isfile(path) else None
+
+    def stats(self) -> dict:
+        """Report render queue and image cache metrics.
+
+        Returns:
+            dict: Render executor, image cache, retention and shared image
+                statistics; disabled components report None.
+        """
+        return {
+            "render": self.executor.stats() if self.executor is not None else None,
+            "image_cache": self.image_cache.stats(),
+            "retention": (
+                self.retention.stats() if self.retention is not None else None
+            ),
+            "shared_images": (
+                self.shared_images.stats() if self.shared_images is not None else None
+            ),
+        }
+
+    def close(self) -> None:
+        """Stop background threads and worker processes."""
+        if self.pool is not None:
+            self.pool.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.retention is not None:
+            self.retention.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        if self._owns_shared_images:
+            self.shared_images.close()
+        self.fetcher.close()
@@ -0,0 +1,244 @@
+"""Decoded library photos shared by worker processes through shared memory.
+
+Every render worker used to decode the same library photos into its own
+memory, so memory grew with the number of workers. This module provides
+SharedImageCache: one process decodes the photos once into a
+multiprocessing.shared_memory block, as upright pixels downscaled to the
+widest render, preceded by a small JSON index. Other processes attach to
+the block by name, read-only, and wrap each photo with Image.frombuffer
+without copying it. Pixels are stored as RGBX, Pillow's in-memory layout
+of RGB images: frombuffer can only map that layout and copies packed RGB.
+Pillow copies a mapped image the first time it is written to, so renders
+never touch the shared pixels. MemeEngine looks photos up here before
+decoding them.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Optional
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow is optional at import time
+    Image = ImageOps = None
+
+# Length of the JSON index that starts the block
+HEADER = struct.Struct("<I")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process unlink it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attach is tracked, and the tracker unlinks
+        # tracked blocks when the process exits
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedImageCache:
+    """Read-only decoded photos in one shared memory block.
+
+    The index maps the absolute path of each photo to the offset of its
+    pixels, their size, the width of the source and the size and
+    modification time the source had when it was decoded.
+
+    Attributes:
+        name: Name of the shared memory block, for SharedImageCache.attach.
+        hits: Number of lookups answered from the block in this process.
+        misses: Number of lookups that fell back to decoding.
+
+    Example:
+        cache = SharedImageCache.create(paths, width=500)
+        img = SharedImageCache.attach(cache.name).get(paths[0], 500)
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False) -> None:
+        """Initialize the cache from a block; use create or attach instead.
+
+        Args:
+            shm: The shared memory block.
+            owner: Whether this process created the block and unlinks it.
+        """
+        self._shm = shm
+        self._owner_pid = os.getpid() if owner else None
+        (length,) = HEADER.unpack_from(shm.buf)
+        start = HEADER.size + length
+        self._index: Dict[str, list] = json.loads(bytes(shm.buf[HEADER.size:start]))
+        self._pixels = shm.buf[start:].toreadonly()
+        self.name = shm.name
+        self.hits = 0
+        self.misses = 0
+        # Release the views before SharedMemory's own cleanup at exit
+        atexit.register(self.close)
+
+    @classmethod
+    def create(
+        cls, paths: Iterable[str], width: int, max_bytes: int = 256 * 1024 * 1024
+    ) -> "SharedImageCache":
+        """Decode photos into a new shared memory block.
+
+        Animations and images with transparency are left out, as are the
+        photos that would take the block over max_bytes.
+
+        Args:
+            paths: Paths of the photos.
+            width: Widest render; larger photos are downscaled to it.
+            max_bytes: Maximum size of the decoded pixels.
+
+        Returns:
+            SharedImageCache: The cache, owned by this process.
+
+        Raises:
+            RuntimeError: If Pillow is not available.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is required for SharedImageCache")
+        index: Dict[str, list] = {}
+        images = []
+        total = 0
+        for path in paths:
+            try:
+                st = os.stat(path)
+                with Image.open(path) as img:
+                    has_alpha = "A" in img.getbands() or "transparency" in img.info
+                    if getattr(img, "is_animated", False) or has_alpha:
+                        continue
+                    img = ImageOps.exif_transpose(img)
+                    source_width = img.width
+                    # Same size and filter as MemeEngine._resize
+                    ratio = min(1, width / img.width)
+                    size = (int(img.width * ratio), int(img.height * ratio))
+                    img = img.convert("RGBX").resize(size, Image.LANCZOS)
+            except Exception as e:
+                print(f"⚠ Cannot share photo {os.path.basename(path)}: {e}")
+                continue
+            nbytes = img.width * img.height * 4
+            if total + nbytes > max_bytes:
+                continue
+            index[os.path.abspath(path)] = [
+                total, img.width, img.height, source_width, st.st_size, st.st_mtime_ns
+            ]
+            images.append(img)
+            total += nbytes
+
+        # Offsets are relative to the pixels, which follow the index
+        encoded = json.dumps(index).encode("utf-8")
+        start = HEADER.size + len(encoded)
+        shm = shared_memory.SharedMemory(create=True, size=start + total)
+        HEADER.pack_into(shm.buf, 0, len(encoded))
+        shm.buf[HEADER.size:start] = encoded
+        for (offset, w, h, *_rest), img in zip(index.values(), images):
+            shm.buf[start + offset:start + offset + w * h * 4] = img.tobytes()
+        cache = cls(shm, owner=True)
+        with _caches_lock:
+            _caches[cache.name] = cache
+        return cache
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedImageCache":
+        """Attach to a block created by another process.
+
+        Args:
+            name: Name of the block.
+
+        Returns:
+            SharedImageCache: The cache, read-only.
+
+        Raises:
+            FileNotFoundError: If no block has that name.
+        """
+        return cls(_attach(name))
+
+    def get(self, path: str, width: int):
+        """Return a shared photo for a render, without copying it.
+
+        Args:
+            path: Path of the source photo.
+            width: Maximum width of the render.
+
+        Returns:
+            Optional[Image.Image]: Read-only upright RGBX image, or None if
+                the photo is not shared, was decoded smaller than the render
+                needs, or was modified since.
+        """
+        entry = self._index.get(os.path.abspath(path))
+        if entry is not None:
+            offset, w, h, source_width, size, mtime_ns = entry
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if (
+                w >= min(width, source_width)
+                and st is not None
+                and (st.st_size, st.st_mtime_ns) == (size, mtime_ns)
+            ):
+                self.hits += 1
+                pixels = self._pixels[offset:offset + w * h * 4]
+                return Image.frombuffer("RGBX", (w, h), pixels, "raw", "RGBX", 0, 1)
+        self.misses += 1
+        return None
+
+    def __len__(self) -> int:
+        """Return the number of shared photos."""
+        return len(self._index)
+
+    def stats(self) -> dict:
+        """Return the number of photos, block size and this process's hits."""
+        return {
+            "images": len(self._index),
+            "bytes": self._shm.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        """Detach, and free the block if this process created it.
+
+        Forked children inherit the creator's cache but never free it.
+        """
+        atexit.unregister(self.close)
+        if self._owner_pid == os.getpid():
+            self._owner_pid = None
+            self._shm.unlink()
+        with _caches_lock:
+            if _caches.get(self.name) is self:
+                del _caches[self.name]
+        try:
+            self._pixels.release()
+            self._shm.close()
+        except BufferError:
+            # Images still wrap the pixels; the mapping goes with the process
+            pass
+
+
+_caches: Dict[str, SharedImageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_image_cache(name: str) -> Optional[SharedImageCache]:
+    """Return the process-wide cache of a block, attaching on first use.
+
+    Args:
+        name: Name of the block.
+
+    Returns:
+        Optional[SharedImageCache]: The cache, or None if the block is gone.
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            try:
+                cache = _caches[name] = SharedImageCache.attach(name)
+            except FileNotFoundError:
+                print(f"⚠ Shared image cache {name} not found")
+        return cache
@@ -0,0 +1,139 @@
+"""Layout of generated memes inside the output directory.
+
+This module decides where MemeEngine stores a generated meme. In the flat
+layout every meme sits directly in the output directory; in the sharded
+layout it goes into hash-prefixed subdirectories (e.g. ``3f/a2/meme_x.jpg``)
+so that no single directory grows to millions of entries. It also provides
+a migration command that moves an existing flat directory into shards:
+
+    python -m motivacional_meme_generator.storage ./static --depth 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import uuid
+
+# Hex characters per shard level: 256 subdirectories per level
+SHARD_WIDTH = 2
+
+# Prefix of every generated meme's file name
+MEME_PREFIX = "meme_"
+
+
+def new_meme_name(extension: str = ".jpg") -> str:
+    """Return a unique file name for a new meme.
+
+    Args:
+        extension: File extension, including the dot.
+
+    Returns:
+        str: A name such as 'meme_<32 hex digits>.jpg'.
+    """
+    return f"{MEME_PREFIX}{uuid.uuid4().hex}{extension}"
+
+
+def is_meme_name(filename: str) -> bool:
+    """Return whether a file name is one new_meme_name could have returned.
+
+    Args:
+        filename: Base name of a file.
+
+    Returns:
+        bool: True for names such as 'meme_<hex>.jpg'.
+    """
+    stem, extension = os.path.splitext(filename)
+    if os.path.basename(filename) != filename:
+        return False
+    return stem.startswith(MEME_PREFIX) and bool(extension)
+
+
+def shard_dirs(filename: str, depth: int) -> list:
+    """Return the shard subdirectories of a file name.
+
+    Args:
+        filename: Base name of the file.
+        depth: Number of shard levels; 0 means the flat layout.
+
+    Returns:
+        list: One hex prefix per level, derived from a hash of the name.
+    """
+    digest = hashlib.md5(filename.encode("utf-8")).hexdigest()
+    return [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(depth)]
+
+
+def shard_path(root: str, filename: str, depth: int) -> str:
+    """Return the path at which a file is stored.
+
+    Args:
+        root: Output directory.
+        filename: Base name of the file.
+        depth: Number of shard levels; 0 means the flat layout.
+
+    Returns:
+        str: Path of the file below root.
+    """
+    return os.path.join(root, *shard_dirs(filename, depth), filename)
+
+
+def migrate_to_sharded(root: str, depth: int = 2, dry_run: bool = False) -> int:
+    """Move the memes at the top of a flat directory into shards.
+
+    Only generated memes (see is_meme_name) are moved; other files in the
+    directory stay where they are. Files are renamed within the same filesystem, so the migration is cheap
+    and can be interrupted and resumed safely.
+
+    Args:
+        root: Output directory to migrate.
+        depth: Number of shard levels to create.
+        dry_run: Only count the files that would be moved.
+
+    Returns:
+        int: Number of memes moved.
+
+    Raises:
+        ValueError: If depth is not positive.
+    """
+    if depth < 1:
+        raise ValueError("Shard depth must be at least 1")
+    moved = 0
+    with os.scandir(root) as it:
+        for item in it:
+            if not item.is_file(follow_symlinks=False) or not is_meme_name(item.name):
+                continue
+            target = shard_path(root, item.name, depth)
+            if not dry_run:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(item.path, target)
+            moved += 1
+    return moved
+
+
+def main():
+    """Command-line entry point of the migration tool."""
+    parser = argparse.ArgumentParser(
+        description="Move a flat meme output directory into a sharded layout"
+    )
+    parser.add_argument("directory", help="Output directory to migrate")
+    parser.add_argument(
+        "--depth", type=int, default=2, help="Number of shard levels (default: 2)"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report how many files would move"
+    )
+    args = parser.parse_args()
+
+    try:
+        moved = migrate_to_sharded(args.directory, args.depth, args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"✓ {verb} {moved} memes into {args.depth}-level shards")
+
+
+if __name__ == "__main__":
+    main()
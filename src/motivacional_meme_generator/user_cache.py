@@ -0,0 +1,46 @@
+"""Per-user cache directory of the meme generator.
+
+Photo manifests, prepared photos and the font index are rebuilt from the
+disk whenever they are missing, so they belong in a cache directory. That
+directory must belong to the current user: files at fixed names in the
+shared temp directory can be planted or replaced by any local user.
+
+The module only depends on the standard library, so modules imported as
+top-level modules by meme.py and app.py can use it too.
+"""
+
+import os
+import sys
+
+APP_NAME = "motivacional-meme-generator"
+
+
+def user_cache_dir(*parts: str) -> str:
+    """Return a path below the current user's cache directory.
+
+    The directory is %LOCALAPPDATA% on Windows, ~/Library/Caches on macOS
+    and $XDG_CACHE_HOME (~/.cache by default) elsewhere. It is not created.
+
+    Args:
+        *parts: Path components below the application's cache directory.
+
+    Returns:
+        str: The path.
+    """
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(base, APP_NAME, *parts)
+
+
+def make_private_dir(path: str) -> None:
+    """Create a directory only the current user can read or write.
+
+    Args:
+        path: Directory to create, with its missing parents.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
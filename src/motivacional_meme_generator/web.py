@@ -4,91 +4,149 @@ This module provides a Flask-based web interface for generating memes.
 """
 
 import os
-import random
 import sys
-from pathlib import Path
 
-import requests
-from flask import Flask, abort, flash, redirect, render_template, request, url_for
+from flask import (
+    Flask, abort, flash, redirect, render_template, request, send_file, url_for
+)
+from werkzeug.security import safe_join
 
-from .MemeEngine import MemeEngine
-from .QuoteEngine import Ingestor
+from . import metrics
+from .http_cache import IMMUTABLE_CACHE_CONTROL, IMMUTABLE_MAX_AGE
+from .render_pool import RenderQueueFull
+from .services import (
+    DEFAULT_CONFIG,
+    MemeServices,
+    fetch_error_message,
+    load_config,
+    parse_render_jobs,
+)
 
 
-def create_app(data_dir: str = None, static_dir: str = None):
+def create_app(data_dir: str = None, static_dir: str = None, config: dict = None):
     """Create and configure the Flask application.
     
     Args:
         data_dir: Directory containing quotes and images data.
         static_dir: Directory for static files (generated memes).
+        config: Overrides for the MEME_* settings in DEFAULT_CONFIG.
         
     Returns:
         Flask: Configured Flask application.
     """
-    app = Flask(__name__, static_folder=static_dir, static_url_path='/static')
+    services = MemeServices(load_config(config), data_dir, static_dir)
+
+    app = Flask(
+        __name__, static_folder=services.static_dir, static_url_path='/static'
+    )
     app.secret_key = os.environ.get('SECRET_KEY', "replace-this-with-env-var")
-    
-    if data_dir is None:
-        # Use package data directory
-        package_dir = Path(__file__).parent
-        data_dir = str(package_dir / "_data")
-    
-    if static_dir is None:
-        # Use default static directory
-        static_dir = str(Path.cwd() / "static")
-    
-    # Create static directory
-    os.makedirs(static_dir, exist_ok=True)
-    meme_engine = MemeEngine(static_dir)
-    
-    def load_quotes():
-        """Load quotes from data directory."""
-        quote_files = [
-            os.path.join(data_dir, "DogQuotes", "DogQuotesTXT.txt"),
-            os.path.join(data_dir, "DogQuotes", "DogQuotesDOCX.docx"),
-            os.path.join(data_dir, "DogQuotes", "DogQuotesPDF.pdf"),
-            os.path.join(data_dir, "DogQuotes", "DogQuotesCSV.csv"),
-        ]
-        
-        quotes = []
-        for f in quote_files:
-            if os.path.exists(f):
-                try:
-                    quotes.extend(Ingestor.parse(f))
-                    print(f"✓ Loaded quotes from {os.path.basename(f)}")
-                except Exception as e:
-                    print(f"⚠ Failed to load {os.path.basename(f)}: {e}")
-                    continue
-            else:
-                print(f"⚠ File not found: {f}")
-        
-        return quotes
-    
-    def load_images():
-        """Load images from data directory."""
-        images_path = os.path.join(data_dir, "photos", "dog")
-        imgs = []
-        
-        if os.path.exists(images_path):
-            for root, _dirs, files in os.walk(images_path):
-                for name in files:
-                    # Skip Windows ADS artifacts and non-image files
-                    if ":" in name:
-                        continue
-                    lower = name.lower()
-                    if not lower.endswith((".jpg", ".jpeg", ".png", ".gif")):
-                        continue
-                    imgs.append(os.path.join(root, name))
-            print(f"✓ Found {len(imgs)} images")
-        else:
-            print(f"⚠ Images directory not found: {images_path}")
-        
-        return imgs
-    
-    # Load quotes and images
-    quotes = load_quotes()
-    imgs = load_images()
-    
+    app.config.update(services.config)
+    app.extensions["meme_services"] = services
+
+    @app.before_request
+    def track_static_access():
+        """Record accesses to generated memes for the retention policy.
+
+        Memes moved into shards since their URL was handed out are served
+        from their shard here, since Flask's static route would not find them.
+        """
+        if request.endpoint == "static" and request.view_args:
+            filename = request.view_args["filename"]
+            path = services.meme_file(filename)
+            if path is not None:
+                services.served(path)
+                if path != safe_join(services.static_dir, filename):
+                    return send_file(path, conditional=True)
+        return None
+
+    @app.after_request
+    def vary_on_accept(response):
+        """Mark meme pages as depending on the Accept header.
+
+        The image format of a new meme is negotiated from Accept, so caches
+        must not share one page between clients with different headers.
+        """
+        if request.endpoint in ("meme_rand", "meme_post"):
+            response.vary.add("Accept")
+        return response
+
+    @app.errorhandler(RenderQueueFull)
+    def render_queue_full(error: RenderQueueFull):
+        """Answer 503 with a Retry-After hint when the render queue is full.
+
+        Returns:
+            tuple: Response body, status code and headers.
+        """
+        headers = {"Retry-After": str(error.retry_after)}
+        return "Server busy, please retry shortly", 503, headers
+
+    @app.route("/stats")
+    def stats():
+        """Report render queue and image cache metrics as JSON.
+
+        Returns:
+            dict: Render executor statistics (None when rendering inline) and
+                image cache statistics.
+        """
+        return services.stats()
+
+    @app.route("/metrics")
+    def export_metrics():
+        """Export latency histograms in the Prometheus text format.
+
+        Returns:
+            tuple: Exposition text, status code and headers.
+        """
+        return metrics.REGISTRY.expose(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+    @app.route("/api/memes", methods=["POST"])
+    def api_memes():
+        """Render one or many memes from a JSON request.
+
+        The body is a job object or {"memes": [job, ...]}; see
+        parse_render_jobs. With "inline": true the memes are returned
+        base64-encoded as well as by URL.
+
+        Returns:
+            tuple: JSON with one result per job, and the status code.
+        """
+        payload = request.get_json(silent=True)
+        try:
+            jobs = parse_render_jobs(
+                payload, services.config["MEME_API_MAX_BATCH"], services.output_formats
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        results = services.render_batch(jobs, inline=bool(payload.get("inline")))
+        return {"memes": results}, 200
+
+    @app.route("/memes/<path:filename>")
+    def meme_file(filename):
+        """Serve a generated meme with long-lived caching headers.
+
+        Meme names are never reused, so responses are marked immutable and
+        carry a content-hash ETag. Conditional and Range requests are
+        answered with 304 and 206 responses.
+
+        Returns:
+            Response: The meme, a part of it, or an empty 304 response.
+
+        Raises:
+            HTTPException: 404 error if there is no such meme.
+        """
+        path = services.meme_file(filename)
+        if path is None:
+            abort(404)
+        services.served(path)
+        response = send_file(
+            path,
+            conditional=True,
+            etag=services.etags.etag(path),
+            max_age=IMMUTABLE_MAX_AGE,
+        )
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
     @app.route("/")
     def meme_rand():
         """Generate a random meme and render it.
@@ -99,18 +157,16 @@ def create_app(data_dir: str = None, static_dir: str = None):
         Raises:
             HTTPException: 500 error if resources are not available.
         """
-        if not imgs or not quotes:
-            abort(500, "Resources not available")
-        
-        img = random.choice(imgs)
-        quote = random.choice(quotes)
-        path = meme_engine.make_meme(img, quote.body, quote.author)
-        
-        # Convert absolute path to relative path for Flask static files
-        filename = os.path.basename(path)
-        static_path = f"/static/{filename}"
+        # Serve a pre-rendered meme when the pool has one in the right format
+        output_format = services.negotiate_format(request.headers.get("Accept"))
+        variants = services.pop_prerendered(output_format)
+        if variants is None:
+            try:
+                variants = services.render_random(output_format)
+            except LookupError:
+                abort(500, "Resources not available")
         
-        return render_template("meme.html", path=static_path)
+        return render_template("meme.html", **services.page_image(variants))
     
     @app.route("/create", methods=["GET"])
     def meme_form():
@@ -141,37 +197,27 @@ def create_app(data_dir: str = None, static_dir: str = None):
             flash("Both quote body and author are required", "danger")
             return redirect(url_for("meme_form"))
         
-        # Download the image to a temp file
+        # Download the image into memory, unless a fresh copy is cached
         try:
-            res = requests.get(image_url, timeout=5)
-            res.raise_for_status()
-        except Exception:
-            flash("Unable to fetch image from provided URL", "danger")
+            image_data = services.download(image_url)
+        except Exception as e:
+            flash(fetch_error_message(e), "danger")
             return redirect(url_for("meme_form"))
         
-        tmp_path = os.path.join("/tmp", f"tmp_{random.randint(0, 1000000)}")
-        with open(tmp_path, "wb") as f:
-            f.write(res.content)
-        
         # Generate the meme
         try:
-            path = meme_engine.make_meme(tmp_path, body, author)
-            # Convert absolute path to relative path for Flask static files
-            filename = os.path.basename(path)
-            static_path = f"/static/{filename}"
+            output_format = services.negotiate_format(request.headers.get("Accept"))
+            variants = services.render_variants(image_data, body, author, output_format)
+        except RenderQueueFull:
+            raise
         except Exception as e:
             flash(f"Error generating meme: {e}", "danger")
-            static_path = None
-        finally:
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                pass
+            variants = None
         
-        if not static_path:
+        if not variants:
             return redirect(url_for("meme_form"))
         
-        return render_template("meme.html", path=static_path)
+        return render_template("meme.html", **services.page_image(variants))
     
     return app
 
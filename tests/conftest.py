@@ -1,8 +1,58 @@
+import functools
+import http.server
 import os
+import shutil
 import sys
+import tempfile
+import threading
+
+import pytest
 
 # Ensure project `src` directory is on sys.path for tests
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SRC = os.path.join(ROOT, "src")
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
+
+PHOTOS = os.path.join(SRC, "motivacional_meme_generator", "_data", "photos", "dog")
+
+# The package computes its default cache paths (font index, photo manifests,
+# prepared photos, remote images) when imported, so point the per-user cache
+# at a scratch directory before any test module imports it
+CACHE_HOME = tempfile.mkdtemp(prefix="meme-test-cache-")
+os.environ["XDG_CACHE_HOME"] = CACHE_HOME
+os.environ["LOCALAPPDATA"] = CACHE_HOME
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _remove_cache_home():
+    yield
+    shutil.rmtree(CACHE_HOME, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def user_cache(tmp_path, monkeypatch):
+    """Point cache paths resolved while a test runs at its tmp_path."""
+    cache = tmp_path / "user_cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache))
+    monkeypatch.setenv("LOCALAPPDATA", str(cache))
+    return cache
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    """Serve a copy of the sample photos over HTTP on localhost."""
+    root = tmp_path / "www"
+    shutil.copytree(PHOTOS, root)
+    (root / "notes.txt").write_text("not an image", encoding="utf-8")
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(root)
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.root = root
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from motivacional_meme_generator.asgi import create_asgi_app
+from motivacional_meme_generator.render_pool import RenderQueueFull
+
+
+def _run(app, requests):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = [await request(client) for request in requests]
+        await app.aclose()
+        return responses
+
+    return asyncio.run(go())
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_asgi_app(
+        static_dir=str(tmp_path / "static"),
+        config={
+            "MEME_IMAGE_CACHE_DIR": str(tmp_path / "image_cache"),
+            "MEME_PHOTO_MANIFEST_DIR": str(tmp_path / "manifests"),
+        },
+    )
+
+
+def test_random_meme_and_static_file(app):
+    page, = _run(app, [lambda c: c.get("/")])
+    assert page.status_code == 200
+    src = page.text.split('src="')[1].split('"')[0]
+    image, = _run(app, [lambda c: c.get(src)])
+    assert image.status_code == 200
+    assert image.headers["content-type"] == "image/jpeg"
+
+
+def test_create_meme_from_url(app, image_server):
+    url = f"{image_server.url}/xander_3.jpg"
+    ok, invalid = _run(app, [
+        lambda c: c.post("/create", data={"image_url": url, "body": "Hi", "author": "Me"}),
+        lambda c: c.post("/create", data={"image_url": url}),
+    ])
+    assert ok.status_code == 200
+    assert 'src="/memes/meme_' in ok.text
+    assert invalid.status_code == 400
+    assert "Both quote body and author are required" in invalid.text
+
+
+def test_memes_are_cacheable(app):
+    page, = _run(app, [lambda c: c.get("/")])
+    src = page.text.split('src="')[1].split('"')[0]
+    full, = _run(app, [lambda c: c.get(src)])
+    etag = full.headers["etag"]
+    cached, part, missing = _run(app, [
+        lambda c: c.get(src, headers={"If-None-Match": etag}),
+        lambda c: c.get(src, headers={"Range": "bytes=-10"}),
+        lambda c: c.get("/memes/missing.jpg"),
+    ])
+    assert "immutable" in full.headers["cache-control"]
+    assert cached.status_code == 304
+    assert part.status_code == 206
+    assert part.content == full.content[-10:]
+    assert missing.status_code == 404
+
+
+def test_api_renders_batch(app, image_server):
+    url = f"{image_server.url}/xander_1.jpg"
+    batch = {"memes": [{"image": url, "body": "Hi", "author": "Me"}] * 2}
+    res, invalid = _run(app, [
+        lambda c: c.post("/api/memes", json=batch),
+        lambda c: c.post("/api/memes", content=b"not json"),
+    ])
+    assert res.status_code == 200
+    assert [m["content_type"] for m in res.json()["memes"]] == ["image/jpeg"] * 2
+    assert invalid.status_code == 400
+
+
+class _FullAfter:
+    """Render executor stub that never finishes and refuses the nth job."""
+
+    def __init__(self, accepted):
+        self.accepted = accepted
+        self.futures = []
+
+    def submit(self, *args, **kwargs):
+        if len(self.futures) == self.accepted:
+            raise RenderQueueFull(1)
+        self.futures.append(Future())
+        return self.futures[-1]
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_api_batch_cancels_queued_renders_when_queue_fills(app):
+    app.services.executor = executor = _FullAfter(accepted=2)
+    batch = {"memes": [{"body": "Hi", "author": "Me"}] * 3}
+    res, = _run(app, [lambda c: c.post("/api/memes", json=batch)])
+    assert res.status_code == 503
+    assert len(executor.futures) == 2
+    assert all(future.cancelled() for future in executor.futures)
+
+
+def test_random_meme_srcset(tmp_path):
+    app = create_asgi_app(
+        static_dir=str(tmp_path / "static"),
+        config={
+            "MEME_IMAGE_CACHE_DIR": "",
+            "MEME_PHOTO_MANIFEST_DIR": "",
+            "MEME_OUTPUT_WIDTHS": "240,480",
+        },
+    )
+    page, = _run(app, [lambda c: c.get("/")])
+    assert page.status_code == 200
+    assert " 240w, " in page.text and " 480w" in page.text
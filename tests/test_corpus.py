@@ -0,0 +1,67 @@
+import os
+
+from motivacional_meme_generator import corpus as corpus_module
+from motivacional_meme_generator.corpus import Corpus, load_corpus, preload_corpus
+
+
+def _bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_corpus_picks_up_new_files(tmp_path):
+    quotes_dir = tmp_path / "quotes"
+    images_dir = tmp_path / "photos"
+    quotes_dir.mkdir()
+    images_dir.mkdir()
+    (quotes_dir / "a.txt").write_text("First - One\n", encoding="utf-8")
+    (images_dir / "a.jpg").write_bytes(b"")
+
+    corpus = Corpus([str(quotes_dir)], str(images_dir), manifest_dir=None)
+    first = corpus.snapshot
+    assert len(first.quotes) == 1
+    assert len(first.images) == 1
+    assert corpus.refresh() is False
+
+    (quotes_dir / "b.txt").write_text("Second - Two\n", encoding="utf-8")
+    (images_dir / "b.png").write_bytes(b"")
+    (images_dir / "b.png:Zone.Identifier").write_bytes(b"")
+    _bump_mtime(images_dir)
+    assert corpus.refresh() is True
+
+    second = corpus.snapshot
+    assert second is not first
+    assert len(second.quotes) == 2
+    assert len(second.images) == 2
+    assert len(first.quotes) == 1
+
+
+def test_corpus_reparses_only_changed_files(tmp_path, monkeypatch):
+    quote_file = tmp_path / "a.txt"
+    other_file = tmp_path / "b.txt"
+    quote_file.write_text("First - One\n", encoding="utf-8")
+    other_file.write_text("Other - Two\n", encoding="utf-8")
+    corpus = Corpus([str(tmp_path)], str(tmp_path / "missing"), manifest_dir=None)
+
+    parsed = []
+    original = corpus_module.Ingestor.parse
+    monkeypatch.setattr(
+        corpus_module.Ingestor,
+        "parse",
+        lambda path: parsed.append(path) or original(path),
+    )
+    quote_file.write_text("First - One\nExtra - Three\n", encoding="utf-8")
+    _bump_mtime(quote_file)
+    assert corpus.refresh() is True
+    assert parsed == [str(quote_file)]
+    assert len(corpus.snapshot.quotes) == 3
+
+
+def test_preloaded_corpus_is_shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus_module, "_preloaded", {})
+    (tmp_path / "a.txt").write_text("First - One\n", encoding="utf-8")
+    preloaded = preload_corpus([str(tmp_path)], str(tmp_path / "photos"), None)
+
+    monkeypatch.chdir(tmp_path)
+    assert load_corpus(["."], "photos") is preloaded
+    assert load_corpus(["."], "other", None) is not preloaded
@@ -0,0 +1,26 @@
+import pytest
+
+from motivacional_meme_generator.fetch import (
+    ImageFetcher,
+    ImageTooLarge,
+    UnsupportedImageType,
+    sniff_image_type,
+)
+
+
+def test_sniff_image_type():
+    assert sniff_image_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_image_type(b"<html>") is None
+
+
+def test_fetch_image(image_server):
+    data = ImageFetcher().fetch(f"{image_server.url}/xander_1.jpg")
+    assert data == (image_server.root / "xander_1.jpg").read_bytes()
+
+
+def test_fetch_rejects_large_and_non_images(image_server):
+    with pytest.raises(ImageTooLarge):
+        ImageFetcher(max_bytes=1024).fetch(f"{image_server.url}/xander_1.jpg")
+    with pytest.raises(UnsupportedImageType):
+        ImageFetcher().fetch(f"{image_server.url}/notes.txt")
@@ -0,0 +1,52 @@
+import json
+import os
+
+from PIL import ImageFont
+
+from motivacional_meme_generator.fonts import BUNDLED_FONT, FontIndex, resolve_font
+
+
+def test_bundled_font_scales():
+    small = ImageFont.truetype(BUNDLED_FONT, size=10)
+    large = ImageFont.truetype(BUNDLED_FONT, size=40)
+    assert large.getbbox("Ay")[3] > small.getbbox("Ay")[3]
+
+
+def test_index_finds_fonts_and_is_reused(tmp_path):
+    fonts = tmp_path / "fonts" / "truetype"
+    fonts.mkdir(parents=True)
+    (fonts / "Comic.TTF").write_bytes(b"")
+    saved = str(tmp_path / "index.json")
+
+    index = FontIndex(saved, [str(tmp_path / "fonts")])
+    assert index.find("comic.ttf") == str(fonts / "Comic.TTF")
+    assert index.find("Comic") == str(fonts / "Comic.TTF")
+    assert index.find("arial.ttf") is None
+    assert os.path.exists(saved)
+
+    reloaded = FontIndex(saved, [str(tmp_path / "fonts")])
+    assert reloaded._load()
+    (fonts / "Arial.ttf").write_bytes(b"")
+    assert not FontIndex(saved, [str(tmp_path / "fonts")])._load()
+    assert FontIndex(saved, [str(tmp_path / "fonts")]).find("arial") is not None
+
+
+def test_index_naming_other_files_is_rescanned(tmp_path):
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    (fonts / "Comic.ttf").write_bytes(b"")
+    saved = str(tmp_path / "index.json")
+    FontIndex(saved, [str(fonts)]).find("comic")
+
+    with open(saved, encoding="utf-8") as f:
+        index = json.load(f)
+    index["fonts"]["comic"] = str(tmp_path / "planted.ttf")
+    with open(saved, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    assert not FontIndex(saved, [str(fonts)])._load()
+    assert FontIndex(saved, [str(fonts)]).find("comic") == str(fonts / "Comic.ttf")
+
+
+def test_missing_font_resolves_to_bundled():
+    assert resolve_font("no-such-font-anywhere.ttf") == BUNDLED_FONT
+    assert resolve_font(BUNDLED_FONT) == BUNDLED_FONT
@@ -0,0 +1,57 @@
+import os
+
+from motivacional_meme_generator.hooks import EventRecorder, Hooks
+from motivacional_meme_generator.MemeEngine import MemeEngine
+from motivacional_meme_generator.QuoteEngine import Ingestor
+
+DATA = os.path.join(
+    os.path.dirname(__file__), "..", "src", "motivacional_meme_generator", "_data"
+)
+IMAGE = os.path.join(DATA, "photos", "dog", "xander_1.jpg")
+
+
+def test_render_and_parse_events(tmp_path):
+    engine = MemeEngine(str(tmp_path))
+    engine.hooks = Hooks()
+    recorder = EventRecorder()
+    engine.hooks.add(recorder)
+    path = engine.make_meme(IMAGE, "Hello", "Tester")
+    names = [(e.name, e.phase) for e in recorder.events]
+    assert names[0] == ("make_meme", "start")
+    assert names[-1] == ("make_meme", "end")
+    stages = [name.split(".")[1] for name, _ in names[1:-1]]
+    assert stages == ["decode", "resize", "layout", "draw", "encode"]
+    assert recorder.events[-1].info["bytes"] == os.path.getsize(path)
+
+    Ingestor.hooks.add(recorder)
+    try:
+        Ingestor.parse(os.path.join(DATA, "DogQuotes", "DogQuotesTXT.txt"))
+    finally:
+        Ingestor.hooks.remove(recorder)
+    end = recorder.events[-1]
+    assert (end.name, end.info["format"]) == ("parse", "txt")
+    assert end.info["quotes"] > 0
+
+
+def test_batch_render_reports_stages(tmp_path):
+    engine = MemeEngine(str(tmp_path))
+    engine.hooks = Hooks()
+    recorder = EventRecorder()
+    engine.hooks.add(recorder)
+    engine.make_memes([(IMAGE, "Hello", "Tester")] * 2)
+    stages = [e.name.split(".")[1] for e in recorder.events if "." in e.name]
+    assert stages == ["decode", "resize", "layout", "draw", "encode"] * 2
+
+
+def test_hooks_are_falsy_and_isolate_errors():
+    hooks = Hooks()
+    assert not hooks
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    hooks.add(broken)
+    assert hooks
+    hooks.emit("make_meme", "start")
+    hooks.remove(broken)
+    assert not hooks
@@ -0,0 +1,80 @@
+import hashlib
+import io
+import os
+
+from PIL import Image
+
+from motivacional_meme_generator.fetch import ImageFetcher
+from motivacional_meme_generator.image_cache import RemoteImageCache, prepare_image
+
+
+def test_repeat_get_skips_network(image_server, tmp_path):
+    cache = RemoteImageCache(ImageFetcher(), cache_dir=str(tmp_path / "cache"), width=100)
+    url = f"{image_server.url}/xander_1.jpg"
+    first = cache.get(url)
+    image_server.shutdown()
+    assert cache.get(url) == first
+    assert Image.open(io.BytesIO(first)).width == 100
+
+    reopened = RemoteImageCache(ImageFetcher(), cache_dir=str(tmp_path / "cache"), width=100)
+    assert reopened.get(url) == first
+    assert reopened.stats()["hits"] == 1
+
+
+def test_disk_cache_is_private_and_replaces_links(image_server, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = RemoteImageCache(ImageFetcher(), cache_dir=str(cache_dir), width=100)
+    url = f"{image_server.url}/xander_1.jpg"
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    target = tmp_path / "elsewhere.json"
+    target.write_text("untouched")
+    os.symlink(target, cache_dir / f"{key}.json")
+    cache.get(url)
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+    assert not os.path.islink(cache_dir / f"{key}.json")
+    assert target.read_text() == "untouched"
+
+
+def test_stale_entry_is_revalidated(image_server):
+    cache = RemoteImageCache(ImageFetcher(), ttl=0)
+    url = f"{image_server.url}/xander_2.jpg"
+    first = cache.get(url)
+    assert cache.get(url) == first
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["revalidations"] == 1
+
+
+def test_disk_cache_evicts_least_recently_used(image_server, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = RemoteImageCache(ImageFetcher(), cache_dir=str(cache_dir), width=50)
+    urls = [f"{image_server.url}/xander_{i}.jpg" for i in (1, 2, 3)]
+    sizes = [len(cache.get(url)) for url in urls[:2]]
+    cache.get(urls[0])
+    cache.max_disk_bytes = sum(sizes) + 1
+    cache.get(urls[2])
+
+    kept = {p.stem for p in cache_dir.glob("*.img")}
+    key = lambda url: hashlib.sha256(url.encode("utf-8")).hexdigest()
+    assert key(urls[1]) not in kept
+    assert key(urls[2]) in kept
+
+
+def _encoded(img, **options):
+    buffer = io.BytesIO()
+    img.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def test_prepare_image_converts_cmyk():
+    data = _encoded(Image.new("CMYK", (300, 200), (0, 80, 160, 0)), format="JPEG")
+    with Image.open(io.BytesIO(prepare_image(data, 100))) as img:
+        assert (img.size, img.mode) == ((100, 66), "RGB")
+
+
+def test_prepare_image_applies_exif_orientation():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored sideways, shown rotated 90 degrees
+    data = _encoded(Image.new("RGB", (300, 200)), format="JPEG", exif=exif)
+    with Image.open(io.BytesIO(prepare_image(data, 100))) as img:
+        assert img.size == (100, 150)
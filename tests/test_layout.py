@@ -0,0 +1,59 @@
+import os
+
+from PIL import Image, ImageFont
+
+from motivacional_meme_generator.layout import LayoutCache, fit_text
+from motivacional_meme_generator.MemeEngine import MemeEngine
+
+
+def _font(size):
+    return ImageFont.load_default(size=size)
+
+
+def test_fit_text_places_lines_inside_the_image():
+    layout = fit_text("Stay pawsitive all day long, every day", "Rex", 500, 400, _font)
+    assert layout.lines[-1] == "- Rex"
+    assert "" in layout.lines
+    for line, (x, y) in zip(layout.lines, layout.origins):
+        if line:
+            assert 0 <= x < 500 and 0 <= y < 400
+
+
+def test_fit_text_on_tiny_image():
+    layout = fit_text("Hi", "Me", 80, 60, _font)
+    assert layout.font_size == 6
+
+
+def test_layout_cache_is_bounded_lru():
+    cache = LayoutCache(max_entries=2)
+    compute = lambda: fit_text("Hi", "Me", 200, 200, _font)
+    first = cache.get("a", compute)
+    cache.get("b", compute)
+    assert cache.get("a", compute) is first
+    cache.get("c", compute)
+    assert len(cache) == 2
+    assert cache.get("b", compute) is not None
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_repeat_render_reuses_layout(tmp_path):
+    engine = MemeEngine(str(tmp_path))
+    source = tmp_path / "src.png"
+    Image.new("RGB", (300, 200), "gray").save(source)
+    engine.make_meme(str(source), "Hello", "Tester")
+    engine.make_meme(str(source), "Hello", "Tester")
+    assert (engine.layouts.hits, engine.layouts.misses) == (1, 1)
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_fit_text_stops_when_font_cannot_scale():
+    fixed = ImageFont.load_default(size=30)
+    sizes = []
+
+    def load_font(size):
+        sizes.append(size)
+        return fixed
+
+    layout = fit_text("word " * 200, "Me", 300, 400, load_font)
+    assert sizes == [40, 38]
+    assert layout.font_size == 40
@@ -0,0 +1,152 @@
+import importlib
+import io
+import os
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from motivacional_meme_generator.MemeEngine import MemeEngine, available_formats
+
+# The package re-exports the class under the module's name
+engine_module = importlib.import_module("motivacional_meme_generator.MemeEngine")
+
+IMAGE = os.path.join(
+    os.path.dirname(__file__),
+    "..", "src", "motivacional_meme_generator", "_data", "photos", "dog", "xander_1.jpg",
+)
+
+
+@pytest.mark.parametrize("output_format", available_formats())
+def test_output_formats(tmp_path, output_format):
+    engine = MemeEngine(str(tmp_path), output_format=output_format, quality=60)
+    path = engine.make_meme(IMAGE, "Hello", "Tester")
+    with Image.open(path) as img:
+        assert img.format == output_format.upper()
+
+
+def test_rgba_source_saved_as_jpeg(tmp_path):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (200, 200), (255, 0, 0, 128)).save(buffer, "PNG")
+    path = MemeEngine(str(tmp_path)).make_meme(buffer.getvalue(), "Hello", "Tester")
+    assert path.endswith(".jpg")
+    with Image.open(path) as img:
+        assert img.mode == "RGB"
+
+
+def test_unknown_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        MemeEngine(str(tmp_path)).make_meme(IMAGE, "Hello", "Tester", output_format="tiff")
+
+
+def test_make_memes_keeps_job_order(tmp_path):
+    engine = MemeEngine(str(tmp_path))
+    sources = []
+    for i, size in enumerate([(300, 200), (300, 200), (400, 300)]):
+        source = tmp_path / f"src{i}.png"
+        Image.new("RGB", size, "gray").save(source)
+        sources.append(str(source))
+    jobs = [
+        (sources[0], "Same", "Tester"),
+        (sources[2], "Other", "Tester"),
+        (sources[1], "Same", "Tester"),
+    ]
+    paths = engine.make_memes(jobs)
+    sizes = []
+    for path in paths:
+        with Image.open(path) as img:
+            sizes.append(img.size)
+    assert sizes == [(300, 200), (400, 300), (300, 200)]
+    assert (engine.overlays.hits, engine.overlays.misses) == (1, 1)
+
+
+def test_overlay_matches_direct_drawing(tmp_path):
+    engine = MemeEngine(str(tmp_path))
+    direct = Image.new("RGB", (400, 300), "gray")
+    engine.layout("Hello there", "Tester", 400, 300).draw(ImageDraw.Draw(direct))
+    overlay = engine.overlay("Hello there", "Tester", 400, 300)
+    composited = Image.new("RGB", (400, 300), "gray")
+    composited.paste(overlay, (0, 0), overlay)
+    diff = ImageChops.difference(direct, composited).convert("L")
+    assert overlay.getchannel("A").getbbox() is not None
+    assert sum(diff.getdata()) / (400 * 300) < 0.5
+
+
+def test_atlas_backend_matches_freetype(tmp_path):
+    freetype = MemeEngine(str(tmp_path))
+    atlas = MemeEngine(str(tmp_path), text_backend="atlas")
+    layout = freetype.layout("Sit, stay and chase the ball", "Tester", 400, 300)
+    expected = Image.new("RGB", (400, 300), "gray")
+    freetype.draw_text(expected, layout)
+    actual = Image.new("RGB", (400, 300), "gray")
+    atlas.draw_text(actual, layout)
+    diff = ImageChops.difference(expected, actual).convert("L")
+    assert sum(diff.histogram()[1:]) < 20
+    assert len(atlas._atlases[layout.font]) > 0
+
+
+@pytest.mark.parametrize("output_format", ["jpeg", "webp"])
+def test_atlas_backend_draws_on_palette_images(tmp_path, output_format):
+    source = tmp_path / "palette.gif"
+    Image.new("RGB", (600, 400), (40, 80, 120)).convert("P").save(source)
+    engine = MemeEngine(str(tmp_path / "out"), output_format=output_format, text_backend="atlas")
+    path = engine.make_meme(str(source), "Hello", "Tester")
+    variants = engine.make_meme_variants(str(source), "Hello", "Tester", [300])
+    with Image.open(path) as img:
+        assert (img.size, img.mode) == ((500, 333), "RGB")
+    assert len(variants) == 1
+
+
+def test_unknown_text_backend_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        MemeEngine(str(tmp_path), text_backend="cairo")
+
+
+def _animation(tmp_path, frames=3):
+    path = tmp_path / "anim.gif"
+    images = []
+    for i in range(frames):
+        frame = Image.new("RGB", (600, 400), (40, 80, 120))
+        ImageDraw.Draw(frame).rectangle((25 * i, 50, 25 * i + 60, 110), fill="red")
+        images.append(frame)
+    images[0].save(path, save_all=True, append_images=images[1:], duration=70, loop=0)
+    return str(path)
+
+
+@pytest.mark.parametrize("frames", [3, 20])
+def test_animated_gif_keeps_every_frame(tmp_path, frames):
+    engine = MemeEngine(str(tmp_path / "out"))
+    path = engine.make_meme(_animation(tmp_path, frames), "Hello", "Tester")
+    assert path.endswith(".gif")
+    with Image.open(path) as img:
+        assert (img.n_frames, img.size, img.info["duration"]) == (frames, (500, 333), 70)
+    assert (engine.layouts.misses, engine.overlays.misses) == (1, 1)
+
+
+def test_oversized_animation_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_module, "MAX_ANIMATION_PIXELS", 600 * 400 * 2)
+    with pytest.raises(ValueError, match="too large"):
+        MemeEngine(str(tmp_path / "out")).make_meme(_animation(tmp_path), "Hello", "Tester")
+    monkeypatch.setattr(engine_module, "MAX_ANIMATION_FRAMES", 2)
+    with pytest.raises(ValueError, match="at most 2"):
+        MemeEngine(str(tmp_path / "out")).make_meme(_animation(tmp_path), "Hello", "Tester")
+
+
+def test_animated_webp_and_first_frame_only(tmp_path):
+    source = _animation(tmp_path)
+    engine = MemeEngine(str(tmp_path / "out"), output_format="webp")
+    with Image.open(engine.make_meme(source, "Hello", "Tester")) as img:
+        assert img.format == "WEBP" and img.n_frames == 3
+    still = MemeEngine(str(tmp_path / "out"), animate=False).make_meme(source, "Hi", "Me")
+    assert still.endswith(".jpg")
+
+
+def test_variants_from_one_decode(tmp_path):
+    source = tmp_path / "src.png"
+    Image.new("RGB", (800, 600), "gray").save(source)
+    engine = MemeEngine(str(tmp_path / "out"))
+    variants = engine.make_meme_variants(str(source), "Hello", "Tester", (320, 640, 1080))
+    assert [width for width, _path in variants] == [320, 640, 800]
+    for width, path in variants:
+        with Image.open(path) as img:
+            assert img.width == width
+    assert engine.layouts.misses == 3
@@ -0,0 +1,45 @@
+import time
+
+from motivacional_meme_generator.meme_pool import MemePool
+
+
+def test_pool_warmup_and_pop():
+    counter = iter(range(100))
+    pool = MemePool(lambda: f"meme_{next(counter)}.jpg", size=3, warmup=2, refill_interval=60.0)
+    pool.start()
+    assert pool.pop() == "meme_0.jpg"
+    assert pool.pop() == "meme_1.jpg"
+    pool.stop(timeout=1)
+
+
+def test_pool_empty_returns_none():
+    pool = MemePool(lambda: "meme.jpg", size=1)
+    assert pool.pop() is None
+
+
+def test_pool_backs_off_while_renders_fail(capsys):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise LookupError("No photos")
+
+    pool = MemePool(broken, size=1)
+    pool.start()
+    time.sleep(0.5)
+    pool.stop(timeout=1)
+    # 0.1 + 0.2 s of backoff leave room for three or four attempts
+    assert 2 <= len(calls) <= 5
+    assert capsys.readouterr().out.count("Failed to pre-render") == 1
+
+
+def test_pool_pending_includes_meme_waiting_for_a_slot():
+    counter = iter(range(100))
+    pool = MemePool(lambda: f"meme_{next(counter)}.jpg", size=2, warmup=2, refill_interval=60.0)
+    pool.start()
+    deadline = time.time() + 2
+    while len(pool.pending()) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.pending() == ["meme_0.jpg", "meme_1.jpg", "meme_2.jpg"]
+    assert len(pool) == 2
+    pool.stop(timeout=1)
@@ -0,0 +1,24 @@
+from motivacional_meme_generator.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_exposition():
+    hist = Histogram("job_seconds", "Job latency", ("kind",), buckets=(0.1, 1.0))
+    hist.observe(0.05, kind="a")
+    hist.observe(0.5, kind="a")
+    hist.observe(5.0, kind="a")
+    lines = hist.expose()
+    assert 'job_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{kind="a",le="1.0"} 2' in lines
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{kind="a"} 3' in lines
+
+
+def test_drain_and_merge_between_registries():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    for registry in (worker, parent):
+        registry.histogram("stage_seconds", "Stage latency", ("stage",))
+    worker.histograms["stage_seconds"].observe(0.2, stage="draw")
+    parent.merge(worker.drain())
+    parent.merge(worker.drain())
+    assert 'stage_seconds_count{stage="draw"} 1' in parent.expose()
+    assert worker.drain() == {}
@@ -0,0 +1,62 @@
+import os
+
+from PIL import Image
+
+from motivacional_meme_generator import photo_manifest
+from motivacional_meme_generator.photo_manifest import PhotoManifest, load_manifest
+
+
+def _photo(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, "gray").save(path)
+
+
+def test_manifest_records_photos(tmp_path):
+    photos = tmp_path / "photos"
+    _photo(photos / "a.jpg", (40, 30))
+    _photo(photos / "sub" / "b.png", (20, 10))
+    (photos / "a.jpg:Zone.Identifier").write_bytes(b"")
+    (photos / "notes.txt").write_text("not a photo")
+
+    manifest = PhotoManifest(str(photos), str(tmp_path / "manifest.json"))
+    assert manifest.refresh() is True
+    assert [(os.path.basename(e.path), e.width, e.height, e.format) for e in manifest.entries] == [
+        ("a.jpg", 40, 30, "JPEG"),
+        ("b.png", 20, 10, "PNG"),
+    ]
+    assert manifest.sample() in manifest.paths
+
+
+def test_saved_manifest_is_refreshed_incrementally(tmp_path, monkeypatch):
+    photos = tmp_path / "photos"
+    _photo(photos / "a.jpg", (40, 30))
+    _photo(photos / "b.jpg", (40, 30))
+    saved = str(tmp_path / "manifest.json")
+    PhotoManifest(str(photos), saved).refresh()
+
+    reads = []
+    read_photo = photo_manifest.read_photo
+    monkeypatch.setattr(
+        photo_manifest, "read_photo", lambda path, st: reads.append(path) or read_photo(path, st)
+    )
+    manifest = PhotoManifest(str(photos), saved)
+    assert len(manifest) == 2
+    assert manifest.refresh() is False
+    assert reads == []
+
+    _photo(photos / "b.jpg", (80, 60))
+    os.utime(photos / "b.jpg", ns=(1, 1))
+    assert manifest.refresh() is True
+    assert reads == [str(photos / "b.jpg")]
+    assert manifest.entries[1].width == 80
+
+
+def test_load_manifest_saves_in_manifest_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(photo_manifest, "_manifests", {})
+    photos = tmp_path / "photos"
+    _photo(photos / "a.jpg", (40, 30))
+    manifest = load_manifest(str(photos), str(tmp_path / "cache" / "photos"))
+    assert load_manifest(str(photos)) is manifest
+    assert os.path.dirname(manifest.path) == str(tmp_path / "cache" / "photos")
+    assert os.stat(tmp_path / "cache" / "photos").st_mode & 0o777 == 0o700
+    assert os.path.exists(manifest.path)
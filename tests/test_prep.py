@@ -0,0 +1,74 @@
+import json
+import os
+
+from PIL import Image
+
+from motivacional_meme_generator.hooks import EventRecorder, Hooks
+from motivacional_meme_generator.MemeEngine import MemeEngine
+from motivacional_meme_generator.prep import (
+    MANIFEST_NAME,
+    PreparedPhotos,
+    prepare_library,
+    prepared_dir,
+)
+
+
+def _rotated_photo(path, size=(120, 80)):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored sideways, shown rotated 90 degrees
+    Image.new("RGB", size, "gray").save(path, exif=exif, progressive=True)
+
+
+def test_prepare_library_orients_scales_and_skips_current(tmp_path):
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    _rotated_photo(photos / "a.jpg")
+    prep_dir = str(tmp_path / "prep")
+
+    assert prepare_library(str(photos), [40, 500], prep_dir, workers=1) == (1, 0)
+    copy = PreparedPhotos(prep_dir).find(str(photos / "a.jpg"), 40)
+    with Image.open(copy) as img:
+        assert (img.size, img.mode, img.format) == ((40, 60), "RGB", "JPEG")
+        assert "progressive" not in img.info
+    assert prepare_library(str(photos), [40, 500], prep_dir, workers=1) == (0, 1)
+
+    os.utime(photos / "a.jpg", ns=(1, 1))
+    assert PreparedPhotos(prep_dir).find(str(photos / "a.jpg"), 40) is None
+
+
+def test_engine_renders_from_prepared_copy(tmp_path):
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    _rotated_photo(photos / "a.jpg", (1200, 800))
+    prep_dir = str(tmp_path / "prep")
+    prepare_library(str(photos), [320, 640], prep_dir, workers=1)
+
+    engine = MemeEngine(str(tmp_path / "out"), prep_dir=prep_dir)
+    engine.hooks = Hooks()
+    recorder = EventRecorder()
+    engine.hooks.add(recorder)
+    path = engine.make_meme(str(photos / "a.jpg"), "Hello", "Tester")
+    decode = next(e for e in recorder.events if e.name == "make_meme.decode")
+    assert decode.info["size"] == (640, 960)
+    with Image.open(path) as img:
+        assert img.size == (500, 750)
+
+    unprepared = MemeEngine(str(tmp_path / "out"), prep_dir=None)
+    with Image.open(unprepared.make_meme(str(photos / "a.jpg"), "Hello", "Tester")) as img:
+        assert img.size == (500, 750)
+
+
+def test_manifest_naming_other_files_is_ignored(tmp_path):
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    _rotated_photo(photos / "a.jpg")
+    prep_dir = str(tmp_path / "prep")
+    prepare_library(str(photos), [40], prep_dir, workers=1)
+
+    manifest = os.path.join(prepared_dir(str(photos), prep_dir), MANIFEST_NAME)
+    with open(manifest, encoding="utf-8") as f:
+        saved = json.load(f)
+    saved["photos"]["a.jpg"]["variants"] = [[40, "../../a.jpg"]]
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(saved, f)
+    assert PreparedPhotos(prep_dir).find(str(photos / "a.jpg"), 40) is None
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from motivacional_meme_generator.render_pool import RenderExecutor, RenderQueueFull
+
+IMAGE = os.path.join(
+    os.path.dirname(__file__),
+    "..", "src", "motivacional_meme_generator", "_data", "photos", "dog", "xander_1.jpg",
+)
+
+
+def test_render_in_worker_process(tmp_path):
+    executor = RenderExecutor(str(tmp_path), workers=1)
+    try:
+        path = executor.render(IMAGE, "Hello", "Tester")
+        assert os.path.exists(path)
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_saturated_queue_rejects(tmp_path):
+    executor = RenderExecutor(str(tmp_path), workers=1, max_queue=1, retry_after=3)
+    try:
+        executor.submit(IMAGE, "Hello", "Tester")
+        with pytest.raises(RenderQueueFull) as excinfo:
+            executor.submit(IMAGE, "Again", "Tester")
+        assert excinfo.value.retry_after == 3
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_render_variants_in_worker_process(tmp_path):
+    executor = RenderExecutor(str(tmp_path), workers=1)
+    try:
+        variants = executor.submit(IMAGE, "Hello", "Tester", widths=(200, 400)).result()[0]
+        assert [width for width, _path in variants] == [200, 400]
+        assert all(os.path.exists(path) for _width, path in variants)
+    finally:
+        executor.shutdown()
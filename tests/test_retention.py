@@ -0,0 +1,81 @@
+import os
+import time
+
+from motivacional_meme_generator.retention import RetentionManager
+
+
+def _write(path, size, accessed):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (accessed, accessed))
+    return str(path)
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    now = time.time()
+    old = _write(tmp_path / "old.jpg", 100, now - 30)
+    mid = _write(tmp_path / "mid.jpg", 100, now - 20)
+    new = _write(tmp_path / "new.jpg", 100, now - 10)
+    retention = RetentionManager(str(tmp_path), max_bytes=250)
+    retention.touch(old)
+
+    assert retention.enforce() == [mid]
+    assert os.path.exists(old) and os.path.exists(new)
+    assert retention.stats()["bytes"] == 200
+
+
+def test_max_files_and_age(tmp_path):
+    now = time.time()
+    expired = _write(tmp_path / "expired.jpg", 10, now - 3600)
+    retention = RetentionManager(str(tmp_path), max_files=2, max_age=600)
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        (tmp_path / name).write_bytes(b"x")
+        retention.record(str(tmp_path / name))
+
+    evicted = retention.enforce()
+    assert evicted == [expired, str(tmp_path / "a.jpg")]
+    assert retention.stats()["files"] == 2
+
+
+def test_sweeps_stale_temp_files(tmp_path):
+    stale = _write(tmp_path / "tmp_1", 10, time.time() - 7200)
+    fresh = _write(tmp_path / "tmp_2", 10, time.time())
+    retention = RetentionManager(
+        str(tmp_path / "static"), temp_glob=str(tmp_path / "tmp_*")
+    )
+    assert retention.sweep_temp() == 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+
+
+def test_enforce_counts_files_of_other_processes(tmp_path):
+    now = time.time()
+    old = _write(tmp_path / "old.jpg", 100, now - 30)
+    retention = RetentionManager(str(tmp_path), max_files=1)
+    # Written by another worker after this manager's startup scan
+    new = _write(tmp_path / "new.jpg", 100, now - 10)
+
+    assert retention.enforce() == [old]
+    assert os.path.exists(new)
+    assert retention.stats()["files"] == 1
+
+
+def test_touch_is_visible_to_other_processes(tmp_path):
+    now = time.time()
+    old = _write(tmp_path / "old.jpg", 100, now - 30)
+    new = _write(tmp_path / "new.jpg", 100, now - 10)
+    RetentionManager(str(tmp_path)).touch(old)
+
+    other = RetentionManager(str(tmp_path), max_files=1)
+    assert other.enforce() == [new]
+
+
+def test_kept_paths_are_not_evicted(tmp_path):
+    now = time.time()
+    pooled = _write(tmp_path / "pooled.jpg", 100, now - 30)
+    served = _write(tmp_path / "served.jpg", 100, now - 20)
+    retention = RetentionManager(
+        str(tmp_path), max_files=1, max_age=10, keep=lambda: [pooled]
+    )
+
+    assert retention.enforce() == [served]
+    assert os.path.exists(pooled)
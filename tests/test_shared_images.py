@@ -0,0 +1,53 @@
+import os
+
+import pytest
+from PIL import Image, ImageChops
+
+from motivacional_meme_generator.MemeEngine import MemeEngine
+from motivacional_meme_generator.shared_images import SharedImageCache
+
+
+def _photos(tmp_path):
+    paths = []
+    for i, size in enumerate([(800, 600), (300, 200)]):
+        path = str(tmp_path / f"p{i}.jpg")
+        Image.new("RGB", size, (40 * i, 90, 160)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_attached_cache_maps_photos_read_only(tmp_path):
+    paths = _photos(tmp_path)
+    cache = SharedImageCache.create(paths, width=500)
+    try:
+        attached = SharedImageCache.attach(cache.name)
+        img = attached.get(paths[0], 500)
+        assert (img.size, img.mode, img.readonly) == ((500, 375), "RGBX", 1)
+        assert attached.get(paths[1], 1000).size == (300, 200)
+        assert attached.get(paths[0], 640) is None
+        os.utime(paths[1], ns=(1, 1))
+        assert attached.get(paths[1], 500) is None
+        assert attached.stats()["hits"] == 2
+        del img
+        attached.close()
+    finally:
+        cache.close()
+    with pytest.raises(FileNotFoundError):
+        SharedImageCache.attach(cache.name)
+
+
+def test_engine_renders_shared_photo_like_decoded_one(tmp_path):
+    paths = _photos(tmp_path)
+    cache = SharedImageCache.create(paths, width=500, max_bytes=800_000)
+    try:
+        assert len(cache) == 1
+        shared = MemeEngine(str(tmp_path / "out"), prep_dir=None, shared_images=cache.name)
+        decoded = MemeEngine(str(tmp_path / "out"), prep_dir=None)
+        with Image.open(shared.make_meme(paths[0], "Hi", "Me")) as a, Image.open(
+            decoded.make_meme(paths[0], "Hi", "Me")
+        ) as b:
+            assert a.size == b.size == (500, 375)
+            assert max(ImageChops.difference(a, b).getextrema())[1] < 8
+        assert cache.hits == 1
+    finally:
+        cache.close()
@@ -0,0 +1,22 @@
+import os
+
+from motivacional_meme_generator.storage import migrate_to_sharded, shard_path
+
+
+def test_shard_path_is_stable():
+    path = shard_path("/out", "meme_1.jpg", 2)
+    assert path == shard_path("/out", "meme_1.jpg", 2)
+    parts = os.path.relpath(path, "/out").split(os.sep)
+    assert len(parts) == 3 and all(len(p) == 2 for p in parts[:2])
+    assert shard_path("/out", "meme_1.jpg", 0) == os.path.join("/out", "meme_1.jpg")
+
+
+def test_migrate_flat_directory(tmp_path):
+    for i in range(5):
+        (tmp_path / f"meme_{i}.jpg").write_bytes(b"x")
+    (tmp_path / "favicon.ico").write_bytes(b"x")
+    assert migrate_to_sharded(str(tmp_path), depth=1) == 5
+    assert not list(tmp_path.glob("*.jpg"))
+    assert (tmp_path / "favicon.ico").exists()
+    for i in range(5):
+        assert os.path.exists(shard_path(str(tmp_path), f"meme_{i}.jpg", 1))
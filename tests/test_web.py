@@ -0,0 +1,240 @@
+import base64
+import os
+import time
+
+import pytest
+
+from motivacional_meme_generator.corpus import load_corpus
+from motivacional_meme_generator.services import (
+    DEFAULT_DATA_DIR,
+    corpus_paths,
+    load_config,
+    share_photos,
+)
+from motivacional_meme_generator.shared_images import SharedImageCache
+from motivacional_meme_generator.storage import migrate_to_sharded
+from motivacional_meme_generator.web import create_app
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    apps = []
+
+    def factory(**config):
+        config.setdefault("MEME_IMAGE_CACHE_DIR", str(tmp_path / "image_cache"))
+        config.setdefault("MEME_PHOTO_MANIFEST_DIR", str(tmp_path / "manifests"))
+        app = create_app(static_dir=str(tmp_path / "static"), config=config)
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        app.extensions["meme_services"].close()
+
+
+def test_random_meme_page(make_app):
+    client = make_app().test_client()
+    res = client.get("/")
+    assert res.status_code == 200
+    assert b'src="/memes/meme_' in res.data
+
+
+def test_random_meme_served_from_pool(make_app, tmp_path):
+    app = make_app(MEME_POOL_SIZE=2, MEME_POOL_WARMUP=2, MEME_POOL_REFILL_INTERVAL=60.0)
+    pool = app.extensions["meme_services"].pool
+    pool.stop()
+    prerendered = set(os.listdir(tmp_path / "static"))
+    res = app.test_client().get("/")
+    assert res.status_code == 200
+    served = res.data.split(b'src="/memes/')[1].split(b'"')[0].decode()
+    assert served in prerendered
+
+
+def test_pool_skipped_for_other_negotiated_formats(make_app, tmp_path):
+    app = make_app(
+        MEME_OUTPUT_FORMATS="webp,jpeg",
+        MEME_POOL_SIZE=1,
+        MEME_POOL_WARMUP=1,
+        MEME_POOL_REFILL_INTERVAL=60.0,
+    )
+    pool = app.extensions["meme_services"].pool
+    pool.stop()
+    client = app.test_client()
+    res = client.get("/", headers={"Accept": "image/webp,*/*"})
+    assert b'.webp"' in res.data
+    assert len(pool) == 1
+    res = client.get("/", headers={"Accept": "*/*"})
+    assert b'.jpg"' in res.data
+    assert len(pool) == 0
+
+
+def test_pooled_memes_are_kept_by_retention(make_app, tmp_path):
+    app = make_app(
+        MEME_POOL_SIZE=2,
+        MEME_POOL_WARMUP=2,
+        MEME_POOL_REFILL_INTERVAL=60.0,
+        MEME_RETENTION_MAX_FILES=1,
+        MEME_RETENTION_INTERVAL=3600,
+    )
+    services = app.extensions["meme_services"]
+    services.pool.stop()
+    services.retention.enforce()
+    first, second = services.pool.pending()
+    assert all(os.path.exists(path) for _, path in first + second)
+
+    os.remove(first[0][1])
+    assert services.pop_prerendered() == second
+
+
+def test_busy_render_queue_returns_503(make_app):
+    app = make_app(MEME_RENDER_WORKERS=1, MEME_RENDER_QUEUE=1, MEME_RENDER_RETRY_AFTER=2)
+    services = app.extensions["meme_services"]
+    executor = services.executor
+    try:
+        executor.submit(services.corpus.snapshot.images[0], "Busy", "Tester")
+        res = app.test_client().get("/")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "2"
+        stats = app.test_client().get("/stats").get_json()
+        assert stats["render"]["rejected"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_create_meme_from_url(make_app, image_server):
+    client = make_app().test_client()
+    res = client.post(
+        "/create",
+        data={"image_url": f"{image_server.url}/xander_2.jpg", "body": "Hi", "author": "Me"},
+    )
+    assert res.status_code == 200
+    assert b'src="/memes/meme_' in res.data
+
+
+def test_random_meme_page_has_srcset(make_app):
+    client = make_app(MEME_OUTPUT_WIDTHS="200,400,1000").test_client()
+    res = client.get("/")
+    assert res.status_code == 200
+    srcset = res.data.split(b'srcset="')[1].split(b'"')[0].decode()
+    urls = [candidate.split()[0] for candidate in srcset.split(", ")]
+    assert [candidate.split()[1] for candidate in srcset.split(", ")] == ["200w", "400w", "500w"]
+    assert res.data.split(b'src="')[1].split(b'"')[0].decode() == urls[-1]
+    for url in urls:
+        assert client.get(url).status_code == 200
+
+
+def test_sharded_memes_are_served(make_app):
+    client = make_app(MEME_OUTPUT_SHARD_DEPTH=2).test_client()
+    res = client.get("/")
+    src = res.data.split(b'src="')[1].split(b'"')[0].decode()
+    assert src.count("/") == 4
+    assert client.get(src).status_code == 200
+
+
+def test_flat_urls_survive_migration_to_shards(make_app, tmp_path):
+    page = make_app().test_client().get("/").data
+    name = page.split(b'src="')[1].split(b'"')[0].decode().rsplit("/", 1)[1]
+    assert migrate_to_sharded(str(tmp_path / "static"), depth=2) == 1
+
+    client = make_app(MEME_OUTPUT_SHARD_DEPTH=2).test_client()
+    assert client.get(f"/static/{name}").status_code == 200
+    assert client.get(f"/memes/{name}").status_code == 200
+    assert client.get("/static/meme_missing.jpg").status_code == 404
+
+
+def test_memes_are_cacheable(make_app):
+    client = make_app().test_client()
+    src = client.get("/").data.split(b'src="')[1].split(b'"')[0].decode()
+    res = client.get(src)
+    assert "immutable" in res.headers["Cache-Control"]
+    etag = res.headers["ETag"]
+    assert client.get(src, headers={"If-None-Match": etag}).status_code == 304
+    part = client.get(src, headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.data == res.data[:10]
+    assert client.get("/memes/missing.jpg").status_code == 404
+
+
+def test_output_format_negotiated_from_accept(make_app):
+    client = make_app(MEME_OUTPUT_FORMATS="webp,jpeg").test_client()
+    res = client.get("/", headers={"Accept": "image/webp,*/*"})
+    assert "Accept" in res.headers["Vary"]
+    assert b'.webp"' in res.data
+    assert b'.jpg"' in client.get("/", headers={"Accept": "*/*"}).data
+
+
+def test_api_renders_batch(make_app, image_server):
+    client = make_app(MEME_RENDER_WORKERS=2).test_client()
+    res = client.post("/api/memes", json={
+        "inline": True,
+        "memes": [
+            {"body": "Hi", "author": "Me"},
+            {"image": f"{image_server.url}/xander_2.jpg", "body": "Yo", "author": "Me"},
+            {"image": f"{image_server.url}/notes.txt", "body": "No", "author": "Me"},
+        ],
+    })
+    assert res.status_code == 200
+    ok, downloaded, failed = res.get_json()["memes"]
+    assert ok["url"].startswith("/memes/meme_")
+    assert base64.b64decode(ok["data"]) == client.get(ok["url"]).data
+    assert downloaded["content_type"] == "image/jpeg"
+    assert "supported image" in failed["error"]
+
+
+def test_api_rejects_invalid_jobs(make_app):
+    client = make_app(MEME_API_MAX_BATCH=1).test_client()
+    assert client.post("/api/memes", json={"body": "Hi"}).status_code == 400
+    batch = {"memes": [{"body": "Hi", "author": "Me"}] * 2}
+    assert client.post("/api/memes", json=batch).status_code == 400
+    res = client.post("/api/memes", json={"body": "Hi", "author": "Me"})
+    assert "data" not in res.get_json()["memes"][0]
+
+
+def _stage_count(client, stage):
+    text = client.get("/metrics").get_data(as_text=True)
+    prefix = f'meme_render_stage_seconds_count{{stage="{stage}"}} '
+    counts = [line[len(prefix):] for line in text.splitlines() if line.startswith(prefix)]
+    return int(counts[0]) if counts else 0
+
+
+def test_metrics_include_worker_render_stages(make_app):
+    app = make_app(MEME_RENDER_WORKERS=1)
+    client = app.test_client()
+    before = _stage_count(client, "encode")
+    assert client.get("/").status_code == 200
+    # Worker timings are merged by a done-callback, just after the result
+    deadline = time.time() + 5
+    while _stage_count(client, "encode") == before and time.time() < deadline:
+        time.sleep(0.01)
+    assert _stage_count(client, "encode") == before + 1
+
+
+def test_metrics_include_variant_render_stages(make_app):
+    client = make_app(MEME_OUTPUT_WIDTHS="240,480").test_client()
+    before = {stage: _stage_count(client, stage) for stage in ("decode", "draw", "encode")}
+    assert client.get("/").status_code == 200
+    assert _stage_count(client, "decode") == before["decode"] + 1
+    assert _stage_count(client, "draw") == before["draw"] + 2
+    assert _stage_count(client, "encode") == before["encode"] + 2
+
+
+def test_preloaded_shared_photos_are_reused(make_app, monkeypatch):
+    from motivacional_meme_generator import services as services_module
+
+    corpus = load_corpus(*corpus_paths(DEFAULT_DATA_DIR), None)
+    config = load_config({"MEME_SHARED_IMAGES_BYTES": 8 * 1024 * 1024})
+    cache = share_photos(corpus, config)
+    monkeypatch.setitem(
+        services_module._preloaded_images, os.path.abspath(corpus.images_dir), cache
+    )
+    try:
+        app = make_app(MEME_SHARED_IMAGES_BYTES=8 * 1024 * 1024)
+        services = app.extensions["meme_services"]
+        assert services.shared_images is cache
+        assert app.test_client().get("/").status_code == 200
+        services.close()
+        attached = SharedImageCache.attach(cache.name)
+        assert len(attached) == len(cache)
+        attached.close()
+    finally:
+        cache.close()